@@ -0,0 +1,122 @@
+"""
+Bog'lanish formasi uchun ASGI benchmark (uvicorn, bitta worker).
+
+Ishlatish:
+    python benchmarks/contact_asgi.py --requests 1000 --concurrency 300
+
+Skript uvicorn'ni alohida jarayonda bitta worker bilan ishga tushiradi,
+CSRF tokenni oladi va bir vaqtning o'zida ko'plab POST so'rovlar yuboradi.
+Yaratilgan test xabarlari oxirida o'chiriladi.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BENCH_SUBJECT = "Benchmark xabari"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client, url, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn ishga tushmadi")
+
+
+async def submit(client, url, token, index):
+    data = {
+        'csrfmiddlewaretoken': token,
+        'name': f"Bemor {index}",
+        'phone': f"+998901{index % 1000000:06d}",
+        'subject': BENCH_SUBJECT,
+        'message': "Benchmark uchun yuborilgan xabar matni.",
+    }
+    started = time.perf_counter()
+    response = await client.post(url, data=data, headers={'Referer': url})
+    return response.status_code, time.perf_counter() - started
+
+
+async def run(base_url, total, concurrency):
+    url = f"{base_url}/contact/"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await wait_until_ready(client, url)
+        response = await client.get(url)
+        token = response.cookies.get('csrftoken') or client.cookies.get('csrftoken')
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(index):
+            async with semaphore:
+                return await submit(client, url, token, index)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    failures = sum(1 for status, _ in results if status != 302)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"So'rovlar: {total}, parallel: {concurrency}, xatolar: {failures}")
+    print(f"Umumiy vaqt: {elapsed:.2f}s, o'tkazuvchanlik: {total / elapsed:.0f} req/s")
+    print(f"Kechikish p50={quantiles[49] * 1000:.1f}ms "
+          f"p95={quantiles[94] * 1000:.1f}ms p99={quantiles[98] * 1000:.1f}ms")
+    return failures
+
+
+def cleanup():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    django.setup()
+    from dentist.models import ContactMessage
+    ContactMessage.objects.filter(subject=BENCH_SUBJECT).delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=300)
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ)
+    # Benchmark paytida haqiqiy Telegram chatga xabar yubormaymiz
+    env.pop('TELEGRAM_BOT_TOKEN', None)
+    # Barcha so'rovlar bitta IP'dan keladi, shuning uchun rate limit o'chirilgan
+    env['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+         '--host', '127.0.0.1', '--port', str(port), '--workers', '1', '--log-level', 'warning'],
+        cwd=BASE_DIR, env=env,
+    )
+    try:
+        failures = asyncio.run(run(f"http://127.0.0.1:{port}", args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+        cleanup()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""Benchmark sozlamalari: asosiy sozlamalar, lekin rate limit o'chirilgan"""
+
+from config.settings import *  # noqa: F401,F403
+
+RATE_LIMITS = {}
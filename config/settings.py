@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.humanize",
+    "django.contrib.sitemaps",
 
     "dentist",
 ]
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "dentist.analytics.PageViewMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -125,6 +127,73 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache
+# Bir nechta worker uchun umumiy backend (Redis/Memcached) tavsiya etiladi
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
+# Rate limiting (token bucket): route -> {kalit turi: "so'rovlar/davr"}
+# Kalit turlari: ip, phone. Davr: s, m, h, d
+
+RATE_LIMITS = {
+    "contact": {"ip": "5/m", "phone": "3/h"},
+    "review": {"ip": "3/h"},
+}
+
+
+# Bog'lanish xabarlari: takrorlar oynasi (soniya) va spam chegarasi (0..1)
+
+CONTACT_DUPLICATE_WINDOW = 24 * 3600
+CONTACT_SPAM_THRESHOLD = 0.9
+
+
+# Telegram bildirishnomalari: digest oynasi va bitta chatga yuborish oralig'i (soniya)
+
+TELEGRAM_DIGEST_WINDOW = 10
+TELEGRAM_SEND_INTERVAL = 3
+TELEGRAM_DIGEST_MAX_BATCH = 20
+
+
+# Shifokor kabineti (Doctor.user orqali kirish)
+
+LOGIN_URL = "portal_login"
+LOGIN_REDIRECT_URL = "portal"
+LOGOUT_REDIRECT_URL = "portal_login"
+
+
+# Qabul eslatmalari: qabuldan necha daqiqa oldin, yuboruvchi funksiya,
+# bitta partiyadagi eslatmalar va o'zgarishlarni majburiy tekshirish oralig'i (soniya)
+
+REMINDER_OFFSETS = [24 * 60, 2 * 60]
+REMINDER_SENDER = "dentist.reminders.telegram_sender"
+REMINDER_BATCH_SIZE = 500
+REMINDER_RELOAD_INTERVAL = 60
+
+
+# Mashhurlik reytingi: reytingni qayta hisoblash oralig'i (soniya), oyna va yarim
+# yemirilish davri (kun), qabul tugmasi vazni. Hisoblar ANALYTICS_* buferi orqali yoziladi
+
+POPULARITY_RECOMPUTE_INTERVAL = 10 * 60
+POPULARITY_WINDOW_DAYS = 7
+POPULARITY_HALF_LIFE_DAYS = 2
+POPULARITY_BOOKING_WEIGHT = 5
+POPULARITY_RANK_SIZE = 50
+
+
+# Sahifa ko'rishlari statistikasi: buferni DB'ga yozish va soatlik/kunlik
+# yig'indilarga siqish oraliqlari (soniya), soatlik yig'indilar saqlanadigan kunlar
+
+ANALYTICS_FLUSH_INTERVAL = 5
+ANALYTICS_COMPACT_INTERVAL = 15 * 60
+ANALYTICS_HOURLY_RETENTION_DAYS = 90
+ANALYTICS_BUFFER_SIZE = 100_000
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,11 +1,93 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.humanize.templatetags.humanize import intcomma
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
-from django.db.models import Count
-from django.urls import reverse
+from django.db.models import Count, F, Func, OuterRef, Subquery
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 
-from dentist.models import Department, Service, DepartmentFeature, WorkingHour, Doctor, ContactMessage, SiteSettings, ServiceFeature, AboutStatistic
+from dentist import analytics, bulk, dashboard, exports, portal, ratings, spam
+from dentist.forms import CatalogueImportForm
+from dentist.fulltext import search_contact_messages
+from dentist.imports import DepartmentImporter, DoctorImporter, ServiceImporter, read_rows
+from dentist.models import Department, Service, DepartmentFeature, WorkingHour, Doctor, ContactMessage, SiteSettings, ServiceFeature, AboutStatistic, ScheduleInterval, ScheduleException, Appointment, AppointmentReminder, Review, PageViewRollup
+from dentist.pagination import KeysetChangeList
+from dentist.thumbnails import thumbnail_url
+
+
+class BulkActionsMixin:
+    """Amallar uchun to'plamli UPDATE (bo'laklab, har bo'lakka bitta audit yozuvi)"""
+    bulk_chunk_size = bulk.CHUNK_SIZE
+
+    def bulk_update(self, request, queryset, description, **values):
+        return bulk.bulk_update(
+            queryset, values, user=request.user, description=description, chunk_size=self.bulk_chunk_size
+        )
+
+
+def count_subquery(queryset):
+    """Bog'liq yozuvlar soni uchun korrelyatsiyalangan subquery (JOIN bilan qatorlar ko'paymaydi)"""
+    counted = queryset.order_by().annotate(n=Func(F('pk'), function='COUNT')).values('n')
+    return Coalesce(Subquery(counted), 0)
+
+
+class ExportActionsMixin:
+    """CSV/XLSX eksport amallari (oqim bilan, xotira sarfi doimiy)"""
+
+    def export_csv(self, request, queryset):
+        """CSV ga eksport"""
+        return exports.csv_response(queryset.order_by('pk'))
+    export_csv.short_description = 'CSV ga eksport'
+
+    def export_xlsx(self, request, queryset):
+        """XLSX ga eksport"""
+        if exports.Workbook is None:
+            self.message_user(request, "XLSX eksport uchun openpyxl o'rnatilmagan.", level='error')
+            return None
+        return exports.xlsx_response(queryset.order_by('pk'))
+    export_xlsx.short_description = 'XLSX ga eksport'
+
+
+class ImportAdminMixin:
+    """Changelist'ga 'Import' tugmasi va fayldan ommaviy import sahifasi"""
+    change_list_template = 'admin/dentist/change_list_import.html'
+    importer_class = None
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='%s_%s_import' % info),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """Fayldan import"""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+
+        form = CatalogueImportForm(request.POST or None, request.FILES or None)
+        result = None
+        if request.method == 'POST' and form.is_valid():
+            try:
+                rows = read_rows(form.cleaned_data['file'], form.cleaned_data['file_format'] or None)
+            except (ValueError, UnicodeDecodeError) as e:
+                form.add_error('file', str(e))
+            else:
+                result = self.importer_class().run(rows)
+                level = 'warning' if result.errors else 'success'
+                self.message_user(request, f"Import: {result.summary()}", level=level)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f"{self.opts.verbose_name_plural} - import",
+            'opts': self.opts,
+            'form': form,
+            'result': result,
+        }
+        return TemplateResponse(request, 'admin/dentist/import.html', context)
 
 
 class FeatureInline(admin.TabularInline):
@@ -33,8 +115,9 @@ class ServiceFeatureInline(admin.TabularInline):
 
 
 @admin.register(Department)
-class DepartmentAdmin(admin.ModelAdmin):
+class DepartmentAdmin(ImportAdminMixin, BulkActionsMixin, admin.ModelAdmin):
     """Bo'limlar admin paneli"""
+    importer_class = DepartmentImporter
     list_display = ['name', 'show_icon', 'doctor_count', 'service_count', 'is_active', 'order', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description', 'full_description']
@@ -75,51 +158,60 @@ class DepartmentAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-width: 200px; max-height: 200px; border-radius: 8px;" />',
-                obj.image.url
+                thumbnail_url(obj.image, 400)
             )
         return "Rasm yuklanmagan"
     show_image.short_description = 'Joriy rasm'
 
+    def get_queryset(self, request):
+        # Sonlar har bir qator uchun alohida so'rov emas, bitta so'rovdagi subquery
+        return super().get_queryset(request).annotate(
+            active_doctor_count=count_subquery(Doctor.objects.filter(department=OuterRef('pk'), is_available=True)),
+            active_service_count=count_subquery(Service.objects.filter(department=OuterRef('pk'), is_active=True)),
+        )
+
     def doctor_count(self, obj):
         """Shifokorlar soni"""
-        count = obj.doctors.filter(is_available=True).count()
         url = reverse('admin:dentist_doctor_changelist') + f'?department__id__exact={obj.id}'
         return format_html(
             '<a href="{}" style="color: green; font-weight: bold;">{} ta</a>',
-            url, count
+            url, obj.active_doctor_count
         )
     doctor_count.short_description = 'Shifokorlar'
+    doctor_count.admin_order_field = 'active_doctor_count'
 
     def service_count(self, obj):
         """Xizmatlar soni"""
-        count = obj.services.filter(is_active=True).count()
         url = reverse('admin:dentist_service_changelist') + f'?department__id__exact={obj.id}'
         return format_html(
             '<a href="{}" style="color: blue; font-weight: bold;">{} ta</a>',
-            url, count
+            url, obj.active_service_count
         )
     service_count.short_description = 'Xizmatlar'
+    service_count.admin_order_field = 'active_service_count'
 
     actions = ['activate_departments', 'deactivate_departments']
 
     def activate_departments(self, request, queryset):
         """Bo'limlarni faollashtirish"""
-        updated = queryset.update(is_active=True)
+        updated = self.bulk_update(request, queryset, 'is_active=True', is_active=True)
         self.message_user(request, f"{updated} ta bo'lim faollashtirildi.", level='success')
     activate_departments.short_description = "Tanlangan bo'limlarni faollashtirish"
 
     def deactivate_departments(self, request, queryset):
         """Bo'limlarni o'chirish"""
-        updated = queryset.update(is_active=False)
+        updated = self.bulk_update(request, queryset, 'is_active=False', is_active=False)
         self.message_user(request, f"{updated} ta bo'lim o'chirildi.", level='warning')
     deactivate_departments.short_description = "Tanlangan bo'limlarni o'chirish"
 
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(ImportAdminMixin, BulkActionsMixin, ExportActionsMixin, admin.ModelAdmin):
     """Xizmatlar admin paneli"""
+    importer_class = ServiceImporter
     list_display = ['name', 'department', 'show_icon', 'price_display', 'duration_display', 'is_popular',  'is_active',  'order', 'created_at']
     list_filter = ['department', 'is_popular', 'is_active', 'created_at']
+    list_select_related = ['department']
     search_fields = ['name', 'description', 'full_description']
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['is_popular', 'is_active', 'order']
@@ -162,7 +254,7 @@ class ServiceAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-width: 200px; max-height: 200px; border-radius: 8px;" />',
-                obj.image.url
+                thumbnail_url(obj.image, 400)
             )
         return "Rasm yuklanmagan"
     show_image.short_description = 'Joriy rasm'
@@ -199,45 +291,53 @@ class ServiceAdmin(admin.ModelAdmin):
         return format_html('<span style="color: #6c757d;">Individual</span>')
     duration_display.short_description = 'Davomiyligi'
 
-    actions = ['make_popular', 'make_not_popular', 'activate_services', 'deactivate_services']
+    actions = ['make_popular', 'make_not_popular', 'activate_services', 'deactivate_services', 'export_csv', 'export_xlsx']
 
     def make_popular(self, request, queryset):
         """Mashhur qilish"""
-        updated = queryset.update(is_popular=True)
+        updated = self.bulk_update(request, queryset, 'is_popular=True', is_popular=True)
         self.message_user(request, f"{updated} ta xizmat mashhur qilindi.", level='success')
     make_popular.short_description = 'Mashhur qilish'
 
     def make_not_popular(self, request, queryset):
         """Mashhurlikni bekor qilish"""
-        updated = queryset.update(is_popular=False)
+        updated = self.bulk_update(request, queryset, 'is_popular=False', is_popular=False)
         self.message_user(request, f"{updated} ta xizmat oddiy holatga qaytarildi.", level='info')
     make_not_popular.short_description = 'Mashhur emasligini belgilash'
 
     def activate_services(self, request, queryset):
         """Xizmatlarni faollashtirish"""
-        updated = queryset.update(is_active=True)
+        updated = self.bulk_update(request, queryset, 'is_active=True', is_active=True)
         self.message_user(request, f"{updated} ta xizmat faollashtirildi.", level='success')
     activate_services.short_description = 'Faollashtirish'
 
     def deactivate_services(self, request, queryset):
         """Xizmatlarni o'chirish"""
-        updated = queryset.update(is_active=False)
+        updated = self.bulk_update(request, queryset, 'is_active=False', is_active=False)
         self.message_user(request, f"{updated} ta xizmat o'chirildi.", level='warning')
     deactivate_services.short_description = 'O\'chirish'
 
 
 @admin.register(Doctor)
-class DoctorAdmin(admin.ModelAdmin):
+class DoctorAdmin(ImportAdminMixin, BulkActionsMixin, ExportActionsMixin, admin.ModelAdmin):
     """Shifokorlar admin paneli"""
+    importer_class = DoctorImporter
     list_display = ['show_photo', 'get_full_name', 'department', 'specialization', 'experience_years', 'rating_display', 'patients_count', 'is_available', 'is_futured', 'order']
     list_filter = ['department', 'gender', 'is_available', 'is_futured','created_at']
+    list_select_related = ['department']
     search_fields = ['first_name', 'last_name', 'middle_name', 'specialization', 'bio']
     prepopulated_fields = {'slug': ('first_name', 'last_name')}
     list_editable = ['is_available', 'is_futured', 'order']
-    readonly_fields = ['created_at', 'updated_at', 'show_large_photo']
+    readonly_fields = ['created_at', 'updated_at', 'show_large_photo', 'review_count']
     date_hierarchy = 'created_at'
     list_per_page = 20
 
+    def get_readonly_fields(self, request, obj=None):
+        # Sharhlar bo'lsa reyting ulardan hisoblanadi
+        if obj is not None and obj.review_count:
+            return [*self.readonly_fields, 'rating']
+        return self.readonly_fields
+
     fieldsets = (
         ('Shaxsiy Ma\'lumotlar', {
             'fields': ('first_name', 'last_name', 'middle_name', 'slug', 'gender', 'photo', 'show_large_photo')
@@ -257,7 +357,7 @@ class DoctorAdmin(admin.ModelAdmin):
             'fields': ('phone',)
         }),
         ('Statistika', {
-            'fields': ('rating', 'patients_count'),
+            'fields': ('rating', 'review_count', 'patients_count'),
             'classes': ('wide',)
         }),
         ('Holat', {
@@ -275,7 +375,7 @@ class DoctorAdmin(admin.ModelAdmin):
         if obj.photo:
             return format_html(
                 '<img src="{}" style="width: 50px; height: 50px; border-radius: 50%; object-fit: cover;" />',
-                obj.photo.url
+                thumbnail_url(obj.photo, 100)
             )
         return "❌"
     show_photo.short_description = 'Rasm'
@@ -285,7 +385,7 @@ class DoctorAdmin(admin.ModelAdmin):
         if obj.photo:
             return format_html(
                 '<img src="{}" style="max-width: 300px; max-height: 300px; border-radius: 8px; object-fit: cover;" />',
-                obj.photo.url
+                thumbnail_url(obj.photo, 600)
             )
         return "Rasm yuklanmagan"
     show_large_photo.short_description = 'Joriy rasm'
@@ -299,42 +399,42 @@ class DoctorAdmin(admin.ModelAdmin):
         )
     rating_display.short_description = 'Reyting'
 
-    actions = ['make_featured', 'remove_featured', 'make_available', 'make_unavailable','increment_patients']
+    actions = ['make_featured', 'remove_featured', 'make_available', 'make_unavailable','increment_patients', 'recalculate_ratings', 'export_csv', 'export_xlsx']
+
+    def recalculate_ratings(self, request, queryset):
+        """Reyting statistikasini tasdiqlangan sharhlardan qayta hisoblash"""
+        ratings.recalculate(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, "Reytinglar qayta hisoblandi.", level='success')
+    recalculate_ratings.short_description = 'Reytingni sharhlardan qayta hisoblash'
 
     def make_featured(self, request, queryset):
         """Asosiy sahifaga qo'shish"""
-        updated = queryset.update(is_futured=True)
+        updated = self.bulk_update(request, queryset, 'is_futured=True', is_futured=True)
         self.message_user(request, f"{updated} ta shifokor asosiy sahifaga qo'shildi.", level='success')
     make_featured.short_description = 'Asosiy sahifaga qo\'shish'
 
     def remove_featured(self, request, queryset):
         """Asosiy sahifadan olib tashlash"""
-        updated = queryset.update(is_futured=False)
+        updated = self.bulk_update(request, queryset, 'is_futured=False', is_futured=False)
         self.message_user(request, f"{updated} ta shifokor asosiy sahifadan olib tashlandi.", level='info')
     remove_featured.short_description = 'Asosiy sahifadan olib tashlash'
 
     def make_available(self, request, queryset):
         """Mavjud qilish"""
-        updated = queryset.update(is_available=True)
+        updated = self.bulk_update(request, queryset, 'is_available=True', is_available=True)
         self.message_user(request, f"{updated} ta shifokor mavjud qilindi.", level='success')
     make_available.short_description = 'Mavjud qilish'
 
     def make_unavailable(self, request, queryset):
         """Mavjud emasligini belgilash"""
-        updated = queryset.update(is_available=False)
+        updated = self.bulk_update(request, queryset, 'is_available=False', is_available=False)
         self.message_user(request, f"{updated} ta shifokor mavjud emas holatiga o'tkazildi.", level='warning')
     make_unavailable.short_description = 'Mavjud emas qilish'
 
     def increment_patients(self, request, queryset):
-        """Bemorlar sonini oshirish"""
-        for doctor in queryset:
-            doctor.patients_count += 1
-            doctor.save()
-        self.message_user(
-            request,
-            f"{queryset.count()} ta shifokorning bemorlar soni oshirildi.",
-            level='success'
-        )
+        """Bemorlar sonini oshirish (bitta UPDATE ... SET patients_count = patients_count + 1)"""
+        updated = self.bulk_update(request, queryset, 'patients_count+1', patients_count=F('patients_count') + 1)
+        self.message_user(request, f"{updated} ta shifokorning bemorlar soni oshirildi.", level='success')
     increment_patients.short_description = 'Bemorlar sonini +1 qilish'
 
 
@@ -343,6 +443,7 @@ class DoctorAdmin(admin.ModelAdmin):
 class DepartmentFeatureAdmin(admin.ModelAdmin):
     """Bo'lim xususiyatlari"""
     list_display = ['department', 'text']
+    list_select_related = ['department']
     list_filter = ['department']
     search_fields = ['text', 'department__name']
 
@@ -351,49 +452,227 @@ class DepartmentFeatureAdmin(admin.ModelAdmin):
 class WorkingHourAdmin(admin.ModelAdmin):
     """Ish vaqtlari"""
     list_display = ['department', 'day_range', 'time_range']
+    list_select_related = ['department']
     list_filter = ['department']
     search_fields = ['department__name', 'day_range']
 
 
+@admin.register(ScheduleInterval)
+class ScheduleIntervalAdmin(admin.ModelAdmin):
+    """Tuzilgan ish vaqtlari (bo'limsiz - butun klinika). Bo'lim va sayt sozlamalari matnidan avtomatik yaratiladi"""
+    list_display = ['department', 'weekday', 'opens', 'closes']
+    list_filter = ['weekday', 'department']
+    list_select_related = ['department']
+
+
+class AppointmentReminderInline(admin.TabularInline):
+    model = AppointmentReminder
+    extra = 0
+    can_delete = False
+    fields = ['offset', 'starts_at', 'status', 'created_at', 'sent_at']
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Appointment)
+class AppointmentAdmin(BulkActionsMixin, admin.ModelAdmin):
+    list_display = ['patient_name', 'patient_phone', 'doctor', 'service', 'starts_at', 'status']
+    list_filter = ['status', 'doctor__department', 'starts_at']
+    search_fields = ['patient_name', 'patient_phone', 'doctor__first_name', 'doctor__last_name']
+    date_hierarchy = 'starts_at'
+    list_select_related = ['doctor', 'service']
+    raw_id_fields = ['doctor', 'service']
+    readonly_fields = ['created_at', 'updated_at']
+    inlines = [AppointmentReminderInline]
+    actions = ['mark_confirmed', 'mark_cancelled']
+
+    def bulk_update(self, request, queryset, description, **values):
+        # Ommaviy UPDATE signal yubormaydi: shifokor kabinetlaridagi jadvallar qayta quriladi
+        doctor_ids = list(queryset.order_by().values_list('doctor_id', flat=True).distinct())
+        updated = super().bulk_update(request, queryset, description, **values)
+        transaction.on_commit(lambda: portal.forget(*doctor_ids))
+        return updated
+
+    def mark_confirmed(self, request, queryset):
+        updated = self.bulk_update(request, queryset, 'status=confirmed', status=Appointment.STATUS_CONFIRMED)
+        self.message_user(request, f"{updated} ta qabul tasdiqlandi.", level='success')
+    mark_confirmed.short_description = "Tanlangan qabullarni tasdiqlash"
+
+    def mark_cancelled(self, request, queryset):
+        updated = self.bulk_update(request, queryset, 'status=cancelled', status=Appointment.STATUS_CANCELLED)
+        self.message_user(request, f"{updated} ta qabul bekor qilindi.", level='warning')
+    mark_cancelled.short_description = "Tanlangan qabullarni bekor qilish"
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    """Sharhlar moderatsiyasi (reyting statistikasi dentist.ratings orqali yangilanadi)"""
+    list_display = ['patient_name', 'doctor', 'rating', 'short_comment', 'status', 'created_at']
+    list_filter = ['status', 'rating', 'doctor__department', 'created_at']
+    search_fields = ['patient_name', 'comment', 'doctor__first_name', 'doctor__last_name']
+    list_select_related = ['doctor']
+    raw_id_fields = ['doctor']
+    readonly_fields = ['created_at', 'moderated_at']
+    actions = ['approve_reviews', 'reject_reviews']
+
+    def short_comment(self, obj):
+        return obj.comment[:80]
+    short_comment.short_description = 'Sharh'
+
+    def approve_reviews(self, request, queryset):
+        updated = ratings.set_status(queryset, Review.STATUS_APPROVED)
+        self.message_user(request, f"{updated} ta sharh tasdiqlandi.", level='success')
+    approve_reviews.short_description = "Tanlangan sharhlarni tasdiqlash"
+
+    def reject_reviews(self, request, queryset):
+        updated = ratings.set_status(queryset, Review.STATUS_REJECTED)
+        self.message_user(request, f"{updated} ta sharh rad etildi.", level='warning')
+    reject_reviews.short_description = "Tanlangan sharhlarni rad etish"
+
+    def delete_queryset(self, request, queryset):
+        ratings.delete_reviews(queryset)
+
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    """Ta'til, qo'shimcha smena va bayramlar (shifokor bo'sh bo'lsa - butun klinika)"""
+    list_display = ['__str__', 'doctor', 'kind', 'starts_at', 'ends_at', 'reason']
+    list_filter = ['kind', 'doctor__department']
+    search_fields = ['doctor__first_name', 'doctor__last_name', 'reason']
+    date_hierarchy = 'starts_at'
+    list_select_related = ['doctor']
+    raw_id_fields = ['doctor']
+
+
+class SpamScoreFilter(admin.SimpleListFilter):
+    """Klassifikator bahosi bo'yicha filter"""
+    title = 'Spam ehtimoli'
+    parameter_name = 'spam_score'
+
+    def lookups(self, request, model_admin):
+        return [('high', 'Yuqori'), ('low', 'Past'), ('none', 'Baholanmagan')]
+
+    def queryset(self, request, queryset):
+        threshold = settings.CONTACT_SPAM_THRESHOLD
+        if self.value() == 'high':
+            return queryset.filter(spam_score__gte=threshold)
+        if self.value() == 'low':
+            return queryset.filter(spam_score__lt=threshold)
+        if self.value() == 'none':
+            return queryset.filter(spam_score__isnull=True)
+        return queryset
+
+
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(BulkActionsMixin, ExportActionsMixin, admin.ModelAdmin):
     """Xabarlar admin paneli"""
 
-    list_display = ['name', 'email', 'subject', 'is_read', 'created_at']
-    list_filter = ['is_read', 'created_at']
+    list_display = ['name', 'email', 'subject', 'duplicate_count', 'spam_score_display', 'is_spam', 'is_read', 'created_at']
+    list_filter = ['is_read', 'is_spam', SpamScoreFilter, 'department', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
     list_editable = ['is_read']
-    readonly_fields = ['created_at']
-    date_hierarchy = 'created_at'
+    readonly_fields = ['created_at', 'duplicate_count', 'last_received_at', 'spam_score', 'is_spam']
+    list_per_page = 50
+    # Katta jadval: COUNT(*) va OFFSET o'rniga taxminiy son va kursorli sahifalash
+    # (date_hierarchy butun jadval bo'yicha DISTINCT sana so'rovini bajargani uchun olib tashlangan)
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """LIKE o'rniga full-text indeks bo'yicha qidiruv"""
+        if search_term:
+            results = search_contact_messages(queryset, search_term)
+            if results is not None:
+                return results, False
+        return super().get_search_results(request, queryset, search_term)
 
     fieldsets = (
         ('Yuboruvchi', {
             'fields': ('name', 'email')
         }),
         ('Xabar', {
-            'fields': ('subject', 'message')
+            'fields': ('department', 'subject', 'message')
         }),
         ('Holat', {
             'fields': ('is_read',)
         }),
+        ('Takror va Spam', {
+            'fields': ('duplicate_count', 'created_at', 'last_received_at', 'spam_score', 'is_spam'),
+            'classes': ('collapse',)
+        }),
     )
 
-    actions = ['mark_as_read', 'mark_as_unread']
+    def spam_score_display(self, obj):
+        """Spam ehtimoli foizda"""
+        if obj.spam_score is None:
+            return '-'
+        color = '#dc3545' if obj.spam_score >= settings.CONTACT_SPAM_THRESHOLD else '#6c757d'
+        return format_html('<span style="color: {};">{}%</span>', color, round(obj.spam_score * 100))
+    spam_score_display.short_description = 'Spam ehtimoli'
+
+    actions = ['mark_as_read', 'mark_as_unread', 'mark_as_spam', 'mark_as_not_spam', 'export_csv', 'export_xlsx']
 
     def mark_as_read(self, request, queryset):
         """O'qilgan deb belgilash"""
-        updated = queryset.update(is_read=True)
+        updated = dashboard.set_read(queryset, True, user=request.user, description='is_read=True')
         self.message_user(request, f'{updated} ta xabar o\'qilgan')
 
     mark_as_read.short_description = "O'qilgan"
 
     def mark_as_unread(self, request, queryset):
         """O'qilmagan deb belgilash"""
-        updated = queryset.update(is_read=False)
+        updated = dashboard.set_read(queryset, False, user=request.user, description='is_read=False')
         self.message_user(request, f'{updated} ta xabar o\'qilmagan')
 
     mark_as_unread.short_description = "O'qilmagan"
 
+    def mark_as_spam(self, request, queryset):
+        """Spam deb belgilash (klassifikator o'qitiladi)"""
+        updated = spam.train(queryset, is_spam=True)
+        self.message_user(request, f'{updated} ta xabar spam deb belgilandi', level='warning')
+
+    mark_as_spam.short_description = "Spam deb belgilash"
+
+    def mark_as_not_spam(self, request, queryset):
+        """Spam emas deb belgilash (klassifikator o'qitiladi)"""
+        updated = spam.train(queryset, is_spam=False)
+        self.message_user(request, f'{updated} ta xabar spam emas deb belgilandi', level='success')
+
+    mark_as_not_spam.short_description = "Spam emas"
+
+
+@admin.register(PageViewRollup)
+class PageViewRollupAdmin(admin.ModelAdmin):
+    """Sahifa ko'rishlari: grafik va ro'yxat faqat yig'indilardan (daqiqalik jadvalga murojaat yo'q)"""
+    change_list_template = 'admin/dentist/pageviewrollup/change_list.html'
+    list_display = ['url_name', 'object_id', 'period', 'start', 'hits']
+    list_filter = ['period', 'url_name']
+    list_per_page = 100
+    chart_days = 30
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        url_name = request.GET.get('url_name__exact')
+        totals = analytics.daily_totals(self.chart_days, url_name)
+        peak = max((hits for _, hits in totals), default=0) or 1
+        extra_context = {
+            **(extra_context or {}),
+            'chart_title': f"Oxirgi {self.chart_days} kun" + (f" ({url_name})" if url_name else ""),
+            'chart': [(day, hits, round(hits * 100 / peak)) for day, hits in totals],
+            'top_pages': analytics.top_pages(self.chart_days),
+        }
+        return super().changelist_view(request, extra_context)
+
 
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
@@ -440,6 +719,7 @@ class SiteSettingsAdmin(admin.ModelAdmin):
 class ServiceFeatureAdmin(admin.ModelAdmin):
     """Xizmat xususiyatlari"""
     list_display = ['service', 'text', 'icon', 'order']
+    list_select_related = ['service']
     list_filter = ['service']
     search_fields = ['text', 'service__name']
     list_editable = ['order']
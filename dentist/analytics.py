@@ -0,0 +1,253 @@
+"""
+Sahifa ko'rishlari statistikasi (tashqi analitika xizmatisiz)
+
+- PageViewMiddleware bo'lim, xizmat va shifokor sahifalarining muvaffaqiyatli
+  GET so'rovlarini (url nomi, obyekt id, daqiqa) ko'rinishida jarayon
+  buferiga qo'shadi. Bufer - deque: append/popleft atomar, qulf kerak emas.
+  "Qabulga yozilish" bosishlari ham shu buferga (record_booking) tushadi.
+- So'rov tugagach (request_finished), oxirgi yozuvdan ANALYTICS_FLUSH_INTERVAL
+  o'tgan bo'lsa, bufer fon thread'ida (dentist.background) bo'shatiladi va
+  sonlar daqiqalik PageViewMinute qatorlariga qo'shiladi (bulk.add_counts):
+  har bir ko'rish uchun yozuv yo'q. Xizmat/shifokor ko'rishlari va bosishlar
+  o'sha tranzaksiyada mashhurlik reytingining kunlik ActivityCount
+  qatorlariga ham qo'shiladi, keyin reyting vaqti kelgan bo'lsa qayta
+  hisoblanadi (dentist.popularity).
+- compact() tugagan soatlardagi daqiqalik qatorlarni soatlik va kunlik
+  PageViewRollup'ga qo'shib o'chiradi. Soatliklar ANALYTICS_HOURLY_RETENTION_DAYS
+  kun saqlanadi, kunliklar doimiy. Shu fon ishi ANALYTICS_COMPACT_INTERVAL da
+  (cache.add qulfi; LocMemCache'da har bir jarayon uchun alohida, siqish
+  select_for_update bilan) yoki compact_analytics buyrug'i (cron) ishga tushiradi.
+- Admin grafiklari faqat yig'indilardan o'qiydi: so'rov hajmi tarix
+  uzunligiga emas, ko'rsatilgan kunlar soniga bog'liq.
+"""
+
+import logging
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, time as dtime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import DatabaseError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from dentist import background, bulk, popularity
+from dentist.models import ActivityCount, Department, Doctor, PageViewMinute, PageViewRollup, Service
+
+logger = logging.getLogger(__name__)
+
+# url nomi -> detal sahifa modeli (ro'yxat sahifalari uchun None)
+TRACKED_URLS = {
+    'department_list': None,
+    'department_detail': Department,
+    'services': None,
+    'service_detail': Service,
+    'doctors': None,
+    'doctor_detail': Doctor,
+}
+LIST_LABELS = {'department_list': "Bo'limlar", 'services': "Xizmatlar", 'doctors': "Shifokorlar"}
+# Mashhurlik reytingiga qo'shiladigan detal sahifalar
+ACTIVITY_KINDS = {'service_detail': ActivityCount.KIND_SERVICE, 'doctor_detail': ActivityCount.KIND_DOCTOR}
+# "Qabulga yozilish" bosishlari buferda shu nom bilan (sahifa ko'rishi emas)
+BOOKING_PREFIX = 'booking:'
+COMPACT_LOCK_KEY = 'analytics:compact'
+# Oxirgi daqiqalar siqilmaydi: kechikib yozilayotgan hisoblar bilan to'qnashmaslik uchun
+COMPACT_GRACE = timedelta(minutes=5)
+DELETE_CHUNK_SIZE = 500
+
+
+class HitBuffer:
+    """(url nomi yoki booking:<turi>, obyekt id, epoch daqiqa) hodisalari navbati"""
+
+    def __init__(self, maxlen=None, clock=time.time):
+        self.clock = clock
+        # To'lib ketsa (DB uzoq vaqt ishlamasa) eng eski ko'rishlar tashlanadi
+        self._hits = deque(maxlen=maxlen)
+        self._flushed_at = clock()
+
+    def __len__(self):
+        return len(self._hits)
+
+    def record(self, url_name, object_id=0):
+        self._hits.append((url_name, object_id, int(self.clock() // 60)))
+
+    def is_due(self, interval):
+        return bool(self._hits) and self.clock() - self._flushed_at >= interval
+
+    def drain(self):
+        counts = Counter()
+        while True:
+            try:
+                counts[self._hits.popleft()] += 1
+            except IndexError:
+                return counts
+
+    def flush(self):
+        """Bufferni DB'ga yozish. Returns: yozilgan ko'rishlar soni"""
+        self._flushed_at = self.clock()
+        counts = self.drain()
+        if not counts:
+            return 0
+        try:
+            write_hits(counts)
+        except DatabaseError:
+            logger.exception("Sahifa ko'rishlari yozilmadi")
+            # Keyingi urinishda qayta yoziladi
+            self._hits.extend(counts.elements())
+            return 0
+        return sum(counts.values())
+
+
+def write_hits(counts):
+    zone = timezone.get_default_timezone()
+    hits = {}
+    activity = defaultdict(lambda: {'views': 0, 'bookings': 0})
+    for (url_name, object_id, minute), n in counts.items():
+        at = datetime.fromtimestamp(minute * 60, tz=dt_timezone.utc)
+        day = at.astimezone(zone).date()
+        if url_name.startswith(BOOKING_PREFIX):
+            activity[url_name[len(BOOKING_PREFIX):], day, object_id]['bookings'] += n
+            continue
+        hits[url_name, at, object_id] = {'hits': n}
+        if url_name in ACTIVITY_KINDS:
+            activity[ACTIVITY_KINDS[url_name], day, object_id]['views'] += n
+    with transaction.atomic():
+        if hits:
+            bulk.add_counts(PageViewMinute, ('url_name', 'minute', 'object_id'), hits)
+        if activity:
+            bulk.add_counts(ActivityCount, ('kind', 'day', 'object_id'), activity)
+
+
+def compact(now=None):
+    """Tugagan soatlardagi daqiqalik qatorlarni yig'indilarga o'tkazish. Returns: siqilgan qatorlar soni"""
+    now = now or timezone.now()
+    cutoff = (now - COMPACT_GRACE).replace(minute=0, second=0, microsecond=0)
+    zone = timezone.get_default_timezone()
+    with transaction.atomic():
+        rows = list(PageViewMinute.objects.filter(minute__lt=cutoff).select_for_update().values_list(
+            'pk', 'url_name', 'object_id', 'minute', 'hits'
+        ))
+        if rows:
+            increments = defaultdict(lambda: {'hits': 0})
+            for _, url_name, object_id, minute, hits in rows:
+                local = minute.astimezone(zone)
+                hour = local.replace(minute=0, second=0, microsecond=0)
+                increments[PageViewRollup.PERIOD_HOUR, hour, url_name, object_id]['hits'] += hits
+                increments[PageViewRollup.PERIOD_DAY, hour.replace(hour=0), url_name, object_id]['hits'] += hits
+            bulk.add_counts(PageViewRollup, ('period', 'start', 'url_name', 'object_id'), increments)
+            pks = [row[0] for row in rows]
+            for start in range(0, len(pks), DELETE_CHUNK_SIZE):
+                PageViewMinute.objects.filter(pk__in=pks[start:start + DELETE_CHUNK_SIZE]).delete()
+        PageViewRollup.objects.filter(
+            period=PageViewRollup.PERIOD_HOUR,
+            start__lt=now - timedelta(days=settings.ANALYTICS_HOURLY_RETENTION_DAYS),
+        ).delete()
+    return len(rows)
+
+
+def compact_if_due():
+    # Qulf cache darajasida: LocMemCache'da har bir jarayon uchun alohida
+    if cache.add(COMPACT_LOCK_KEY, 1, settings.ANALYTICS_COMPACT_INTERVAL):
+        compact()
+        return True
+    return False
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, dtime.min))
+
+
+def daily_totals(days=30, url_name=None, today=None):
+    """[(kun, ko'rishlar)] oxirgi days kun uchun (kunlik yig'indilardan, bo'sh kunlar 0)"""
+    today = today or timezone.localdate()
+    first = today - timedelta(days=days - 1)
+    rollups = PageViewRollup.objects.filter(period=PageViewRollup.PERIOD_DAY, start__gte=_day_start(first))
+    if url_name:
+        rollups = rollups.filter(url_name=url_name)
+    totals = {
+        timezone.localtime(row['start']).date(): row['total']
+        for row in rollups.values('start').annotate(total=Sum('hits')).order_by()
+    }
+    return [(first + timedelta(days=offset), totals.get(first + timedelta(days=offset), 0)) for offset in range(days)]
+
+
+def top_pages(days=30, limit=10, today=None):
+    """Eng ko'p ko'rilgan sahifalar: [(url nomi, obyekt id, nomi, ko'rishlar)]"""
+    today = today or timezone.localdate()
+    rows = list(
+        PageViewRollup.objects.filter(
+            period=PageViewRollup.PERIOD_DAY, start__gte=_day_start(today - timedelta(days=days - 1))
+        ).values('url_name', 'object_id').annotate(total=Sum('hits')).order_by('-total')[:limit]
+    )
+    ids = defaultdict(set)
+    for row in rows:
+        ids[row['url_name']].add(row['object_id'])
+    objects = {
+        url_name: TRACKED_URLS[url_name].objects.in_bulk(object_ids)
+        for url_name, object_ids in ids.items() if TRACKED_URLS.get(url_name) is not None
+    }
+    result = []
+    for row in rows:
+        url_name, object_id = row['url_name'], row['object_id']
+        obj = objects.get(url_name, {}).get(object_id)
+        label = str(obj) if obj is not None else LIST_LABELS.get(url_name, f"{url_name} #{object_id}")
+        result.append((url_name, object_id, label, row['total']))
+    return result
+
+
+buffer = HitBuffer(maxlen=settings.ANALYTICS_BUFFER_SIZE)
+
+
+def track(request, response):
+    match = request.resolver_match
+    if (request.method == 'GET' and response.status_code == 200
+            and match is not None and match.url_name in TRACKED_URLS):
+        # Detal sahifalarda view obyekt id'sini request.analytics_object_id ga yozadi
+        buffer.record(match.url_name, getattr(request, 'analytics_object_id', 0))
+
+
+class PageViewMiddleware:
+    """Kuzatiladigan sahifalar ko'rishlarini buferga qo'shish (sinxron va async)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        track(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        track(request, response)
+        return response
+
+
+def record_booking(kind, object_id):
+    """kind: ActivityCount.KIND_SERVICE / KIND_DOCTOR"""
+    buffer.record(f'{BOOKING_PREFIX}{kind}', object_id)
+
+
+def flush_and_compact():
+    if buffer.flush():
+        compact_if_due()
+        popularity.recompute_if_due()
+
+
+def _on_request_finished(sender, **kwargs):
+    if buffer.is_due(settings.ANALYTICS_FLUSH_INTERVAL):
+        background.submit('analytics-flush', flush_and_compact)
+
+
+def connect_signals():
+    request_finished.connect(_on_request_finished, dispatch_uid='analytics_flush')
@@ -0,0 +1,329 @@
+"""
+Katalog uchun faqat o'qiladigan JSON API (bo'limlar, xizmatlar, shifokorlar)
+
+So'rov parametrlari:
+- fields=name,slug,...  faqat kerakli maydonlar (DB'dan ham faqat shu ustunlar o'qiladi)
+- include=department,features,...  bog'liq obyektlarni ichiga qo'shish
+  (har bir include uchun ko'pi bilan bitta qo'shimcha so'rov, qatorlar soniga bog'liq emas)
+- department=<slug>  xizmat/shifokorlarni bo'lim bo'yicha filtrlash
+- gender, experience, rating, day  shifokorlar fasetlari (javobda 'facets' sonlari bilan;
+  bo'lim fasetlari ham filtrdagidek slug bo'yicha)
+- limit, cursor  pk bo'yicha kursorli sahifalash
+
+Javoblar (path, parametrlar, modellar avlodi) bo'yicha cache'lanadi va ETag
+bilan qaytariladi; mos If-None-Match uchun 304 yuboriladi.
+"""
+
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.views import View
+
+from dentist.caching import get_generations
+from dentist.facets import get_facet_index, parse_selected
+from dentist.models import Department, Doctor, Service, ServiceFeature
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+API_CACHE_TIMEOUT = 3600
+API_MAX_AGE = 60
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def dumps(data):
+    """JSON baytlari (orjson o'rnatilgan bo'lsa u orqali)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class APIError(Exception):
+    pass
+
+
+def _number(value):
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def _file_url(field_file):
+    return field_file.url if field_file else None
+
+
+def _schedule(doctor):
+    return {
+        'days': [day for day in WEEKDAYS if getattr(doctor, f'is_{day}')],
+        'start': doctor.work_start.strftime('%H:%M'),
+        'end': doctor.work_end.strftime('%H:%M'),
+        'consultation_duration': doctor.consultation_duration,
+    }
+
+
+class Resource:
+    """
+    fields: {nom: (DB ustunlari, qiymat olish funksiyasi)}
+    embeds: {nom: (resurs, bog'lanish turi, manba)} - 'fk' (select_related) yoki 'many' (Prefetch)
+    """
+    model = None
+    name = None
+    fields = {}
+    default_fields = []
+    embeds = {}
+    filters = {}
+
+    def base_queryset(self):
+        return self.model.objects.filter(**self.filters)
+
+    def parse(self, params):
+        fields = [name for name in params.get('fields', '').split(',') if name] or list(self.default_fields)
+        include = [name for name in params.get('include', '').split(',') if name]
+        unknown = [name for name in fields if name not in self.fields] + [
+            name for name in include if name not in self.embeds
+        ]
+        if unknown:
+            raise APIError(f"Noma'lum maydon: {', '.join(unknown)}")
+        return fields, include
+
+    def columns(self, fields):
+        return {'id', *(column for name in fields for column in self.fields[name][0])}
+
+    def queryset(self, fields, include):
+        columns = self.columns(fields)
+        related = []
+        prefetches = []
+        for name in include:
+            resource, kind, source = self.embeds[name]
+            if kind == 'fk':
+                related.append(source)
+                columns.add(f'{source}_id')
+                columns.update(f'{source}__{column}' for column in resource.columns(resource.default_fields))
+            else:
+                target = resource.model._meta.get_field(source)
+                nested = resource.base_queryset().only(*resource.columns(resource.default_fields), target.attname)
+                # 'many' uchun include nomi related_name bilan bir xil
+                prefetches.append(Prefetch(name, queryset=nested))
+        queryset = self.base_queryset().select_related(*related).prefetch_related(*prefetches)
+        return queryset.only(*columns)
+
+    def serialize(self, obj, fields, include=()):
+        data = {name: self.fields[name][1](obj) for name in fields}
+        for name in include:
+            resource, kind, source = self.embeds[name]
+            if kind == 'fk':
+                data[name] = resource.serialize(getattr(obj, source), resource.default_fields)
+            else:
+                data[name] = [resource.serialize(child, resource.default_fields) for child in getattr(obj, name).all()]
+        return data
+
+
+class FeatureResource(Resource):
+    model = ServiceFeature
+    fields = {
+        'text': (('text',), lambda f: f.text),
+        'icon': (('icon',), lambda f: f.icon),
+    }
+    default_fields = ['text', 'icon']
+
+    def base_queryset(self):
+        return self.model.objects.order_by('order', 'pk')
+
+
+class DepartmentResource(Resource):
+    model = Department
+    name = 'departments'
+    filters = {'is_active': True}
+    fields = {
+        'id': ((), lambda d: d.pk),
+        'slug': (('slug',), lambda d: d.slug),
+        'name': (('name',), lambda d: d.name),
+        'icon': (('icon',), lambda d: d.icon),
+        'description': (('description',), lambda d: d.description),
+        'full_description': (('full_description',), lambda d: d.full_description),
+        'image': (('image',), lambda d: _file_url(d.image)),
+        'order': (('order',), lambda d: d.order),
+        'url': (('slug',), lambda d: d.get_absolute_url()),
+        'updated_at': (('updated_at',), lambda d: d.updated_at.isoformat()),
+    }
+    default_fields = ['id', 'slug', 'name', 'url']
+
+
+class ServiceResource(Resource):
+    model = Service
+    name = 'services'
+    filters = {'is_active': True}
+    fields = {
+        'id': ((), lambda s: s.pk),
+        'slug': (('slug',), lambda s: s.slug),
+        'name': (('name',), lambda s: s.name),
+        'icon': (('icon',), lambda s: s.icon),
+        'description': (('description',), lambda s: s.description),
+        'full_description': (('full_description',), lambda s: s.full_description),
+        'price_from': (('price_from',), lambda s: _number(s.price_from)),
+        'price_to': (('price_to',), lambda s: _number(s.price_to)),
+        'duration': (('duration',), lambda s: s.duration),
+        'is_popular': (('is_popular',), lambda s: s.is_popular),
+        'image': (('image',), lambda s: _file_url(s.image)),
+        'department_id': (('department_id',), lambda s: s.department_id),
+        'url': (('slug',), lambda s: s.get_absolute_url()),
+        'updated_at': (('updated_at',), lambda s: s.updated_at.isoformat()),
+    }
+    default_fields = ['id', 'slug', 'name', 'price_from', 'price_to', 'duration', 'url']
+
+
+class DoctorResource(Resource):
+    model = Doctor
+    name = 'doctors'
+    filters = {'is_available': True}
+    fields = {
+        'id': ((), lambda d: d.pk),
+        'slug': (('slug',), lambda d: d.slug),
+        'full_name': (('first_name', 'middle_name', 'last_name'), lambda d: d.get_full_name()),
+        'first_name': (('first_name',), lambda d: d.first_name),
+        'last_name': (('last_name',), lambda d: d.last_name),
+        'gender': (('gender',), lambda d: d.gender),
+        'photo': (('photo',), lambda d: _file_url(d.photo)),
+        'specialization': (('specialization',), lambda d: d.specialization),
+        'degree': (('degree',), lambda d: d.degree),
+        'experience_years': (('experience_years',), lambda d: d.experience_years),
+        'bio': (('bio',), lambda d: d.bio),
+        'education': (('education',), lambda d: d.education),
+        'achievements': (('achievements',), lambda d: d.achievements),
+        'phone': (('phone',), lambda d: d.phone),
+        'rating': (('rating',), lambda d: _number(d.rating)),
+        'patients_count': (('patients_count',), lambda d: d.patients_count),
+        'schedule': (
+            ('work_start', 'work_end', 'consultation_duration', *(f'is_{day}' for day in WEEKDAYS)), _schedule
+        ),
+        'department_id': (('department_id',), lambda d: d.department_id),
+        'url': (('slug',), lambda d: d.get_absolute_url()),
+        'updated_at': (('updated_at',), lambda d: d.updated_at.isoformat()),
+    }
+    default_fields = ['id', 'slug', 'full_name', 'specialization', 'experience_years', 'rating', 'url']
+
+
+RESOURCES = {
+    'departments': DepartmentResource(),
+    'services': ServiceResource(),
+    'doctors': DoctorResource(),
+}
+RESOURCES['departments'].embeds = {
+    'services': (RESOURCES['services'], 'many', 'department'),
+    'doctors': (RESOURCES['doctors'], 'many', 'department'),
+}
+RESOURCES['services'].embeds = {
+    'department': (RESOURCES['departments'], 'fk', 'department'),
+    'features': (FeatureResource(), 'many', 'service'),
+}
+RESOURCES['doctors'].embeds = {
+    'department': (RESOURCES['departments'], 'fk', 'department'),
+}
+# Javob shu modellarga bog'liq (include orqali)
+API_MODELS = (Department, Service, Doctor)
+
+
+def build_list(resource, params, path):
+    fields, include = resource.parse(params)
+    try:
+        limit = min(int(params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        cursor = int(params['cursor']) if params.get('cursor') else None
+    except ValueError:
+        raise APIError("limit va cursor butun son bo'lishi kerak")
+    if limit < 1:
+        raise APIError("limit musbat bo'lishi kerak")
+
+    queryset = resource.queryset(fields, include).order_by('pk')
+    facet_counts = None
+    if resource.model is Doctor:
+        # Shifokorlar: barcha filtrlar xotiradagi faset indeksidan (bo'lim slug -> id)
+        selected = parse_selected(params)
+        if 'department' in selected:
+            selected['department'] = [
+                str(pk) for pk in Department.objects.filter(slug__in=selected['department']).values_list('pk', flat=True)
+            ] or ['-']
+        ids, facet_counts = get_facet_index().query(selected)
+        if selected:
+            queryset = queryset.filter(pk__in=ids)
+    elif params.get('department') and resource.model is not Department:
+        queryset = queryset.filter(department__slug=params['department'])
+    if cursor is not None:
+        queryset = queryset.filter(pk__gt=cursor)
+
+    rows = list(queryset[:limit + 1])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        query = params.copy()
+        query['cursor'] = rows[-1].pk
+        next_url = f"{path}?{query.urlencode()}"
+    data = {
+        'results': [resource.serialize(obj, fields, include) for obj in rows],
+        'next': next_url,
+    }
+    if facet_counts is not None:
+        # Indeks bo'limlarni id bo'yicha sanaydi; API'da filtr qiymati bilan bir xil slug qaytariladi
+        slugs = dict(Department.objects.values_list('pk', 'slug'))
+        facet_counts = dict(facet_counts)
+        facet_counts['department'] = {
+            slugs[int(pk)]: count for pk, count in facet_counts.get('department', {}).items() if int(pk) in slugs
+        }
+        data['facets'] = facet_counts
+    return data
+
+
+def build_detail(resource, params, slug):
+    fields, include = resource.parse(params)
+    obj = resource.queryset(fields, include).filter(slug=slug).first()
+    if obj is None:
+        raise Http404
+    return resource.serialize(obj, fields, include)
+
+
+class CatalogueAPIView(View):
+    """GET /api/v1/<resurs>/ va /api/v1/<resurs>/<slug>/"""
+    resource_name = None
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, slug=None):
+        params = request.GET
+        key_source = f"{request.path}?{sorted(params.lists())}:{get_generations(*API_MODELS)}"
+        key = f"api:{hashlib.md5(key_source.encode()).hexdigest()}"
+
+        cached = cache.get(key)
+        if cached is None:
+            resource = RESOURCES[self.resource_name]
+            try:
+                if slug is None:
+                    data = build_list(resource, params, request.path)
+                else:
+                    data = build_detail(resource, params, slug)
+            except APIError as e:
+                return self.json_response(dumps({'error': str(e)}), status=400)
+            body = dumps(data)
+            cached = (f'"{hashlib.md5(body).hexdigest()}"', body)
+            cache.set(key, cached, API_CACHE_TIMEOUT)
+
+        etag, body = cached
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = self.json_response(body)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={API_MAX_AGE}'
+        return response
+
+    @staticmethod
+    def json_response(body, status=200):
+        return HttpResponse(body, content_type='application/json', status=status)
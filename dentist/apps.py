@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_fulltext_index(using, **kwargs):
+    from dentist.fulltext import ensure_fulltext_index
+    ensure_fulltext_index(connections[using])
 
 
 class DentistConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dentist"
+
+    def ready(self):
+        post_migrate.connect(ensure_fulltext_index, sender=self)
+
+        from dentist.caching import connect_generation_signals
+        from dentist import analytics, dashboard, facets, portal, suggest
+        connect_generation_signals()
+        suggest.connect_signals()
+        facets.connect_signals()
+        portal.connect_signals()
+        analytics.connect_signals()
+        dashboard.connect_signals()
@@ -0,0 +1,197 @@
+"""
+Shifokorlarning bo'sh vaqti: haftalik jadval + istisnolar
+
+- Vaqt o'qi: mahalliy vaqt bo'yicha daqiqalar (date.toordinal() * 1440 + daqiqa),
+  settings.TIME_ZONE (Asia/Tashkent) bo'yicha.
+- IntervalTree: boshlanishi bo'yicha saralangan massiv ustidagi muvozanatli
+  (implicit) daraxt, har bir tugunda pastki daraxtning eng katta tugashi.
+  Oraliq bilan kesishadiganlar O(log n + k) da topiladi.
+- ExceptionIndex: har bir shifokor (None - butun klinika) uchun yopiq
+  oraliqlar daraxti va qo'shimcha smenalar. ScheduleException avlodi
+  o'zgarguncha jarayon xotirasida saqlanadi.
+- doctor_availability: kunlar bo'yicha ish oraliqlari + qo'shimcha smenalar,
+  undan bir marta so'ralgan yopiq oraliqlar chiziqli o'tishda ayiriladi.
+"""
+
+import threading
+from datetime import date, datetime, time as dtime
+
+from django.utils import timezone
+
+from dentist.caching import get_generation
+
+MINUTES_PER_DAY = 24 * 60
+WEEKDAY_FIELDS = ['is_mon', 'is_tue', 'is_wed', 'is_thu', 'is_fri', 'is_sat', 'is_sun']
+
+
+def to_minute(moment, zone=None):
+    local = moment.astimezone(zone or timezone.get_default_timezone())
+    return local.toordinal() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+def from_minute(minute, zone=None):
+    # make_aware har chaqiruvda joriy zonani qidiradi; zona bir marta olinadi
+    day, rest = divmod(minute, MINUTES_PER_DAY)
+    return datetime.combine(
+        date.fromordinal(day), dtime(rest // 60, rest % 60), tzinfo=zone or timezone.get_default_timezone()
+    )
+
+
+def merge(spans):
+    """Kesishadigan/tutashgan oraliqlarni birlashtirish"""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IntervalTree:
+    """[boshlanish, tugash) oraliqlari uchun statik daraxt"""
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _ in intervals]
+        self.ends = [end for _, end in intervals]
+        self.max_end = [0] * len(intervals)
+        self._build(0, len(intervals) - 1)
+
+    def _build(self, left, right):
+        if left > right:
+            return float('-inf')
+        mid = (left + right) // 2
+        self.max_end[mid] = max(self.ends[mid], self._build(left, mid - 1), self._build(mid + 1, right))
+        return self.max_end[mid]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, lo, hi):
+        """[lo, hi) bilan kesishadigan oraliqlar (boshlanishi bo'yicha saralangan)"""
+        found = []
+        stack = [(0, len(self.starts) - 1)]
+        starts, ends, max_end = self.starts, self.ends, self.max_end
+        while stack:
+            left, right = stack.pop()
+            if left > right:
+                continue
+            mid = (left + right) // 2
+            # Pastki daraxtdagi hamma oraliq lo dan oldin tugaydi
+            if max_end[mid] <= lo:
+                continue
+            stack.append((left, mid - 1))
+            if starts[mid] < hi:
+                if ends[mid] > lo:
+                    found.append(mid)
+                stack.append((mid + 1, right))
+        found.sort()
+        return [(starts[i], ends[i]) for i in found]
+
+
+EMPTY_TREE = IntervalTree([])
+
+
+def subtract(spans, blocked):
+    """Saralangan, kesishmaydigan spans'dan saralangan blocked'ni ayirish"""
+    result = []
+    position = 0
+    for start, end in spans:
+        # Bu oraliqdan oldin tugaganlarini o'tkazib yuboramiz
+        while position < len(blocked) and blocked[position][1] <= start:
+            position += 1
+        cursor = start
+        index = position
+        while index < len(blocked) and blocked[index][0] < end:
+            block_start, block_end = blocked[index]
+            if block_start > cursor:
+                result.append((cursor, block_start))
+            cursor = max(cursor, block_end)
+            index += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+class ExceptionIndex:
+    """Shifokorlar bo'yicha istisnolar (None kaliti - butun klinika)"""
+
+    def __init__(self, rows):
+        """rows: [(doctor_id, kind, boshlanish daqiqasi, tugash daqiqasi)]"""
+        from dentist.models import ScheduleException
+
+        blocked, extra = {}, {}
+        for doctor_id, kind, start, end in rows:
+            target = extra if kind == ScheduleException.KIND_EXTRA else blocked
+            target.setdefault(doctor_id, []).append((start, end))
+        self.blocked = {key: IntervalTree(merge(spans)) for key, spans in blocked.items()}
+        self.extra = {key: IntervalTree(spans) for key, spans in extra.items()}
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        zone = timezone.get_default_timezone()
+        return cls(
+            (doctor_id, kind, to_minute(starts_at, zone), to_minute(ends_at, zone))
+            for doctor_id, kind, starts_at, ends_at in queryset.values_list('doctor_id', 'kind', 'starts_at', 'ends_at')
+        )
+
+    def blocked_between(self, doctor_id, lo, hi):
+        own = self.blocked.get(doctor_id, EMPTY_TREE).overlapping(lo, hi)
+        clinic = self.blocked.get(None, EMPTY_TREE).overlapping(lo, hi)
+        return merge(own + clinic) if own and clinic else own or clinic
+
+    def extra_between(self, doctor_id, lo, hi):
+        return self.extra.get(doctor_id, EMPTY_TREE).overlapping(lo, hi)
+
+
+_lock = threading.Lock()
+_state = {'index': None, 'generation': None}
+
+
+def get_exception_index():
+    from dentist.models import ScheduleException
+
+    generation = get_generation(ScheduleException)
+    if _state['index'] is None or generation != _state['generation']:
+        index = ExceptionIndex.from_queryset(ScheduleException.objects.all())
+        with _lock:
+            _state.update(index=index, generation=generation)
+    return _state['index']
+
+
+def reset():
+    _state['index'] = None
+
+
+def free_minutes(doctor, start_date, end_date, index):
+    """[(boshlanish, tugash)] daqiqalarda, start_date..end_date (ikkalasi ham kiradi)"""
+    workdays = [getattr(doctor, field) for field in WEEKDAY_FIELDS]
+    opens = doctor.work_start.hour * 60 + doctor.work_start.minute
+    closes = doctor.work_end.hour * 60 + doctor.work_end.minute
+    length = (closes - opens) % MINUTES_PER_DAY or MINUTES_PER_DAY
+
+    first, last = start_date.toordinal(), end_date.toordinal()
+    lo, hi = first * MINUTES_PER_DAY, (last + 1) * MINUTES_PER_DAY
+    spans = []
+    for day in range(first, last + 1):
+        # date(1, 1, 1) - dushanba
+        if workdays[(day - 1) % 7]:
+            start = day * MINUTES_PER_DAY + opens
+            spans.append((start, min(start + length, hi)))
+    extra = index.extra_between(doctor.pk, lo, hi)
+    if extra:
+        spans = merge(spans + [(max(start, lo), min(end, hi)) for start, end in extra])
+    return subtract(spans, index.blocked_between(doctor.pk, lo, hi))
+
+
+def doctor_availability(doctor, start_date, end_date, index=None):
+    """Bo'sh oraliqlar [(boshlanish, tugash)] (aware datetime)"""
+    if index is None:
+        index = get_exception_index()
+    zone = timezone.get_default_timezone()
+    return [
+        (from_minute(start, zone), from_minute(end, zone))
+        for start, end in free_minutes(doctor, start_date, end_date, index)
+    ]
@@ -0,0 +1,42 @@
+"""
+So'rov siklidan tashqaridagi fon ishlari
+
+- submit(nom, funksiya): shu nomdagi ish hali bajarilmayotgan bo'lsa, uni
+  daemon thread'da ishga tushiradi; foydalanuvchi so'rovi DB'ga yozishni
+  kutmaydi.
+- Thread tugagach o'z DB ulanishlarini yopadi (request_finished'dagi
+  close_old_connections bu thread'ga taalluqli emas).
+- Jarayon ichida bir nomdagi ish bittadan ortiq bajarilmaydi; jarayonlar
+  orasidagi muvofiqlik chaqiruvchining vazifasi.
+"""
+
+import logging
+import threading
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_running = set()
+_lock = threading.Lock()
+
+
+def _run(name, func):
+    try:
+        func()
+    except Exception:
+        logger.exception("Fon ishi bajarilmadi: %s", name)
+    finally:
+        connections.close_all()
+        with _lock:
+            _running.discard(name)
+
+
+def submit(name, func):
+    """Returns: ish boshlandimi (shu nomdagi ish bajarilayotgan bo'lsa False)"""
+    with _lock:
+        if name in _running:
+            return False
+        _running.add(name)
+    threading.Thread(target=_run, args=(name, func), name=name, daemon=True).start()
+    return True
@@ -0,0 +1,95 @@
+"""
+Admin uchun to'plamli (set-based) amallar
+
+Tanlangan yozuvlar har bir qator uchun save() chaqirilmasdan, bitta
+UPDATE ... SET so'rovi bilan yangilanadi (F() ifodalari ham qo'llanadi,
+masalan patients_count = patients_count + 1). Juda katta tanlovlar pk
+bo'yicha bo'laklarga bo'linadi; har bir bo'lak alohida tranzaksiyada va
+unga bitta audit yozuvi (admin LogEntry) qo'shiladi. Cache esa barcha
+bo'laklardan keyin bir marta bekor qilinadi.
+
+add_counts - hisoblagich jadvallariga (faollik, sahifa ko'rishlari)
+to'plangan sonlarni qo'shish uchun.
+"""
+
+from collections import defaultdict
+
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from dentist.caching import bump_generation
+
+CHUNK_SIZE = 1000
+
+
+def iter_pk_chunks(queryset, chunk_size=CHUNK_SIZE):
+    """Tanlangan pk'larni bo'laklab qaytarish (OFFSET'siz, pk kursori bilan)"""
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        chunk_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1]
+
+
+def bulk_update(queryset, values, user=None, description='', chunk_size=CHUNK_SIZE):
+    """
+    Tanlangan yozuvlarni to'plamli yangilash.
+    values: {maydon: qiymat yoki F() ifodasi}
+    Returns: yangilangan qatorlar soni
+    """
+    model = queryset.model
+    values = dict(values)
+    # queryset.update() auto_now'ni qo'llamaydi
+    if any(f.name == 'updated_at' and getattr(f, 'auto_now', False) for f in model._meta.concrete_fields):
+        values.setdefault('updated_at', timezone.now())
+
+    content_type = ContentType.objects.get_for_model(model) if user is not None else None
+    total = 0
+    for chunk in iter_pk_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            updated = model._base_manager.filter(pk__in=chunk).update(**values)
+            if content_type is not None:
+                LogEntry.objects.create(
+                    user_id=user.pk,
+                    content_type=content_type,
+                    object_id=None,
+                    object_repr=f"{updated} ta {model._meta.verbose_name_plural}"[:200],
+                    action_flag=CHANGE,
+                    change_message=f"Ommaviy amal: {description} (id {chunk[0]}..{chunk[-1]}, {updated} ta)",
+                )
+        total += updated
+
+    if total:
+        transaction.on_commit(lambda: bump_generation(model))
+    return total
+
+
+def add_counts(model, key_fields, increments):
+    """
+    Hisoblagich qatorlariga qo'shish: {(kalit qiymatlari): {maydon: +n}}.
+    key_fields - modeldagi unique constraint maydonlari. Yo'q qatorlar nol bilan
+    yaratiladi, keyin bir xil o'sishli qatorlar (kalitning oxirgi maydoni
+    bo'yicha __in) bitta UPDATE bilan yangilanadi.
+    """
+    *prefix_fields, last_field = key_fields
+    groups = defaultdict(list)
+    for key, deltas in increments.items():
+        groups[key[:-1], tuple(sorted(deltas.items()))].append(key[-1])
+
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [model(**dict(zip(key_fields, key))) for key in increments], ignore_conflicts=True
+        )
+        for (prefix, deltas), values in groups.items():
+            model.objects.filter(**dict(zip(prefix_fields, prefix)), **{f'{last_field}__in': values}).update(
+                **{name: F(name) + n for name, n in deltas}
+            )
@@ -0,0 +1,94 @@
+"""
+Model "avlodlari" (generation) orqali cache'ni bekor qilish
+
+Har bir model uchun cache'da butun son saqlanadi. Model ma'lumotlari
+o'zgarganda son bittaga oshiriladi; shu songa bog'langan cache kalitlari
+o'z-o'zidan eskiradi (ularni birma-bir o'chirish shart emas).
+"""
+
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+GENERATION_KEY = 'generation:{label}'
+VIEW_CACHE_TIMEOUT = 24 * 3600
+
+
+def _key(model):
+    return GENERATION_KEY.format(label=model._meta.label_lower)
+
+
+def get_generation(model):
+    return cache.get(_key(model), 0)
+
+
+def get_generations(*models):
+    """Bir nechta model avlodi bitta satrda (cache kaliti uchun)"""
+    values = cache.get_many([_key(model) for model in models])
+    return '.'.join(str(values.get(_key(model), 0)) for model in models)
+
+
+def bump_generation(*models):
+    """Modellar avlodini oshirish (har bir model uchun bitta cache yozuvi)"""
+    for model in dict.fromkeys(models):
+        try:
+            cache.incr(_key(model))
+        except ValueError:
+            cache.set(_key(model), 1, timeout=None)
+
+
+def tracked_models():
+    """Model -> o'zgarganda avlodi oshiriladigan modellar"""
+    from dentist.models import (
+        Appointment, Department, DepartmentFeature, Doctor, Review, ScheduleException, ScheduleInterval, Service,
+        ServiceFeature, SiteSettings, WorkingHour
+    )
+
+    return {
+        Department: (Department,),
+        DepartmentFeature: (Department,),
+        WorkingHour: (Department,),
+        Service: (Service,),
+        ServiceFeature: (Service,),
+        Doctor: (Doctor,),
+        ScheduleInterval: (ScheduleInterval,),
+        ScheduleException: (ScheduleException,),
+        Appointment: (Appointment,),
+        Review: (Review,),
+        SiteSettings: (SiteSettings,),
+    }
+
+
+def connect_generation_signals():
+    """Bitta obyekt saqlanganda/o'chirilganda avlodni oshirish (tranzaksiya tugagach)"""
+    for sender, models in tracked_models().items():
+        def receiver(sender, models=models, **kwargs):
+            transaction.on_commit(lambda: bump_generation(*models))
+        post_save.connect(receiver, sender=sender, weak=False, dispatch_uid=f'generation:{sender.__name__}:save')
+        post_delete.connect(receiver, sender=sender, weak=False, dispatch_uid=f'generation:{sender.__name__}:delete')
+
+
+def cache_by_generation(*models, timeout=VIEW_CACHE_TIMEOUT):
+    """
+    GET javobini modellar avlodi o'zgarguncha cache'da saqlash.
+    Kalit: sxema + host + yo'l + so'rov parametrlari + avlodlar (sitemap'da
+    absolyut URL'lar so'rov hostidan yasaladi).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = f"view:{request.scheme}://{request.get_host()}{request.get_full_path()}:{get_generations(*models)}"
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                if response.status_code == 200:
+                    cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
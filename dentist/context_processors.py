@@ -7,6 +7,10 @@ from dentist.models import SiteSettings
 
 def site_settings(request):
     """Barcha template'larga site_settings ni qo'shadi"""
+    # Async view'lar sozlamalarni oldindan request'ga yuklab qo'yadi
+    settings = getattr(request, 'site_settings', None)
+    if settings is None:
+        settings = SiteSettings.get_settings()
     return {
-        'site_settings': SiteSettings.get_settings()
+        'site_settings': settings
     }
@@ -0,0 +1,186 @@
+"""
+Admin bosh sahifasi (Boshqaruv Paneli) statistikasi
+
+Xom jadvallarda COUNT/GROUP BY o'rniga kichik yig'indi jadvallari:
+- DailyStat: kun bo'yicha yangi xabarlar va qabullar (yaratilganda +1)
+- InboxStat: bo'lim bo'yicha jami va o'qilmagan xabarlar (yaratish,
+  o'chirish, is_read yoki bo'lim o'zgarishi)
+
+Signallar o'zgarish bilan bir tranzaksiyada F() ifodalari bilan yangilaydi.
+Signal yubormaydigan ommaviy "O'qilgan/O'qilmagan" amallari set_read()
+orqali o'tadi. rebuild() yig'indilarni xom jadvallardan qayta hisoblaydi
+(ma'lumotlar qo'lda o'zgartirilgan bo'lsa).
+
+Sahifa: DailyStat'dan oxirgi kunlar oralig'i, InboxStat (bo'limlar soniga
+teng qatorlar) va kunlik sahifa ko'rishlari yig'indilaridan top sahifalar.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.utils import timezone
+
+from dentist import analytics, bulk
+from dentist.models import Appointment, ContactMessage, DailyStat, Department, InboxStat
+
+DAYS = 14
+TOP_PAGES_DAYS = 7
+INBOX_FIELDS = ('department_id', 'is_read')
+
+
+def add_daily(day, **deltas):
+    bulk.add_counts(DailyStat, ('day',), {(day,): deltas})
+
+
+def inbox_state(message):
+    """(bo'lim kaliti, o'qilmaganmi)"""
+    return message.department_id or 0, not message.is_read
+
+
+def apply_inbox_change(old, new):
+    """old/new: inbox_state() yoki None (xabar yo'q)"""
+    if old == new:
+        return
+    deltas = defaultdict(lambda: defaultdict(int))
+    for state, sign in ((old, -1), (new, 1)):
+        if state is not None:
+            key, unread = state
+            deltas[key]['total'] += sign
+            deltas[key]['unread'] += sign * unread
+    increments = {
+        (key,): {name: n for name, n in values.items() if n}
+        for key, values in deltas.items() if any(values.values())
+    }
+    if increments:
+        bulk.add_counts(InboxStat, ('department_key',), increments)
+
+
+def set_read(queryset, is_read, user=None, description=''):
+    """Xabarlarni ommaviy o'qilgan/o'qilmagan qilish. Returns: o'zgargan xabarlar soni"""
+    with transaction.atomic():
+        # Qatorlar qulflanadi: parallel amal bir xabarni ikki marta hisoblamaydi
+        pks = list(queryset.exclude(is_read=is_read).select_for_update().values_list('pk', flat=True))
+        changing = ContactMessage.objects.filter(pk__in=pks)
+        sign = -1 if is_read else 1
+        increments = {
+            (row['department_id'] or 0,): {'unread': sign * row['n']}
+            for row in changing.order_by().values('department_id').annotate(n=Count('pk'))
+        }
+        if increments:
+            bulk.add_counts(InboxStat, ('department_key',), increments)
+        return bulk.bulk_update(changing, {'is_read': is_read}, user=user, description=description)
+
+
+def collect():
+    """Xom jadvallardan yig'indilar: (DailyStat maydonlari, InboxStat maydonlari) ro'yxatlari"""
+    daily = defaultdict(lambda: {'messages': 0, 'bookings': 0})
+    for model, field in ((ContactMessage, 'messages'), (Appointment, 'bookings')):
+        rows = model.objects.annotate(day=TruncDate('created_at', tzinfo=timezone.get_default_timezone()))
+        for row in rows.order_by().values('day').annotate(n=Count('pk')):
+            daily[row['day']][field] = row['n']
+    inbox = defaultdict(lambda: {'total': 0, 'unread': 0})
+    for row in ContactMessage.objects.order_by().values('department_id', 'is_read').annotate(n=Count('pk')):
+        values = inbox[row['department_id'] or 0]
+        values['total'] += row['n']
+        if not row['is_read']:
+            values['unread'] += row['n']
+    return (
+        [{'day': day, **values} for day, values in daily.items()],
+        [{'department_key': key, **values} for key, values in inbox.items()],
+    )
+
+
+def rebuild():
+    """Yig'indilarni xom jadvallardan qayta hisoblash"""
+    daily, inbox = collect()
+    with transaction.atomic():
+        DailyStat.objects.all().delete()
+        InboxStat.objects.all().delete()
+        DailyStat.objects.bulk_create([DailyStat(**values) for values in daily])
+        InboxStat.objects.bulk_create([InboxStat(**values) for values in inbox])
+
+
+def dashboard(today=None):
+    """Bosh sahifa ma'lumotlari (bir nechta indeksli o'qish)"""
+    today = today or timezone.localdate()
+    first = today - timedelta(days=DAYS - 1)
+    stats = {stat.day: stat for stat in DailyStat.objects.filter(day__gte=first, day__lte=today)}
+    days = []
+    for offset in range(DAYS):
+        day = first + timedelta(days=offset)
+        stat = stats.get(day)
+        days.append({'day': day, 'messages': stat.messages if stat else 0, 'bookings': stat.bookings if stat else 0})
+    peak = max((max(row['messages'], row['bookings']) for row in days), default=0) or 1
+    for row in days:
+        row['messages_percent'] = round(row['messages'] * 100 / peak)
+        row['bookings_percent'] = round(row['bookings'] * 100 / peak)
+
+    inbox = list(InboxStat.objects.filter(total__gt=0))
+    names = dict(Department.objects.filter(pk__in=[stat.department_key for stat in inbox]).values_list('pk', 'name'))
+    departments = sorted(
+        ({'name': names.get(stat.department_key, "Bo'limsiz"), 'unread': stat.unread, 'total': stat.total}
+         for stat in inbox),
+        key=lambda row: (-row['unread'], row['name']),
+    )
+    return {
+        'days': days,
+        'today': days[-1],
+        'week_messages': sum(row['messages'] for row in days[-7:]),
+        'week_bookings': sum(row['bookings'] for row in days[-7:]),
+        'unread_total': sum(row['unread'] for row in departments),
+        'departments': departments,
+        'top_pages': analytics.top_pages(TOP_PAGES_DAYS, today=today),
+    }
+
+
+def _remember_message(sender, instance, **kwargs):
+    # only()/defer() bilan o'qilganda deferred maydonga murojaat qo'shimcha so'rov bo'lardi
+    if instance.pk is not None and all(name in instance.__dict__ for name in INBOX_FIELDS):
+        instance._inbox_state = inbox_state(instance)
+
+
+def _message_pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or hasattr(instance, '_inbox_state'):
+        return
+    row = ContactMessage.objects.filter(pk=instance.pk).values_list(*INBOX_FIELDS).first()
+    instance._inbox_state = (row[0] or 0, not row[1]) if row else None
+
+
+def _message_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add_daily(timezone.localdate(instance.created_at), messages=1)
+    previous = None if created else getattr(instance, '_inbox_state', None)
+    instance._inbox_state = inbox_state(instance)
+    apply_inbox_change(previous, instance._inbox_state)
+
+
+def _message_deleted(sender, instance, **kwargs):
+    apply_inbox_change(inbox_state(instance), None)
+
+
+def _department_deleted(sender, instance, **kwargs):
+    # Xabarlar bo'limsiz qoladi (SET_NULL signal'siz UPDATE): hisoblar ham ko'chiriladi
+    stat = InboxStat.objects.filter(department_key=instance.pk).first()
+    if stat is not None:
+        bulk.add_counts(InboxStat, ('department_key',), {(0,): {'total': stat.total, 'unread': stat.unread}})
+        stat.delete()
+
+
+def _appointment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_daily(timezone.localdate(instance.created_at), bookings=1)
+
+
+def connect_signals():
+    post_init.connect(_remember_message, sender=ContactMessage, dispatch_uid='dashboard_remember_message')
+    pre_save.connect(_message_pre_save, sender=ContactMessage, dispatch_uid='dashboard_message_pre_save')
+    post_save.connect(_message_saved, sender=ContactMessage, dispatch_uid='dashboard_message_saved')
+    post_delete.connect(_message_deleted, sender=ContactMessage, dispatch_uid='dashboard_message_deleted')
+    post_delete.connect(_department_deleted, sender=Department, dispatch_uid='dashboard_department_deleted')
+    post_save.connect(_appointment_saved, sender=Appointment, dispatch_uid='dashboard_appointment_saved')
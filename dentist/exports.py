@@ -0,0 +1,167 @@
+"""
+Ma'lumotlarni CSV/XLSX ko'rinishida eksport qilish
+
+Qatorlar queryset.iterator(chunk_size=...) orqali bo'lak-bo'lak o'qiladi va
+darhol yoziladi, shuning uchun xotira sarfi qatorlar soniga bog'liq emas.
+CSV javobi StreamingHttpResponse bilan oqim sifatida yuboriladi.
+XLSX uchun openpyxl (ixtiyoriy) kerak; fayl write-only rejimda vaqtinchalik
+faylga yoziladi va FileResponse bilan qaytariladi.
+"""
+
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from dentist.models import ContactMessage, Doctor, Service
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+CHUNK_SIZE = 2000
+# Jadval dasturlari shu belgilar bilan boshlangan CSV katagini formula deb bajaradi (CSV injection).
+# openpyxl esa faqat '=' bilan boshlangan matnni formula sifatida yozadi
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+XLSX_FORMULA_PREFIXES = ('=',)
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _local(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def safe_cell(value, prefixes=FORMULA_PREFIXES):
+    """Formula bo'lib qolishi mumkin bo'lgan matn oldiga ' qo'yish"""
+    if isinstance(value, str) and value.startswith(prefixes):
+        return "'" + value
+    return value
+
+
+def _text(getter):
+    """Erkin matn ustuni: formula himoyasi faqat shularga (telefon va sonlar tekshirilgan, o'zgarmaydi)"""
+    getter.free_text = True
+    return getter
+
+
+def _yes_no(value):
+    if value is None:
+        return ''
+    return 'Ha' if value else "Yo'q"
+
+
+# Model -> [(ustun sarlavhasi, qiymat olish funksiyasi)]
+EXPORT_COLUMNS = {
+    ContactMessage: [
+        ('ID', lambda m: m.pk),
+        ('Yaratilgan', lambda m: _local(m.created_at)),
+        ('Ism', _text(lambda m: m.name)),
+        ('Telefon', lambda m: m.phone),
+        ('Email', _text(lambda m: m.email or '')),
+        ('Mavzu', _text(lambda m: m.subject)),
+        ('Xabar', _text(lambda m: m.message)),
+        ("O'qilgan", lambda m: _yes_no(m.is_read)),
+        ('Yuborilgan soni', lambda m: m.duplicate_count),
+        ('Spam', lambda m: _yes_no(m.is_spam)),
+    ],
+    Doctor: [
+        ('ID', lambda d: d.pk),
+        ('F.I.Sh', _text(lambda d: d.get_full_name())),
+        ("Bo'lim", _text(lambda d: d.department.name)),
+        ('Mutaxassislik', _text(lambda d: d.specialization)),
+        ('Tajriba yili', lambda d: d.experience_years),
+        ('Telefon', lambda d: d.phone),
+        ('Reyting', lambda d: d.rating),
+        ('Bemorlar soni', lambda d: d.patients_count),
+        ('Ish kunlari', lambda d: d.get_working_days()),
+        ('Ish soatlari', lambda d: d.get_working_hours()),
+        ('Mavjud', lambda d: _yes_no(d.is_available)),
+    ],
+    Service: [
+        ('ID', lambda s: s.pk),
+        ('Nomi', _text(lambda s: s.name)),
+        ("Bo'lim", _text(lambda s: s.department.name)),
+        ('Narx (dan)', lambda s: s.price_from if s.price_from is not None else ''),
+        ('Narx (gacha)', lambda s: s.price_to if s.price_to is not None else ''),
+        ('Davomiyligi (daqiqa)', lambda s: s.duration if s.duration is not None else ''),
+        ('Mashhur', lambda s: _yes_no(s.is_popular)),
+        ('Faol', lambda s: _yes_no(s.is_active)),
+    ],
+}
+
+# Eksportda kerak bo'ladigan bog'liq jadvallar (qator uchun qo'shimcha so'rov bo'lmasligi uchun)
+SELECT_RELATED = {
+    Doctor: ['department'],
+    Service: ['department'],
+}
+
+
+class Echo:
+    """csv.writer uchun: yozilgan qatorni saqlamay qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+def prepare_queryset(queryset):
+    related = SELECT_RELATED.get(queryset.model)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE, prefixes=FORMULA_PREFIXES):
+    """Sarlavha va qatorlar (qiymatlar ro'yxati) generatori"""
+    columns = EXPORT_COLUMNS[queryset.model]
+    yield [header for header, _ in columns]
+    for obj in prepare_queryset(queryset).iterator(chunk_size=chunk_size):
+        yield [
+            safe_cell(getter(obj), prefixes) if getattr(getter, 'free_text', False) else getter(obj)
+            for _, getter in columns
+        ]
+
+
+def iter_csv(queryset, chunk_size=CHUNK_SIZE):
+    """CSV matn bo'laklari (Excel to'g'ri ochishi uchun BOM bilan)"""
+    writer = csv.writer(Echo())
+    yield '\ufeff'
+    for row in iter_rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def write_csv(queryset, stream, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(stream)
+    for row in iter_rows(queryset, chunk_size):
+        writer.writerow(row)
+
+
+def write_xlsx(queryset, stream, chunk_size=CHUNK_SIZE):
+    if Workbook is None:
+        raise ImportError("XLSX eksport uchun openpyxl o'rnatilishi kerak")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=queryset.model._meta.verbose_name_plural[:31])
+    for row in iter_rows(queryset, chunk_size, XLSX_FORMULA_PREFIXES):
+        sheet.append(row)
+    workbook.save(stream)
+
+
+def export_filename(queryset, extension):
+    return f"{queryset.model._meta.model_name}_{timezone.localtime():%Y%m%d_%H%M}.{extension}"
+
+
+def csv_response(queryset):
+    response = StreamingHttpResponse(iter_csv(queryset), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(queryset, "csv")}"'
+    return response
+
+
+def xlsx_response(queryset):
+    # Xotirada emas, vaqtinchalik faylda (1 MB dan keyin diskka o'tadi)
+    stream = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    write_xlsx(queryset, stream)
+    stream.seek(0)
+    return FileResponse(
+        stream, as_attachment=True, filename=export_filename(queryset, 'xlsx'), content_type=XLSX_CONTENT_TYPE
+    )
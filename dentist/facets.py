@@ -0,0 +1,197 @@
+"""
+Shifokorlar uchun faset (bo'lim, jins, tajriba, reyting, ish kuni) filtrlari
+
+Har bir faset qiymati uchun shifokorlar to'plami bitset (Python int) sifatida
+saqlanadi: bit o'rni - shifokorning ro'yxatdagi tartib raqami. Filtrlar
+kesishmasi va har bir qiymat bo'yicha sonlar xotirada AND/OR va bit_count
+bilan hisoblanadi, so'rov uchun GROUP BY bajarilmaydi.
+
+Tanlov qoidasi: bitta faset ichida OR, fasetlar o'rtasida AND. Har bir
+faset qiymati soni shu fasetdan boshqa tanlovlar bo'yicha hisoblanadi.
+Indeks Doctor avlodi (generation) o'zgarganda qayta quriladi.
+"""
+
+import threading
+import time
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from dentist.caching import get_generation
+
+# Avlod tekshiruvlari orasidagi vaqt (soniya)
+GENERATION_CHECK_INTERVAL = 5
+
+EXPERIENCE_BANDS = [
+    ('0-4', "5 yilgacha", 0, 4),
+    ('5-9', "5-9 yil", 5, 9),
+    ('10-19', "10-19 yil", 10, 19),
+    ('20+', "20 yildan ortiq", 20, None),
+]
+RATING_THRESHOLDS = [
+    ('4.5', "4.5 va yuqori", 4.5),
+    ('4', "4 va yuqori", 4.0),
+    ('3', "3 va yuqori", 3.0),
+]
+WEEKDAYS = [
+    ('mon', 'Dushanba'), ('tue', 'Seshanba'), ('wed', 'Chorshanba'), ('thu', 'Payshanba'),
+    ('fri', 'Juma'), ('sat', 'Shanba'), ('sun', 'Yakshanba'),
+]
+GENDERS = [('M', 'Erkak'), ('F', 'Ayol')]
+
+# Faset -> so'rov parametri (HTML va API'da bir xil)
+FACETS = ['department', 'gender', 'experience', 'rating', 'day']
+LABELS = {
+    'gender': dict(GENDERS),
+    'experience': {key: label for key, label, _, _ in EXPERIENCE_BANDS},
+    'rating': {key: label for key, label, _ in RATING_THRESHOLDS},
+    'day': dict(WEEKDAYS),
+}
+
+
+def row_values(row):
+    """Bitta shifokor uchun faset -> qiymatlar"""
+    experience = row['experience_years']
+    rating = float(row['rating'])
+    return {
+        'department': [str(row['department_id'])],
+        'gender': [row['gender']],
+        'experience': [
+            key for key, _, low, high in EXPERIENCE_BANDS if experience >= low and (high is None or experience <= high)
+        ],
+        'rating': [key for key, _, threshold in RATING_THRESHOLDS if rating >= threshold],
+        'day': [day for day, _ in WEEKDAYS if row[f'is_{day}']],
+    }
+
+
+def iter_bits(bits):
+    """O'rnatilgan bitlarning o'rinlari (o'sish tartibida)"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class FacetIndex:
+    def __init__(self, rows):
+        # rows ko'rsatish tartibida (order, last_name, first_name)
+        self.ids = [row['id'] for row in rows]
+        self.positions = {pk: position for position, pk in enumerate(self.ids)}
+        self.all = (1 << len(self.ids)) - 1
+        self.bits = {facet: {} for facet in FACETS}
+        for position, row in enumerate(rows):
+            bit = 1 << position
+            for facet, values in row_values(row).items():
+                for value in values:
+                    self.bits[facet][value] = self.bits[facet].get(value, 0) | bit
+
+    def mask_for_ids(self, ids):
+        mask = 0
+        for pk in ids:
+            position = self.positions.get(pk)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def query(self, selected, base=None):
+        """
+        selected: {faset: [qiymatlar]}, base: qo'shimcha cheklov (masalan matnli qidiruv) bitmask'i
+        Returns: (tartiblangan shifokor id'lari, {faset: {qiymat: son}})
+        """
+        base = self.all if base is None else base & self.all
+        masks = {}
+        for facet, values in selected.items():
+            if facet in self.bits and values:
+                mask = 0
+                for value in values:
+                    mask |= self.bits[facet].get(value, 0)
+                masks[facet] = mask
+
+        result = base
+        for mask in masks.values():
+            result &= mask
+
+        counts = {}
+        for facet, values in self.bits.items():
+            others = base
+            for other, mask in masks.items():
+                if other != facet:
+                    others &= mask
+            counts[facet] = {value: (bits & others).bit_count() for value, bits in values.items()}
+        return [self.ids[position] for position in iter_bits(result)], counts
+
+
+_lock = threading.Lock()
+_state = {'index': None, 'generation': None, 'checked_at': 0.0}
+
+
+def build_index():
+    from dentist.models import Doctor
+
+    rows = list(
+        Doctor.objects.filter(is_available=True).order_by('order', 'last_name', 'first_name', 'pk').values(
+            'id', 'department_id', 'gender', 'experience_years', 'rating', *(f'is_{day}' for day, _ in WEEKDAYS)
+        )
+    )
+    return FacetIndex(rows)
+
+
+def get_facet_index():
+    """Indeks (Doctor avlodi o'zgargan bo'lsa qayta quriladi)"""
+    from dentist.models import Doctor
+
+    now = time.monotonic()
+    if _state['index'] is None or now - _state['checked_at'] > GENERATION_CHECK_INTERVAL:
+        generation = get_generation(Doctor)
+        if _state['index'] is None or generation != _state['generation']:
+            index = build_index()
+            with _lock:
+                _state.update(index=index, generation=generation)
+        _state['checked_at'] = now
+    return _state['index']
+
+
+def reset():
+    """Keyingi so'rovda indeksni qayta qurish (testlar va signal'siz o'zgarishlar uchun)"""
+    _state['index'] = None
+
+
+def parse_selected(params):
+    """So'rov parametrlaridan tanlangan faset qiymatlari (?gender=F&day=sat&day=sun)"""
+    selected = {}
+    for facet in FACETS:
+        values = [value for raw in params.getlist(facet) for value in raw.split(',') if value]
+        if values:
+            selected[facet] = values
+    return selected
+
+
+def _on_change(sender, **kwargs):
+    transaction.on_commit(reset)
+
+
+def connect_signals():
+    from dentist.models import Doctor
+
+    post_save.connect(_on_change, sender=Doctor, dispatch_uid='facets:doctor:save')
+    post_delete.connect(_on_change, sender=Doctor, dispatch_uid='facets:doctor:delete')
+
+
+def facet_groups(counts, selected, department_labels):
+    """Template uchun: [{'name', 'title', 'options': [{'value', 'label', 'count', 'selected'}]}]"""
+    labels = dict(LABELS, department=department_labels)
+    titles = {
+        'department': "Bo'lim", 'gender': 'Jinsi', 'experience': 'Tajriba', 'rating': 'Reyting', 'day': 'Ish kuni',
+    }
+    groups = []
+    for facet in FACETS:
+        chosen = set(selected.get(facet, []))
+        groups.append({
+            'name': facet,
+            'title': titles[facet],
+            'options': [
+                {'value': value, 'label': label, 'count': counts[facet].get(value, 0), 'selected': value in chosen}
+                for value, label in labels[facet].items()
+            ],
+        })
+    return groups
@@ -3,11 +3,12 @@ import re
 from django import forms
 from django.core.exceptions import ValidationError
 
-from dentist.models import ContactMessage
+from dentist.models import ContactMessage, Review
 
 
 class ContactForm(forms.ModelForm):
-    """Bog'lanish formasi"""
+    """Bog'lanish formasi (bo'limlar oldindan olingan ro'yxatdan - validatsiyada DB so'rovi yo'q)"""
+    department = forms.ChoiceField(label="Bo'lim", required=False, widget=forms.Select(attrs={'class': 'form-select'}))
 
     class Meta:
         model = ContactMessage
@@ -32,6 +33,21 @@ class ContactForm(forms.ModelForm):
             'message': 'Kamida 13 ta belgi kiriting',
         }
 
+    def __init__(self, *args, departments=(), **kwargs):
+        """departments: faol bo'limlar (view async oladi)"""
+        super().__init__(*args, **kwargs)
+        self.departments = {str(department.pk): department for department in departments}
+        self.fields['department'].choices = [('', "Bo'limni tanlang (ixtiyoriy)")] + [
+            (pk, department.name) for pk, department in self.departments.items()
+        ]
+
+    def clean_department(self):
+        return self.departments.get(self.cleaned_data.get('department'))
+
+    def save(self, commit=True):
+        self.instance.department = self.cleaned_data.get('department')
+        return super().save(commit)
+
     def clean_name(self):
         """Ism validatsiyasi"""
         name =self.cleaned_data.get('name')
@@ -96,6 +112,18 @@ class ContactForm(forms.ModelForm):
 
 
 
+class CatalogueImportForm(forms.Form):
+    """Admin'da katalogni fayldan import qilish"""
+    FORMAT_CHOICES = [
+        ('', "Fayl kengaytmasi bo'yicha"),
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+    ]
+
+    file = forms.FileField(label="Fayl", help_text="CSV (sarlavha qatori bilan) yoki JSON (obyektlar ro'yxati)")
+    file_format = forms.ChoiceField(label="Format", choices=FORMAT_CHOICES, required=False)
+
+
 def validate_uzbek_phone(phone: str) -> str:
     """
     O'zbekiston telefon raqamini tekshirish.
@@ -121,4 +149,28 @@ def validate_uzbek_phone(phone: str) -> str:
     if not phone.startswith('+'):
         phone = '+' + phone
 
-    return phone
\ No newline at end of file
+    return phone
+
+class ReviewForm(forms.ModelForm):
+    """Shifokor haqida sharh"""
+
+    class Meta:
+        model = Review
+        fields = ['patient_name', 'rating', 'comment']
+        widgets = {
+            'patient_name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ismingiz'}),
+            'rating': forms.Select(attrs={'class': 'form-select'}),
+            'comment': forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'Fikringiz...'}),
+        }
+
+    def clean_patient_name(self):
+        name = ' '.join(self.cleaned_data.get('patient_name', '').split())
+        if len(name) < 2:
+            raise ValidationError("Ism kamida 2 ta harfdan iborat bo'lishi kerak")
+        return name
+
+    def clean_comment(self):
+        comment = self.cleaned_data.get('comment', '').strip()
+        if len(comment) < 10:
+            raise ValidationError("Sharh kamida 10 ta belgidan iborat bo'lishi kerak")
+        return comment
@@ -0,0 +1,96 @@
+"""
+Bog'lanish xabarlari uchun full-text qidiruv indeksi
+
+- SQLite: FTS5 virtual jadval (external content) va uni sinxron ushlab
+  turuvchi triggerlar.
+- PostgreSQL: to_tsvector ifodasi bo'yicha GIN indeks.
+Boshqa DB'larda admin odatiy icontains qidiruvidan foydalanadi.
+
+Indeks post_migrate signalida yaratiladi/tekshiriladi (idempotent). SQLite'da
+Django jadvalni qayta yaratganda (ALTER) triggerlar o'chib ketadi, shuning
+uchun har bir migrate'dan keyin ular qayta tiklanadi va indeks qayta quriladi.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+TABLE = 'dentist_contactmessage'
+FTS_TABLE = 'dentist_contactmessage_fts'
+PG_INDEX = 'dentist_contactmessage_fts_idx'
+COLUMNS = ('name', 'email', 'subject', 'message')
+TOKEN_RE = re.compile(r"\w+")
+
+PG_VECTOR = "to_tsvector('simple', " + " || ' ' || ".join(f"coalesce({c}, '')" for c in COLUMNS) + ")"
+
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {', '.join(COLUMNS)})
+            VALUES (new.id, {', '.join(f'new.{c}' for c in COLUMNS)});
+        END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(COLUMNS)})
+            VALUES ('delete', old.id, {', '.join(f'old.{c}' for c in COLUMNS)});
+        END
+    """,
+    # Faqat matn ustunlari o'zgarganda (is_read va hisoblagichlar indeksga tegmaydi)
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {', '.join(COLUMNS)} ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(COLUMNS)})
+            VALUES ('delete', old.id, {', '.join(f'old.{c}' for c in COLUMNS)});
+            INSERT INTO {FTS_TABLE}(rowid, {', '.join(COLUMNS)})
+            VALUES (new.id, {', '.join(f'new.{c}' for c in COLUMNS)});
+        END
+    """,
+}
+
+
+def ensure_fulltext_index(connection):
+    """Indeks va triggerlarni yaratish (mavjud bo'lsa tegmaydi)"""
+    if TABLE not in connection.introspection.table_names():
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+                           [f'{FTS_TABLE}%'])
+            existing = {row[0] for row in cursor.fetchall()}
+            if existing >= {FTS_TABLE, *SQLITE_TRIGGERS}:
+                return
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(COLUMNS)}, content='{TABLE}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            # Trigger'siz davrda qo'shilgan qatorlar uchun indeksni qayta quramiz
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {TABLE} USING GIN ({PG_VECTOR})")
+
+
+def search_contact_messages(queryset, term):
+    """
+    Full-text qidiruv bilan filtrlangan queryset.
+    DB qo'llab-quvvatlamasa None (odatiy qidiruv ishlatiladi).
+    """
+    tokens = TOKEN_RE.findall(term.lower())
+    if not tokens:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        # Har bir so'z prefiks bo'yicha (AND)
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+    if vendor == 'postgresql':
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT id FROM {TABLE} WHERE {PG_VECTOR} @@ to_tsquery('simple', %s)", [query]
+        ))
+    return None
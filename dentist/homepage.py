@@ -0,0 +1,112 @@
+"""
+Bosh sahifa bo'limlari: har biri alohida keshlanadigan HTML fragment
+
+Har bir bo'lim (statistika, bo'limlar, mashhur xizmatlar, asosiy
+shifokorlar, sharhlar) o'zi ko'rsatadigan modellar avlodiga bog'langan
+kalit bilan saqlanadi. Shifokor o'zgarsa faqat shifokorlarga bog'liq
+fragmentlar qayta quriladi, qolganlari cache'dan olinadi.
+
+Sahifa uchun ikkita cache murojaati (avlodlar va fragmentlar get_many)
+yetarli; DB'ga faqat eskirgan fragmentlar uchun so'rov yuboriladi.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from dentist import popularity
+from dentist.caching import VIEW_CACHE_TIMEOUT, get_generations
+from dentist.models import Department, Doctor, PopularityRank, Review, Service, SiteSettings
+
+FRAGMENT_KEY = 'home:{name}:{generations}'
+DEPARTMENTS_LIMIT = 6
+SERVICES_LIMIT = 6
+DOCTORS_LIMIT = 3
+REVIEWS_LIMIT = 4
+
+
+def compact_number(value):
+    """25000 -> '25K+', 150 -> '150+'"""
+    if value >= 1000:
+        return f"{value // 1000}K+"
+    return f"{value}+"
+
+
+def hero_context():
+    settings = SiteSettings.get_settings()
+    return {
+        'site_settings': settings,
+        'patients': compact_number(settings.patients_count),
+        'years': compact_number(settings.years_experience),
+        'doctors_count': Doctor.objects.filter(is_available=True).count(),
+        'departments_count': Department.objects.filter(is_active=True).count(),
+        'services_count': Service.objects.filter(is_active=True).count(),
+    }
+
+
+def departments_context():
+    departments = list(Department.objects.filter(is_active=True).annotate(
+        doctors_count=Count('doctors', filter=Q(doctors__is_available=True), distinct=True),
+        services_count=Count('services', filter=Q(services__is_active=True), distinct=True),
+    ).order_by('order')[:DEPARTMENTS_LIMIT + 1])
+    # Rasmi bor birinchi bo'lim yuqorida katta ko'rinishda
+    featured = next((department for department in departments if department.image), None)
+    rest = [department for department in departments if department is not featured][:DEPARTMENTS_LIMIT]
+    return {'featured': featured, 'departments': rest}
+
+
+def services_context():
+    return {'services': popularity.popular_services(SERVICES_LIMIT)}
+
+
+def doctors_context():
+    return {
+        'doctors': popularity.featured_doctors(DOCTORS_LIMIT),
+        'departments': Department.objects.filter(is_active=True).order_by('order').values('pk', 'name'),
+    }
+
+
+def testimonials_context():
+    return {
+        'reviews': Review.objects.filter(status=Review.STATUS_APPROVED).select_related('doctor').only(
+            'patient_name', 'rating', 'comment', 'created_at',
+            'doctor__first_name', 'doctor__last_name', 'doctor__middle_name', 'doctor__slug',
+        )[:REVIEWS_LIMIT],
+    }
+
+
+# nomi -> (template, fragment bog'liq modellar, context funksiyasi)
+SECTIONS = {
+    'hero': ('partials/home/hero.html', (SiteSettings, Department, Doctor, Service), hero_context),
+    'departments': ('partials/home/departments.html', (Department, Doctor, Service), departments_context),
+    'services': ('partials/home/services.html', (Service, PopularityRank), services_context),
+    'doctors': ('partials/home/doctors.html', (Doctor, Department, PopularityRank), doctors_context),
+    'testimonials': ('partials/home/testimonials.html', (Review, Doctor), testimonials_context),
+}
+
+
+def fragment_keys():
+    """Bo'lim nomi -> joriy cache kaliti (barcha avlodlar bitta get_many bilan)"""
+    models = list(dict.fromkeys(model for _, section_models, _ in SECTIONS.values() for model in section_models))
+    generations = dict(zip(models, get_generations(*models).split('.')))
+    return {
+        name: FRAGMENT_KEY.format(name=name, generations='.'.join(generations[model] for model in section_models))
+        for name, (_, section_models, _) in SECTIONS.items()
+    }
+
+
+def render_sections():
+    """Bo'lim nomi -> HTML; faqat eskirgan fragmentlar qayta render qilinadi"""
+    keys = fragment_keys()
+    cached = cache.get_many(keys.values())
+    sections, missing = {}, {}
+    for name, key in keys.items():
+        html = cached.get(key)
+        if html is None:
+            template_name, _, get_context = SECTIONS[name]
+            html = missing[key] = render_to_string(template_name, get_context())
+        sections[name] = mark_safe(html)
+    if missing:
+        cache.set_many(missing, VIEW_CACHE_TIMEOUT)
+    return sections
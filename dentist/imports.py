@@ -0,0 +1,263 @@
+"""
+Katalogni (bo'limlar, xizmatlar, shifokorlar) CSV/JSON fayldan ommaviy import qilish
+
+- Barcha qatorlar avval xotirada tekshiriladi (full_clean, DB so'rovisiz).
+- Mavjud yozuvlar slug bo'yicha bitta in_bulk so'rovi bilan topiladi,
+  yangi slug'lar SlugAllocator orqali xotirada to'qnashuvsiz ajratiladi.
+- Yozish bulk_create/bulk_update bilan, har bir partiya alohida tranzaksiyada.
+- Xato qatorlar ro'yxatga yoziladi, qolgan qatorlar import qilinaveradi.
+- Xizmatlar uchun ServiceFeature'lar shu o'tishning o'zida yoziladi.
+"""
+
+import copy
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from dentist.caching import bump_generation
+from dentist.models import Department, Doctor, Service, ServiceFeature
+from dentist.slugs import SlugAllocator
+
+BATCH_SIZE = 500
+TRUE_VALUES = {'1', 'true', 'ha', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', "yo'q", 'yoq', 'no', 'n', 'f'}
+FEATURE_SEPARATOR = '|'
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, message))
+
+    def summary(self):
+        return f"{self.created} ta yaratildi, {self.updated} ta yangilandi, {len(self.errors)} ta xato"
+
+
+def read_rows(file, file_format=None):
+    """Yuklangan fayldan qatorlar (dict) ro'yxati"""
+    name = getattr(file, 'name', '') or ''
+    file_format = file_format or ('json' if name.lower().endswith('.json') else 'csv')
+    data = file.read()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+
+    if file_format == 'json':
+        try:
+            rows = json.loads(data)
+        except ValueError as e:
+            raise ValueError(f"JSON o'qib bo'lmadi: {e}")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON obyektlar ro'yxati bo'lishi kerak")
+        return rows
+    return list(csv.DictReader(io.StringIO(data)))
+
+
+def format_error(error):
+    if hasattr(error, 'message_dict'):
+        return '; '.join(f"{name}: {' '.join(messages)}" for name, messages in error.message_dict.items())
+    return ' '.join(getattr(error, 'messages', [str(error)]))
+
+
+class CatalogueImporter:
+    """Umumiy import mantiqi; har bir model uchun voris klass"""
+    model = None
+    fields = []
+    # full_clean'dan chiqarib tashlanadigan maydonlar (DB so'rovi yoki fayl talab qiladiganlar)
+    clean_exclude = ['slug']
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def natural_slug_source(self, row):
+        """slug ustuni bo'lmasa slug shu matndan yasaladi (standart: nomi)"""
+        return str(row.get('name') or '')
+
+    def prepare(self, rows):
+        """Qatorlarni tekshirishdan oldin bir martalik so'rovlar"""
+
+    def apply_relations(self, instance, row):
+        """FK maydonlarni o'rnatish (ValidationError ko'tarishi mumkin)"""
+
+    def write_children(self, created, updated):
+        """Bog'liq yozuvlar (xususiyatlar va h.k.)"""
+
+    def convert(self, name, value):
+        if isinstance(value, str):
+            value = value.strip()
+        model_field = self.model._meta.get_field(name)
+        if value == '' or value is None:
+            if model_field.null:
+                return None
+            if model_field.has_default():
+                return model_field.get_default()
+            return ''
+        if model_field.get_internal_type() == 'BooleanField' and isinstance(value, str):
+            lowered = value.lower()
+            if lowered in TRUE_VALUES:
+                return True
+            if lowered in FALSE_VALUES:
+                return False
+            raise ValidationError({name: [f"Noto'g'ri mantiqiy qiymat: {value}"]})
+        return value
+
+    def run(self, rows):
+        result = ImportResult()
+        slugs = [str(row.get('slug') or '').strip() for row in rows]
+        allocator = SlugAllocator(self.model)
+        keys = [slug or allocator.base(self.natural_slug_source(row)) for slug, row in zip(slugs, rows)]
+        existing = self.model.objects.in_bulk(set(keys), field_name='slug')
+        self.prepare(rows)
+
+        pending = []
+        used_keys = set()
+        for row_number, (row, slug, key) in enumerate(zip(rows, slugs, keys), start=1):
+            try:
+                if slug and slug in used_keys:
+                    raise ValidationError(f"slug faylda takrorlangan: {slug}")
+                instance = existing.get(key) if key not in used_keys else None
+                # Nusxada tekshiriladi: xato qator qiymatlari shu slug'li keyingi qatorga o'tmaydi
+                instance = copy.copy(instance) if instance is not None else self.model()
+                for name in self.fields:
+                    if name in row:
+                        setattr(instance, name, self.convert(name, row[name]))
+                self.apply_relations(instance, row)
+                instance.full_clean(exclude=self.clean_exclude, validate_unique=False)
+            except ValidationError as e:
+                result.add_error(row_number, format_error(e))
+                continue
+
+            if instance.pk is None:
+                # Fayl ichidagi bir xil nomlar alohida yozuv sifatida yaratiladi
+                instance.slug = allocator.allocate(slug or key)
+            used_keys.add(key)
+            pending.append((row_number, row, instance))
+
+        for start in range(0, len(pending), self.batch_size):
+            self.write_batch(pending[start:start + self.batch_size], result)
+        if result.created or result.updated:
+            # bulk_create/bulk_update signal yubormaydi: cache bir marta bekor qilinadi
+            transaction.on_commit(lambda: bump_generation(self.model))
+        return result
+
+    def write_batch(self, batch, result):
+        created = [(row, instance) for _, row, instance in batch if instance.pk is None]
+        updated = [(row, instance) for _, row, instance in batch if instance.pk is not None]
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create([instance for _, instance in created])
+                if any(instance.pk is None for _, instance in created):
+                    # RETURNING'ni qo'llamaydigan DB'lar uchun pk'larni slug bo'yicha olamiz
+                    pks = dict(self.model.objects.filter(
+                        slug__in=[instance.slug for _, instance in created]
+                    ).values_list('slug', 'pk'))
+                    for _, instance in created:
+                        instance.pk = pks[instance.slug]
+                if updated:
+                    # bulk_update auto_now'ni qo'llamaydi
+                    now = timezone.now()
+                    for _, instance in updated:
+                        instance.updated_at = now
+                    self.model.objects.bulk_update(
+                        [instance for _, instance in updated], self.update_fields() + ['updated_at']
+                    )
+                self.write_children(created, updated)
+        except DatabaseError as e:
+            for row_number, _, _ in batch:
+                result.add_error(row_number, f"Partiyani yozib bo'lmadi: {e}")
+            return
+        result.created += len(created)
+        result.updated += len(updated)
+
+    def update_fields(self):
+        return list(self.fields)
+
+
+class DepartmentImporter(CatalogueImporter):
+    model = Department
+    fields = ['name', 'icon', 'description', 'full_description', 'is_active', 'order']
+    clean_exclude = ['slug', 'image']
+
+
+class DepartmentRelatedImporter(CatalogueImporter):
+    """Bo'limga bog'langan modellar: bo'lim slug yoki nomi bo'yicha topiladi"""
+
+    def prepare(self, rows):
+        self.departments = {}
+        for department in Department.objects.all():
+            self.departments[department.slug] = department
+            self.departments[department.name.strip().lower()] = department
+
+    def apply_relations(self, instance, row):
+        value = str(row.get('department') or '').strip()
+        if not value and instance.department_id:
+            return
+        department = self.departments.get(value) or self.departments.get(value.lower())
+        if department is None:
+            raise ValidationError({'department': [f"Bo'lim topilmadi: {value or '-'}"]})
+        instance.department = department
+
+    def update_fields(self):
+        return list(self.fields) + ['department']
+
+
+class ServiceImporter(DepartmentRelatedImporter):
+    model = Service
+    fields = ['name', 'icon', 'description', 'full_description', 'price_from', 'price_to', 'duration',
+              'is_popular', 'is_active', 'order']
+    clean_exclude = ['slug', 'image', 'department']
+
+    @staticmethod
+    def parse_features(row):
+        """'features' ustuni: JSON'da ro'yxat, CSV'da '|' bilan ajratilgan matn"""
+        if 'features' not in row:
+            return None
+        value = row['features'] or []
+        if isinstance(value, str):
+            value = value.split(FEATURE_SEPARATOR)
+        return [str(text).strip() for text in value if str(text).strip()]
+
+    def write_children(self, created, updated):
+        with_features = [
+            (instance, features) for row, instance in created + updated
+            if (features := self.parse_features(row)) is not None
+        ]
+        if not with_features:
+            return
+        # Yangilangan xizmatlarning eski xususiyatlari almashtiriladi
+        updated_ids = {instance.pk for _, instance in updated}
+        ServiceFeature.objects.filter(
+            service_id__in=[instance.pk for instance, _ in with_features if instance.pk in updated_ids]
+        ).delete()
+        ServiceFeature.objects.bulk_create([
+            ServiceFeature(service=instance, text=text[:200], order=order)
+            for instance, features in with_features
+            for order, text in enumerate(features)
+        ])
+
+
+class DoctorImporter(DepartmentRelatedImporter):
+    model = Doctor
+    fields = ['first_name', 'last_name', 'middle_name', 'gender', 'specialization', 'degree', 'experience_years',
+              'bio', 'education', 'achievements', 'work_start', 'work_end', 'consultation_duration',
+              'is_mon', 'is_tue', 'is_wed', 'is_thu', 'is_fri', 'is_sat', 'is_sun',
+              'phone', 'rating', 'patients_count', 'is_available', 'is_futured', 'order']
+    clean_exclude = ['slug', 'photo', 'department', 'user']
+
+    def natural_slug_source(self, row):
+        return f"{row.get('first_name') or ''}-{row.get('last_name') or ''}"
+
+
+IMPORTERS = {
+    'departments': DepartmentImporter,
+    'services': ServiceImporter,
+    'doctors': DoctorImporter,
+}
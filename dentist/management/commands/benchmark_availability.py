@@ -0,0 +1,53 @@
+import random
+import time
+from datetime import time as dtime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dentist.availability import MINUTES_PER_DAY, ExceptionIndex, doctor_availability
+from dentist.models import Doctor, ScheduleException
+
+
+class Command(BaseCommand):
+    help = "Bo'sh vaqt hisoblash tezligi (DB'ga yozmaydi: shifokorlar va istisnolar xotirada yaratiladi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=1000)
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--exceptions', type=int, default=10, help="Har bir shifokorga istisnolar soni")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        start_date = timezone.localdate()
+        end_date = start_date + timedelta(days=options['days'] - 1)
+        first = start_date.toordinal() * MINUTES_PER_DAY
+        span = options['days'] * MINUTES_PER_DAY
+
+        doctors = [
+            Doctor(pk=pk, work_start=dtime(rng.choice([8, 9, 10])), work_end=dtime(rng.choice([16, 17, 18])),
+                   is_sat=rng.random() < 0.3)
+            for pk in range(1, options['doctors'] + 1)
+        ]
+        kinds = [ScheduleException.KIND_ABSENCE] * 3 + [ScheduleException.KIND_EXTRA]
+        rows = []
+        for doctor in doctors:
+            for _ in range(options['exceptions']):
+                start = first + rng.randrange(span)
+                rows.append((doctor.pk, rng.choice(kinds), start, start + rng.choice([120, 480, 3 * MINUTES_PER_DAY])))
+        # Butun klinika uchun bayramlar
+        for _ in range(3):
+            day = first + rng.randrange(options['days']) * MINUTES_PER_DAY
+            rows.append((None, ScheduleException.KIND_HOLIDAY, day, day + MINUTES_PER_DAY))
+
+        started = time.perf_counter()
+        index = ExceptionIndex(rows)
+        built = time.perf_counter()
+        total = sum(len(doctor_availability(doctor, start_date, end_date, index)) for doctor in doctors)
+        finished = time.perf_counter()
+
+        self.stdout.write(f"Istisnolar: {len(rows)}, indeks: {(built - started) * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(doctors)} shifokor x {options['days']} kun: {total} ta oraliq, {(finished - built) * 1000:.1f} ms"
+        ))
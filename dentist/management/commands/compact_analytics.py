@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dentist import analytics
+
+
+class Command(BaseCommand):
+    help = "Sahifa ko'rishlarining daqiqalik hisoblarini soatlik/kunlik yig'indilarga siqish (cron uchun)"
+
+    def handle(self, *args, **options):
+        compacted = analytics.compact()
+        self.stdout.write(self.style.SUCCESS(f"{compacted} ta daqiqalik qator siqildi"))
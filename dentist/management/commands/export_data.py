@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dentist import exports
+from dentist.models import ContactMessage, Doctor, Service
+
+MODELS = {
+    'messages': ContactMessage,
+    'doctors': Doctor,
+    'services': Service,
+}
+
+
+class Command(BaseCommand):
+    help = "Xabarlar, shifokorlar yoki xizmatlarni CSV/XLSX faylga eksport qilish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=MODELS, help="Eksport qilinadigan ma'lumotlar")
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--output', '-o', help="Fayl yo'li (CSV uchun ko'rsatilmasa stdout)")
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = MODELS[options['model']].objects.order_by('pk')
+        output = options['output']
+        chunk_size = options['chunk_size']
+
+        if options['format'] == 'xlsx':
+            if not output:
+                raise CommandError("XLSX uchun --output ko'rsatilishi kerak")
+            try:
+                with open(output, 'wb') as stream:
+                    exports.write_xlsx(queryset, stream, chunk_size)
+            except ImportError as e:
+                raise CommandError(str(e))
+        elif output:
+            with open(output, 'w', newline='', encoding='utf-8-sig') as stream:
+                exports.write_csv(queryset, stream, chunk_size)
+        else:
+            exports.write_csv(queryset, sys.stdout, chunk_size)
+
+        if output:
+            self.stdout.write(self.style.SUCCESS(f"Eksport tayyor: {output}"))
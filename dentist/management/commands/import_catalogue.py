@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dentist.imports import BATCH_SIZE, IMPORTERS, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bo'limlar, xizmatlar yoki shifokorlarni CSV/JSON fayldan ommaviy import qilish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=IMPORTERS, help="Import qilinadigan ma'lumotlar")
+        parser.add_argument('path', help="CSV yoki JSON fayl yo'li")
+        parser.add_argument('--format', choices=['csv', 'json'], help="Ko'rsatilmasa kengaytma bo'yicha")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as stream:
+                rows = read_rows(stream, options['format'])
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        result = IMPORTERS[options['model']](batch_size=options['batch_size']).run(rows)
+        for row_number, message in result.errors:
+            self.stderr.write(f"{row_number}-qator: {message}")
+        style = self.style.WARNING if result.errors else self.style.SUCCESS
+        self.stdout.write(style(result.summary()))
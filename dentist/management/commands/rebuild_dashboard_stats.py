@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dentist import dashboard
+
+
+class Command(BaseCommand):
+    help = "Admin bosh sahifasi statistikasini xabarlar va qabullardan qayta hisoblash"
+
+    def handle(self, *args, **options):
+        dashboard.rebuild()
+        self.stdout.write(self.style.SUCCESS("Statistika qayta hisoblandi"))
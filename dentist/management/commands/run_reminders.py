@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from dentist.reminders import LocalSender, ReminderScheduler, get_sender
+
+
+class Command(BaseCommand):
+    help = "Qabul eslatmalarini rejalashtiruvchi jarayon (bitta nusxada ishga tushiriladi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Muddati kelganlarni yuborib chiqish")
+        parser.add_argument('--stub', action='store_true', help="Yubormasdan, xabarlarni ekranga chiqarish")
+
+    def handle(self, *args, **options):
+        sender = LocalSender() if options['stub'] else get_sender()
+        scheduler = ReminderScheduler(sender)
+        if options['once']:
+            sent = scheduler.tick()
+            if options['stub']:
+                for pk, offset, text in sender.sent:
+                    self.stdout.write(f"#{pk} ({offset} daqiqa oldin)\n{text}\n")
+            self.stdout.write(self.style.SUCCESS(f"{sent} ta eslatma yuborildi, {len(scheduler)} ta kutilmoqda"))
+            return
+        scheduler.load()
+        self.stdout.write(f"Eslatmalar rejalashtiruvchisi ishga tushdi: {len(scheduler)} ta kutilmoqda")
+        scheduler.run_forever()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dentist import popularity
+
+
+class Command(BaseCommand):
+    help = "Mashhurlik reytingini faollik statistikasidan qayta hisoblash (cron uchun)"
+
+    def handle(self, *args, **options):
+        count = popularity.recompute()
+        self.stdout.write(self.style.SUCCESS(f"Reyting yangilandi: {count} ta yozuv"))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0007_sitesettings_about_image_2_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpamToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100, unique=True, verbose_name='Token')),
+                ('spam_count', models.IntegerField(default=0, verbose_name='Spam xabarlarda')),
+                ('ham_count', models.IntegerField(default=0, verbose_name='Oddiy xabarlarda')),
+            ],
+            options={
+                'verbose_name': 'Spam tokeni',
+                'verbose_name_plural': 'Spam tokenlari',
+            },
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Yuborilgan soni'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Fingerprint'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='is_spam',
+            field=models.BooleanField(blank=True, default=None, null=True, verbose_name='Spam'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='last_received_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Oxirgi marta yuborilgan'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='spam_score',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Spam ehtimoli'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['fingerprint', 'created_at'], name='dentist_con_fingerp_b61f51_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0008_spamtoken_contactmessage_duplicate_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_read', 'created_at'], name='dentist_con_is_read_db8d5a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['created_at', 'id'], name='dentist_con_created_0a5456_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0009_contactmessage_dentist_con_is_read_db8d5a_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='service',
+            name='dentist_ser_departm_6e6a2b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'price_from'], name='dentist_ser_is_acti_bbc352_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['department', 'is_active', 'price_from'], name='dentist_ser_departm_ba8401_idx'),
+        ),
+    ]
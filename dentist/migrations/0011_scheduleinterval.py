@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0010_remove_service_dentist_ser_departm_6e6a2b_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Dushanba'), (1, 'Seshanba'), (2, 'Chorshanba'), (3, 'Payshanba'), (4, 'Juma'), (5, 'Shanba'), (6, 'Yakshanba')], verbose_name='Hafta kuni')),
+                ('opens', models.TimeField(verbose_name='Ochilish')),
+                ('closes', models.TimeField(verbose_name='Yopilish (00:00 - yarim tun)')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_intervals', to='dentist.department', verbose_name="Bo'lim")),
+                ('source', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='intervals', to='dentist.workinghour')),
+            ],
+            options={
+                'verbose_name': "Ish vaqti oralig'i",
+                'verbose_name_plural': 'Ish vaqti oraliqlari',
+                'ordering': ['department', 'weekday', 'opens'],
+                'indexes': [models.Index(fields=['weekday', 'department'], name='dentist_sch_weekday_6a224b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,129 @@
+import re
+from datetime import time as dtime
+
+from django.db import migrations
+
+# Tahlilchining migratsiya vaqtidagi nusxasi (dentist.schedule keyin o'zgarsa ham natija bir xil)
+DAY_NAMES = ['dushanba', 'seshanba', 'chorshanba', 'payshanba', 'juma', 'shanba', 'yakshanba']
+EVERY_DAY = ('har kuni', 'hafta davomida', 'kunora', 'har kun')
+TIME_RE = re.compile(r'(\d{1,2})[:.](\d{2})')
+ROUND_THE_CLOCK = ('24/7', '24 soat', 'kecha-kunduz')
+CYRILLIC = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j', 'з': 'z', 'и': 'i',
+    'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'у': 'u', 'ф': 'f', 'х': 'x', 'ц': 's', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'i', 'ь': '',
+    'э': 'e', 'ю': 'yu', 'я': 'ya', 'ў': 'o', 'қ': 'q', 'ғ': 'g', 'ҳ': 'h',
+}
+APOSTROPHES = re.compile(r"['`ʻʼ‘’]")
+
+
+class ScheduleParseError(ValueError):
+    pass
+
+
+def fold(text):
+    text = APOSTROPHES.sub('', (text or '').lower())
+    return ''.join(CYRILLIC.get(char, char) for char in text)
+
+
+def parse_day(token):
+    token = fold(token).strip(' .')
+    if len(token) >= 2:
+        matches = [number for number, name in enumerate(DAY_NAMES) if name.startswith(token)]
+        if len(matches) == 1:
+            return matches[0]
+    raise ScheduleParseError(token)
+
+
+def parse_day_range(text):
+    folded = fold(text).strip()
+    if any(phrase in folded for phrase in EVERY_DAY):
+        return list(range(7))
+    days = []
+    for part in re.split(r'[,;/]', text):
+        if not part.strip():
+            continue
+        bounds = re.split(r'\s*[-–—]\s*', part.strip())
+        if len(bounds) == 1:
+            days.append(parse_day(bounds[0]))
+        elif len(bounds) == 2:
+            start, end = parse_day(bounds[0]), parse_day(bounds[1])
+            days.extend((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+        else:
+            raise ScheduleParseError(part)
+    if not days:
+        raise ScheduleParseError(text)
+    return sorted(set(days))
+
+
+def parse_time_range(text):
+    if any(phrase in text.lower() for phrase in ROUND_THE_CLOCK):
+        return dtime(0, 0), dtime(0, 0)
+    times = TIME_RE.findall(text)
+    if len(times) != 2:
+        raise ScheduleParseError(text)
+    (open_h, open_m), (close_h, close_m) = [(int(h), int(m)) for h, m in times]
+    if close_h == 24 and close_m == 0:
+        close_h = 0
+    try:
+        return dtime(open_h, open_m), dtime(close_h, close_m)
+    except ValueError:
+        raise ScheduleParseError(text)
+
+
+def parse_schedule_text(text):
+    match = TIME_RE.search(text)
+    if match is None and not any(phrase in text.lower() for phrase in ROUND_THE_CLOCK):
+        raise ScheduleParseError(text)
+    split_at = match.start() if match else min(
+        text.lower().find(phrase) for phrase in ROUND_THE_CLOCK if phrase in text.lower()
+    )
+    days = parse_day_range(text[:split_at].strip(' :'))
+    opens, closes = parse_time_range(text[split_at:])
+    return [(day, opens, closes) for day in days]
+
+
+def parse_existing(apps, schema_editor):
+    """Mavjud WorkingHour va SiteSettings matnlaridan ScheduleInterval yozuvlari"""
+    WorkingHour = apps.get_model('dentist', 'WorkingHour')
+    SiteSettings = apps.get_model('dentist', 'SiteSettings')
+    ScheduleInterval = apps.get_model('dentist', 'ScheduleInterval')
+
+    intervals = []
+    for hour in WorkingHour.objects.all():
+        try:
+            opens, closes = parse_time_range(hour.time_range)
+            days = parse_day_range(hour.day_range)
+        except ScheduleParseError:
+            continue
+        intervals.extend(
+            ScheduleInterval(department_id=hour.department_id, source_id=hour.pk, weekday=day, opens=opens,
+                             closes=closes)
+            for day in days
+        )
+
+    site_settings = SiteSettings.objects.filter(pk=1).first()
+    if site_settings is not None:
+        for text in (site_settings.working_hours_weekday, site_settings.working_hours_weekend):
+            try:
+                parsed = parse_schedule_text(text)
+            except ScheduleParseError:
+                continue
+            intervals.extend(ScheduleInterval(weekday=day, opens=opens, closes=closes) for day, opens, closes in parsed)
+
+    ScheduleInterval.objects.bulk_create(intervals)
+
+
+def remove_intervals(apps, schema_editor):
+    apps.get_model('dentist', 'ScheduleInterval').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0011_scheduleinterval'),
+    ]
+
+    operations = [
+        migrations.RunPython(parse_existing, remove_intervals),
+    ]
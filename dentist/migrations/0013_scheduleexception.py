@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0012_parse_working_hours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('absence', "Ishda emas (ta'til, konferensiya)"), ('extra', "Qo'shimcha smena"), ('holiday', 'Bayram / dam olish kuni')], default='absence', max_length=10, verbose_name='Turi')),
+                ('starts_at', models.DateTimeField(verbose_name='Boshlanishi')),
+                ('ends_at', models.DateTimeField(verbose_name='Tugashi')),
+                ('reason', models.CharField(blank=True, max_length=200, verbose_name='Sabab')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan sana')),
+                ('doctor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='dentist.doctor', verbose_name="Shifokor (bo'sh - butun klinika)")),
+            ],
+            options={
+                'verbose_name': 'Jadval istisnosi',
+                'verbose_name_plural': 'Jadval istisnolari',
+                'ordering': ['-starts_at'],
+                'indexes': [models.Index(fields=['doctor', 'starts_at'], name='dentist_sch_doctor__53a304_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0013_scheduleexception'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patient_name', models.CharField(max_length=200, verbose_name='Bemor ismi')),
+                ('patient_phone', models.CharField(max_length=20, verbose_name='Bemor telefoni')),
+                ('telegram_chat_id', models.CharField(blank=True, max_length=50, verbose_name='Bemor Telegram chat ID')),
+                ('starts_at', models.DateTimeField(verbose_name='Qabul vaqti')),
+                ('duration', models.PositiveIntegerField(default=30, verbose_name='Davomiyligi (daqiqa)')),
+                ('status', models.CharField(choices=[('pending', 'Kutilmoqda'), ('confirmed', 'Tasdiqlangan'), ('cancelled', 'Bekor qilingan'), ('completed', 'Yakunlangan')], default='pending', max_length=10, verbose_name='Holati')),
+                ('comment', models.TextField(blank=True, verbose_name='Izoh')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan sana')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan sana')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='dentist.doctor', verbose_name='Shifokor')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='appointments', to='dentist.service', verbose_name='Xizmat')),
+            ],
+            options={
+                'verbose_name': 'Qabul',
+                'verbose_name_plural': 'Qabullar',
+                'ordering': ['-starts_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AppointmentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset', models.PositiveIntegerField(verbose_name='Qabuldan oldin (daqiqa)')),
+                ('status', models.CharField(choices=[('sending', 'Yuborilmoqda'), ('sent', 'Yuborildi'), ('failed', 'Xato'), ('skipped', "O'tkazib yuborildi")], default='sending', max_length=10, verbose_name='Holati')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan sana')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Yuborilgan vaqt')),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='dentist.appointment', verbose_name='Qabul')),
+            ],
+            options={
+                'verbose_name': 'Qabul eslatmasi',
+                'verbose_name_plural': 'Qabul eslatmalari',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'starts_at'], name='dentist_app_doctor__31e58b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'starts_at'], name='dentist_app_status_9941d6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['updated_at'], name='dentist_app_updated_ba7e13_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointmentreminder',
+            constraint=models.UniqueConstraint(fields=('appointment', 'offset'), name='unique_appointment_reminder'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0014_appointment_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contact_messages', to='dentist.department', verbose_name="Bo'lim"),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['department', 'created_at'], name='dentist_con_departm_f1fb25_idx'),
+        ),
+    ]
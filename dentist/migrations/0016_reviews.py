@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:48
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0015_contactmessage_department'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Sharhlar soni'),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='review_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Baholar yig'indisi"),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='stars_1',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='1 yulduz'),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='stars_2',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='2 yulduz'),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='stars_3',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='3 yulduz'),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='stars_4',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='4 yulduz'),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='stars_5',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='5 yulduz'),
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patient_name', models.CharField(max_length=120, verbose_name='Ism')),
+                ('rating', models.PositiveSmallIntegerField(choices=[(5, '5 yulduz'), (4, '4 yulduz'), (3, '3 yulduz'), (2, '2 yulduz'), (1, '1 yulduz')], validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)], verbose_name='Baho')),
+                ('comment', models.TextField(verbose_name='Sharh')),
+                ('status', models.CharField(choices=[('pending', 'Moderatsiyada'), ('approved', 'Tasdiqlangan'), ('rejected', 'Rad etilgan')], default='pending', max_length=10, verbose_name='Holati')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan sana')),
+                ('moderated_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name="Ko'rib chiqilgan")),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='dentist.doctor', verbose_name='Shifokor')),
+            ],
+            options={
+                'verbose_name': 'Sharh',
+                'verbose_name_plural': 'Sharhlar',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='dentist_rev_status_1c730e_idx'), models.Index(fields=['doctor', 'status', 'created_at'], name='dentist_rev_doctor__8a9ed7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0016_reviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('service', 'Xizmat'), ('doctor', 'Shifokor')], max_length=10, verbose_name='Turi')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Obyekt ID')),
+                ('day', models.DateField(verbose_name='Kun')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name="Ko'rishlar")),
+                ('bookings', models.PositiveIntegerField(default=0, verbose_name='Qabulga yozilish')),
+            ],
+            options={
+                'verbose_name': 'Faollik',
+                'verbose_name_plural': 'Faollik (kunlik)',
+                'indexes': [models.Index(fields=['day'], name='dentist_act_day_be4fd7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'day'), name='unique_activity_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PopularityRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('service', 'Xizmat'), ('doctor', 'Shifokor')], max_length=10, verbose_name='Turi')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Obyekt ID')),
+                ('position', models.PositiveIntegerField(verbose_name="O'rni")),
+                ('score', models.FloatField(verbose_name='Ball')),
+                ('computed_at', models.DateTimeField(verbose_name='Hisoblangan')),
+            ],
+            options={
+                'verbose_name': 'Mashhurlik reytingi',
+                'verbose_name_plural': 'Mashhurlik reytingi',
+                'ordering': ['kind', 'position'],
+                'indexes': [models.Index(fields=['kind', 'position'], name='dentist_pop_kind_35bca5_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_popularity_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0017_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageViewMinute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_name', models.CharField(max_length=50, verbose_name='Sahifa')),
+                ('object_id', models.PositiveBigIntegerField(default=0, verbose_name='Obyekt ID')),
+                ('minute', models.DateTimeField(verbose_name='Daqiqa')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name="Ko'rishlar")),
+            ],
+            options={
+                'verbose_name': "Sahifa ko'rishi (daqiqa)",
+                'verbose_name_plural': "Sahifa ko'rishlari (daqiqa)",
+                'indexes': [models.Index(fields=['minute'], name='dentist_pag_minute_6b118d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('url_name', 'minute', 'object_id'), name='unique_pageview_minute')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PageViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Soat'), ('day', 'Kun')], max_length=4, verbose_name='Davr')),
+                ('start', models.DateTimeField(verbose_name='Boshlanishi')),
+                ('url_name', models.CharField(max_length=50, verbose_name='Sahifa')),
+                ('object_id', models.PositiveBigIntegerField(default=0, verbose_name='Obyekt ID')),
+                ('hits', models.PositiveBigIntegerField(default=0, verbose_name="Ko'rishlar")),
+            ],
+            options={
+                'verbose_name': "Sahifa ko'rishlari",
+                'verbose_name_plural': "Sahifa ko'rishlari",
+                'ordering': ['-start'],
+                'indexes': [models.Index(fields=['period', 'url_name', 'start'], name='dentist_pag_period_5a4927_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'start', 'url_name', 'object_id'), name='unique_pageview_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0018_pageviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='Kun')),
+                ('messages', models.PositiveIntegerField(default=0, verbose_name='Xabarlar')),
+                ('bookings', models.PositiveIntegerField(default=0, verbose_name='Qabullar')),
+            ],
+            options={
+                'verbose_name': 'Kunlik statistika',
+                'verbose_name_plural': 'Kunlik statistika',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InboxStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department_key', models.PositiveBigIntegerField(unique=True, verbose_name="Bo'lim")),
+                ('total', models.IntegerField(default=0, verbose_name='Jami')),
+                ('unread', models.IntegerField(default=0, verbose_name="O'qilmagan")),
+            ],
+            options={
+                'verbose_name': 'Xabarlar statistikasi',
+                'verbose_name_plural': 'Xabarlar statistikasi',
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def populate(apps, schema_editor):
+    """Mavjud xabarlar va qabullardan boshlang'ich statistika (dentist.dashboard.collect nusxasi)"""
+    ContactMessage = apps.get_model('dentist', 'ContactMessage')
+    Appointment = apps.get_model('dentist', 'Appointment')
+    DailyStat = apps.get_model('dentist', 'DailyStat')
+    InboxStat = apps.get_model('dentist', 'InboxStat')
+
+    daily = defaultdict(lambda: {'messages': 0, 'bookings': 0})
+    for model, field in ((ContactMessage, 'messages'), (Appointment, 'bookings')):
+        rows = model.objects.annotate(day=TruncDate('created_at', tzinfo=timezone.get_default_timezone()))
+        for row in rows.order_by().values('day').annotate(n=Count('pk')):
+            daily[row['day']][field] = row['n']
+    inbox = defaultdict(lambda: {'total': 0, 'unread': 0})
+    for row in ContactMessage.objects.order_by().values('department_id', 'is_read').annotate(n=Count('pk')):
+        values = inbox[row['department_id'] or 0]
+        values['total'] += row['n']
+        if not row['is_read']:
+            values['unread'] += row['n']
+
+    DailyStat.objects.bulk_create([DailyStat(day=day, **values) for day, values in daily.items()])
+    InboxStat.objects.bulk_create([InboxStat(department_key=key, **values) for key, values in inbox.items()])
+
+
+def clear(apps, schema_editor):
+    apps.get_model('dentist', 'DailyStat').objects.all().delete()
+    apps.get_model('dentist', 'InboxStat').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0019_dashboard_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, clear),
+    ]
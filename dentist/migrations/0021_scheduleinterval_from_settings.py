@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:16
+
+from django.db import migrations, models
+
+
+def mark_settings_intervals(apps, schema_editor):
+    """Shu paytgacha klinika oraliqlari faqat SiteSettings matnidan yaratilgan"""
+    ScheduleInterval = apps.get_model('dentist', 'ScheduleInterval')
+    ScheduleInterval.objects.filter(department__isnull=True, source__isnull=True).update(from_settings=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0020_populate_dashboard_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleinterval',
+            name='from_settings',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_settings_intervals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_starts_at(apps, schema_editor):
+    """Mavjud eslatmalar qabulning hozirgi vaqti uchun yuborilgan deb hisoblanadi"""
+    Appointment = apps.get_model('dentist', 'Appointment')
+    AppointmentReminder = apps.get_model('dentist', 'AppointmentReminder')
+    AppointmentReminder.objects.update(
+        starts_at=Subquery(Appointment.objects.filter(pk=OuterRef('appointment_id')).values('starts_at')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dentist', '0021_scheduleinterval_from_settings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='starts_at',
+            field=models.DateTimeField(null=True, verbose_name='Qabul vaqti'),
+        ),
+        migrations.RunPython(copy_starts_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='appointmentreminder',
+            name='starts_at',
+            field=models.DateTimeField(verbose_name='Qabul vaqti'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='appointmentreminder',
+            name='unique_appointment_reminder',
+        ),
+        migrations.AddConstraint(
+            model_name='appointmentreminder',
+            constraint=models.UniqueConstraint(fields=('appointment', 'offset', 'starts_at'), name='unique_appointment_reminder'),
+        ),
+    ]
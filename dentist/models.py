@@ -1,8 +1,11 @@
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, RegexValidator, MaxValueValidator
-from django.utils.text import slugify
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
+from django.utils import timezone
+
+from dentist.slugs import unique_slug
 
 
 # Create your models here.
@@ -37,7 +40,7 @@ class Department(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug =slugify(self.name)
+            self.slug = unique_slug(self, self.name)
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -69,6 +72,77 @@ class WorkingHour(models.Model):
     def __str__(self):
         return f"{self.department.name}: {self.day_range} ({self.time_range})"
 
+    def parse(self):
+        """Matndan [(hafta kuni, ochilish, yopilish)]"""
+        from dentist.schedule import parse_day_range, parse_time_range
+
+        opens, closes = parse_time_range(self.time_range)
+        return [(day, opens, closes) for day in parse_day_range(self.day_range)]
+
+    def clean(self):
+        from dentist.schedule import ScheduleParseError
+
+        try:
+            self.parse()
+        except ScheduleParseError as e:
+            raise ValidationError({'day_range': str(e)})
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.sync_intervals()
+
+    def sync_intervals(self):
+        """Tuzilgan oraliqlarni matn bo'yicha qayta yozish (tahlil qilinmasa oraliqsiz qoladi)"""
+        from dentist.schedule import ScheduleParseError
+
+        try:
+            intervals = self.parse()
+        except ScheduleParseError:
+            intervals = []
+        replace_intervals(ScheduleInterval.objects.filter(source=self), [
+            ScheduleInterval(department_id=self.department_id, source=self, weekday=day, opens=opens, closes=closes)
+            for day, opens, closes in intervals
+        ])
+
+
+class ScheduleInterval(models.Model):
+    """Tuzilgan haftalik ish vaqti (department bo'sh bo'lsa - butun klinika)"""
+    WEEKDAY_CHOICES = [
+        (0, 'Dushanba'), (1, 'Seshanba'), (2, 'Chorshanba'), (3, 'Payshanba'),
+        (4, 'Juma'), (5, 'Shanba'), (6, 'Yakshanba'),
+    ]
+
+    department = models.ForeignKey(Department, related_name='schedule_intervals', on_delete=models.CASCADE,
+                                   null=True, blank=True, verbose_name="Bo'lim")
+    source = models.ForeignKey(WorkingHour, related_name='intervals', on_delete=models.CASCADE,
+                               null=True, blank=True, editable=False)
+    # SiteSettings matnidan yaratilgan (admin qo'shgan klinika oraliqlari saqlanib qoladi)
+    from_settings = models.BooleanField(default=False, editable=False)
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES, verbose_name="Hafta kuni")
+    opens = models.TimeField(verbose_name="Ochilish")
+    closes = models.TimeField(verbose_name="Yopilish (00:00 - yarim tun)")
+
+    class Meta:
+        verbose_name = "Ish vaqti oralig'i"
+        verbose_name_plural = "Ish vaqti oraliqlari"
+        ordering = ['department', 'weekday', 'opens']
+        indexes = [
+            models.Index(fields=['weekday', 'department']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.opens:%H:%M} - {self.closes:%H:%M}"
+
+
+def replace_intervals(queryset, intervals):
+    """Oraliqlarni almashtirish; jadval keshi tranzaksiya tugagach bir marta bekor qilinadi"""
+    from dentist.caching import bump_generation
+
+    with transaction.atomic():
+        queryset.delete()
+        ScheduleInterval.objects.bulk_create(intervals)
+        transaction.on_commit(lambda: bump_generation(ScheduleInterval))
+
 
 class Service(models.Model):
     """Klinika xizmatlari"""
@@ -100,7 +174,9 @@ class Service(models.Model):
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['is_active', 'is_popular']),
-            models.Index(fields=['department', 'is_active']),
+            # Narx bo'yicha filtr/saralash; (department, is_active) so'rovlarini ham qoplaydi
+            models.Index(fields=['is_active', 'price_from']),
+            models.Index(fields=['department', 'is_active', 'price_from']),
         ]
 
     def __str__(self):
@@ -108,7 +184,7 @@ class Service(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = unique_slug(self, self.name)
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -174,6 +250,15 @@ class Doctor(models.Model):
     rating = models.DecimalField(max_digits=3, decimal_places=1, default=5.0, verbose_name="Reying", validators=[MinValueValidator(0), MaxValueValidator(5)])
     patients_count =models.IntegerField(default=0, verbose_name="Bemorlar soni")
 
+    # Tasdiqlangan sharhlar statistikasi (dentist.ratings orqali o'zgaradi; sharh bo'lsa rating = o'rtacha)
+    review_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Sharhlar soni")
+    review_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name="Baholar yig'indisi")
+    stars_1 = models.PositiveIntegerField(default=0, editable=False, verbose_name="1 yulduz")
+    stars_2 = models.PositiveIntegerField(default=0, editable=False, verbose_name="2 yulduz")
+    stars_3 = models.PositiveIntegerField(default=0, editable=False, verbose_name="3 yulduz")
+    stars_4 = models.PositiveIntegerField(default=0, editable=False, verbose_name="4 yulduz")
+    stars_5 = models.PositiveIntegerField(default=0, editable=False, verbose_name="5 yulduz")
+
     is_available = models.BooleanField(default=True, verbose_name="Mavjud")
     is_futured = models.BooleanField(default=False, verbose_name="Asosiy sahifada")
     order = models.IntegerField(default=0, verbose_name="Tartib raqami")
@@ -194,10 +279,26 @@ class Doctor(models.Model):
     def __str__(self):
         return f"Dr. {self.first_name} {self.last_name}"
 
+    REVIEW_STATS_FIELDS = ('review_count', 'review_sum', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5', 'rating')
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(f"{self.first_name}-{self.last_name}")
+            self.slug = unique_slug(self, f"{self.first_name}-{self.last_name}")
+        if self._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+            super().save(*args, **kwargs)
+            return
+        # Sharh statistikasi ratings.apply_deltas orqali yoziladi: eskirgan nusxa uni qaytarib yozmasin
+        skipped = {*self.REVIEW_STATS_FIELDS, *self.get_deferred_fields()}
+        kwargs['update_fields'] = [
+            field.name for field in self._meta.concrete_fields if not field.primary_key and field.name not in skipped
+        ]
         super().save(*args, **kwargs)
+        if 'rating' not in self.get_deferred_fields():
+            # Sharhlar bo'lmasa reyting qo'lda kiritiladi
+            Doctor.objects.filter(pk=self.pk, review_count=0).update(rating=self.rating)
+
+    def get_absolute_url(self):
+        return reverse('doctor_detail', kwargs={'slug': self.slug})
 
     def get_full_name(self):
         """To'liq ismi"""
@@ -226,6 +327,331 @@ class Doctor(models.Model):
         """Ish soatlari"""
         return f"{self.work_start.strftime('%H:%M')} - {self.work_end.strftime('%H:%M')}"
 
+    def get_rating_histogram(self):
+        """[(yulduz, soni, foiz)] - 5 dan 1 gacha"""
+        return [
+            (stars, count, round(count * 100 / self.review_count) if self.review_count else 0)
+            for stars in range(5, 0, -1)
+            for count in [getattr(self, f'stars_{stars}')]
+        ]
+
+    def get_availability(self, start_date, end_date):
+        """Berilgan kunlardagi bo'sh oraliqlar (istisnolar hisobga olingan)"""
+        from dentist.availability import doctor_availability
+
+        return doctor_availability(self, start_date, end_date)
+
+
+class ScheduleException(models.Model):
+    """Shifokor jadvalidan istisno: ta'til, qo'shimcha smena yoki bayram (doctor bo'sh - butun klinika)"""
+    KIND_ABSENCE = 'absence'
+    KIND_EXTRA = 'extra'
+    KIND_HOLIDAY = 'holiday'
+    KIND_CHOICES = [
+        (KIND_ABSENCE, "Ishda emas (ta'til, konferensiya)"),
+        (KIND_EXTRA, "Qo'shimcha smena"),
+        (KIND_HOLIDAY, "Bayram / dam olish kuni"),
+    ]
+
+    doctor = models.ForeignKey(Doctor, related_name='schedule_exceptions', on_delete=models.CASCADE,
+                               null=True, blank=True, verbose_name="Shifokor (bo'sh - butun klinika)")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=KIND_ABSENCE, verbose_name="Turi")
+    starts_at = models.DateTimeField(verbose_name="Boshlanishi")
+    ends_at = models.DateTimeField(verbose_name="Tugashi")
+    reason = models.CharField(max_length=200, blank=True, verbose_name="Sabab")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
+
+    class Meta:
+        verbose_name = "Jadval istisnosi"
+        verbose_name_plural = "Jadval istisnolari"
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['doctor', 'starts_at']),
+        ]
+
+    def __str__(self):
+        who = self.doctor.get_full_name() if self.doctor_id else "Butun klinika"
+        return f"{who}: {self.get_kind_display()} ({self.starts_at:%Y-%m-%d %H:%M} - {self.ends_at:%Y-%m-%d %H:%M})"
+
+    def clean(self):
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': "Tugash vaqti boshlanishdan keyin bo'lishi kerak"})
+        if self.kind == self.KIND_EXTRA and not self.doctor_id:
+            raise ValidationError({'doctor': "Qo'shimcha smena uchun shifokor tanlanishi kerak"})
+
+
+class Appointment(models.Model):
+    """Shifokor qabuliga yozilish"""
+    STATUS_PENDING = 'pending'
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Kutilmoqda"),
+        (STATUS_CONFIRMED, "Tasdiqlangan"),
+        (STATUS_CANCELLED, "Bekor qilingan"),
+        (STATUS_COMPLETED, "Yakunlangan"),
+    ]
+    # Eslatma yuboriladigan holatlar
+    ACTIVE_STATUSES = [STATUS_PENDING, STATUS_CONFIRMED]
+
+    doctor = models.ForeignKey(Doctor, related_name='appointments', on_delete=models.CASCADE, verbose_name="Shifokor")
+    service = models.ForeignKey('Service', related_name='appointments', on_delete=models.SET_NULL,
+                                null=True, blank=True, verbose_name="Xizmat")
+    patient_name = models.CharField(max_length=200, verbose_name="Bemor ismi")
+    patient_phone = models.CharField(max_length=20, verbose_name="Bemor telefoni")
+    telegram_chat_id = models.CharField(max_length=50, blank=True, verbose_name="Bemor Telegram chat ID")
+    starts_at = models.DateTimeField(verbose_name="Qabul vaqti")
+    duration = models.PositiveIntegerField(default=30, verbose_name="Davomiyligi (daqiqa)")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Holati")
+    comment = models.TextField(blank=True, verbose_name="Izoh")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
+
+    class Meta:
+        verbose_name = "Qabul"
+        verbose_name_plural = "Qabullar"
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['doctor', 'starts_at']),
+            models.Index(fields=['status', 'starts_at']),
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_name} - {self.doctor.get_full_name()} ({timezone.localtime(self.starts_at):%Y-%m-%d %H:%M})"
+
+
+class AppointmentReminder(models.Model):
+    """Yuborilgan (yoki yuborilayotgan) eslatma: qayta ishga tushganda takror yubormaslik uchun"""
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_CHOICES = [
+        (STATUS_SENDING, "Yuborilmoqda"),
+        (STATUS_SENT, "Yuborildi"),
+        (STATUS_FAILED, "Xato"),
+        (STATUS_SKIPPED, "O'tkazib yuborildi"),
+    ]
+
+    appointment = models.ForeignKey(Appointment, related_name='reminders', on_delete=models.CASCADE,
+                                    verbose_name="Qabul")
+    offset = models.PositiveIntegerField(verbose_name="Qabuldan oldin (daqiqa)")
+    # Eslatma qaysi qabul vaqti uchun: qabul ko'chirilsa yangi vaqtga yangi eslatma
+    starts_at = models.DateTimeField(verbose_name="Qabul vaqti")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_SENDING, verbose_name="Holati")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Yuborilgan vaqt")
+
+    class Meta:
+        verbose_name = "Qabul eslatmasi"
+        verbose_name_plural = "Qabul eslatmalari"
+        constraints = [
+            models.UniqueConstraint(fields=['appointment', 'offset', 'starts_at'], name='unique_appointment_reminder'),
+        ]
+
+    def __str__(self):
+        return f"{self.appointment_id}: {self.offset} daqiqa oldin ({self.get_status_display()})"
+
+
+class Review(models.Model):
+    """Bemor sharhi (admin tasdiqlagandan keyin e'lon qilinadi)"""
+    STATUS_PENDING = 'pending'
+    STATUS_APPROVED = 'approved'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Moderatsiyada"),
+        (STATUS_APPROVED, "Tasdiqlangan"),
+        (STATUS_REJECTED, "Rad etilgan"),
+    ]
+    RATING_CHOICES = [(value, f"{value} yulduz") for value in range(5, 0, -1)]
+
+    doctor = models.ForeignKey(Doctor, related_name='reviews', on_delete=models.CASCADE, verbose_name="Shifokor")
+    patient_name = models.CharField(max_length=120, verbose_name="Ism")
+    rating = models.PositiveSmallIntegerField(choices=RATING_CHOICES, verbose_name="Baho",
+                                              validators=[MinValueValidator(1), MaxValueValidator(5)])
+    comment = models.TextField(verbose_name="Sharh")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Holati")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
+    moderated_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Ko'rib chiqilgan")
+
+    class Meta:
+        verbose_name = "Sharh"
+        verbose_name_plural = "Sharhlar"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['doctor', 'status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_name} - {self.doctor.get_full_name()} ({self.rating})"
+
+    COUNTED_FIELDS = ('doctor_id', 'rating', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # only()/defer() bilan o'qilganda deferred maydonga murojaat qo'shimcha so'rov bo'lardi
+        if all(name in instance.__dict__ for name in cls.COUNTED_FIELDS):
+            instance._counted = instance.counted()
+        return instance
+
+    def counted(self):
+        """Statistikaga kiritilgan holat: (doctor_id, baho) yoki None"""
+        return (self.doctor_id, self.rating) if self.status == self.STATUS_APPROVED else None
+
+    def _previous(self):
+        if hasattr(self, '_counted'):
+            return self._counted
+        if self.pk is None:
+            return None
+        row = Review.objects.filter(pk=self.pk).values_list(*self.COUNTED_FIELDS).first()
+        if row is None or row[2] != self.STATUS_APPROVED:
+            return None
+        return row[:2]
+
+    def save(self, *args, **kwargs):
+        from dentist.ratings import apply_review_change
+
+        with transaction.atomic():
+            previous = self._previous()
+            super().save(*args, **kwargs)
+            apply_review_change(previous, self.counted())
+        self._counted = self.counted()
+
+    def delete(self, *args, **kwargs):
+        from dentist.ratings import apply_review_change
+
+        with transaction.atomic():
+            previous = self._previous()
+            result = super().delete(*args, **kwargs)
+            apply_review_change(previous, None)
+        self._counted = None
+        return result
+
+
+class ActivityCount(models.Model):
+    """Xizmat/shifokor sahifasi ko'rishlari va qabul tugmasi bosishlari (kunlik)"""
+    KIND_SERVICE = 'service'
+    KIND_DOCTOR = 'doctor'
+    KIND_CHOICES = [(KIND_SERVICE, "Xizmat"), (KIND_DOCTOR, "Shifokor")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Turi")
+    object_id = models.PositiveBigIntegerField(verbose_name="Obyekt ID")
+    day = models.DateField(verbose_name="Kun")
+    views = models.PositiveIntegerField(default=0, verbose_name="Ko'rishlar")
+    bookings = models.PositiveIntegerField(default=0, verbose_name="Qabulga yozilish")
+
+    class Meta:
+        verbose_name = "Faollik"
+        verbose_name_plural = "Faollik (kunlik)"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'day'], name='unique_activity_day'),
+        ]
+        indexes = [models.Index(fields=['day'])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({self.day})"
+
+
+class PopularityRank(models.Model):
+    """Mashhurlik reytingi (dentist.popularity davriy qayta hisoblaydi)"""
+    kind = models.CharField(max_length=10, choices=ActivityCount.KIND_CHOICES, verbose_name="Turi")
+    object_id = models.PositiveBigIntegerField(verbose_name="Obyekt ID")
+    position = models.PositiveIntegerField(verbose_name="O'rni")
+    score = models.FloatField(verbose_name="Ball")
+    computed_at = models.DateTimeField(verbose_name="Hisoblangan")
+
+    class Meta:
+        verbose_name = "Mashhurlik reytingi"
+        verbose_name_plural = "Mashhurlik reytingi"
+        ordering = ['kind', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_popularity_rank'),
+        ]
+        indexes = [models.Index(fields=['kind', 'position'])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}: {self.position}"
+
+
+class PageViewMinute(models.Model):
+    """Sahifa ko'rishlari: daqiqalik hisoblagichlar (dentist.analytics soatlik/kunlikka yig'adi)"""
+    url_name = models.CharField(max_length=50, verbose_name="Sahifa")
+    # 0 - ro'yxat sahifasi
+    object_id = models.PositiveBigIntegerField(default=0, verbose_name="Obyekt ID")
+    minute = models.DateTimeField(verbose_name="Daqiqa")
+    hits = models.PositiveIntegerField(default=0, verbose_name="Ko'rishlar")
+
+    class Meta:
+        verbose_name = "Sahifa ko'rishi (daqiqa)"
+        verbose_name_plural = "Sahifa ko'rishlari (daqiqa)"
+        constraints = [
+            models.UniqueConstraint(fields=['url_name', 'minute', 'object_id'], name='unique_pageview_minute'),
+        ]
+        indexes = [models.Index(fields=['minute'])]
+
+    def __str__(self):
+        return f"{self.url_name} #{self.object_id} ({self.minute})"
+
+
+class PageViewRollup(models.Model):
+    """Sahifa ko'rishlari: soatlik va kunlik yig'indilar (admin grafiklari faqat shundan o'qiydi)"""
+    PERIOD_HOUR = 'hour'
+    PERIOD_DAY = 'day'
+    PERIOD_CHOICES = [(PERIOD_HOUR, "Soat"), (PERIOD_DAY, "Kun")]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES, verbose_name="Davr")
+    start = models.DateTimeField(verbose_name="Boshlanishi")
+    url_name = models.CharField(max_length=50, verbose_name="Sahifa")
+    object_id = models.PositiveBigIntegerField(default=0, verbose_name="Obyekt ID")
+    hits = models.PositiveBigIntegerField(default=0, verbose_name="Ko'rishlar")
+
+    class Meta:
+        verbose_name = "Sahifa ko'rishlari"
+        verbose_name_plural = "Sahifa ko'rishlari"
+        ordering = ['-start']
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'start', 'url_name', 'object_id'], name='unique_pageview_rollup'),
+        ]
+        indexes = [models.Index(fields=['period', 'url_name', 'start'])]
+
+    def __str__(self):
+        return f"{self.url_name} #{self.object_id} ({self.get_period_display()}: {self.start})"
+
+
+class DailyStat(models.Model):
+    """Kunlik statistika: yangi xabarlar va qabullar (dentist.dashboard yangilaydi)"""
+    day = models.DateField(unique=True, verbose_name="Kun")
+    messages = models.PositiveIntegerField(default=0, verbose_name="Xabarlar")
+    bookings = models.PositiveIntegerField(default=0, verbose_name="Qabullar")
+
+    class Meta:
+        verbose_name = "Kunlik statistika"
+        verbose_name_plural = "Kunlik statistika"
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.day}: {self.messages} xabar, {self.bookings} qabul"
+
+
+class InboxStat(models.Model):
+    """Bo'limlar bo'yicha xabarlar soni (dentist.dashboard yangilaydi)"""
+    # Bo'lim id; 0 - bo'lim tanlanmagan xabarlar
+    department_key = models.PositiveBigIntegerField(unique=True, verbose_name="Bo'lim")
+    total = models.IntegerField(default=0, verbose_name="Jami")
+    unread = models.IntegerField(default=0, verbose_name="O'qilmagan")
+
+    class Meta:
+        verbose_name = "Xabarlar statistikasi"
+        verbose_name_plural = "Xabarlar statistikasi"
+
+    def __str__(self):
+        return f"#{self.department_key}: {self.unread}/{self.total}"
+
 
 class ContactMessage(models.Model):
     """Bog'lanish xabarlari"""
@@ -234,18 +660,54 @@ class ContactMessage(models.Model):
     phone = models.CharField(max_length=120, verbose_name="Telefon")
     subject = models.CharField(max_length=120, verbose_name="Mavzu")
     message = models.TextField(verbose_name="Xabar")
+    # Shifokorlar kabinetida shu bo'lim shifokorlariga ko'rsatiladi
+    department = models.ForeignKey(Department, related_name='contact_messages', on_delete=models.SET_NULL,
+                                   null=True, blank=True, verbose_name="Bo'lim")
     is_read = models.BooleanField(default=False, verbose_name="O'qilgan")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan")
 
+    # Takrorlarni aniqlash: sha256(telefon + normallashtirilgan matn)
+    fingerprint = models.CharField(max_length=64, blank=True, editable=False, verbose_name="Fingerprint")
+    duplicate_count = models.PositiveIntegerField(default=1, verbose_name="Yuborilgan soni")
+    last_received_at = models.DateTimeField(null=True, blank=True, verbose_name="Oxirgi marta yuborilgan")
+
+    # Spam: admin belgisi (None - ko'rib chiqilmagan) va klassifikator bahosi
+    is_spam = models.BooleanField(null=True, blank=True, default=None, verbose_name="Spam")
+    spam_score = models.FloatField(null=True, blank=True, editable=False, verbose_name="Spam ehtimoli")
+
     class Meta:
         verbose_name = "Xabar"
         verbose_name_plural = "Xabarlar"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['fingerprint', 'created_at']),
+            models.Index(fields=['is_read', 'created_at']),
+            # Admin'dagi kursorli sahifalash (-created_at, -id)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['department', 'created_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.subject}"
 
 
+class SpamToken(models.Model):
+    """Spam klassifikatori uchun token statistikasi (admin belgilaridan)"""
+    # Hujjatlar umumiy sonini saqlovchi maxsus qator
+    TOTAL = '__docs__'
+
+    token = models.CharField(max_length=100, unique=True, verbose_name="Token")
+    spam_count = models.IntegerField(default=0, verbose_name="Spam xabarlarda")
+    ham_count = models.IntegerField(default=0, verbose_name="Oddiy xabarlarda")
+
+    class Meta:
+        verbose_name = "Spam tokeni"
+        verbose_name_plural = "Spam tokenlari"
+
+    def __str__(self):
+        return self.token
+
+
 class SiteSettings(models.Model):
     """Sayt uchun global sozlamalar (singleton)"""
     clinic_name = models.CharField(max_length=200, verbose_name="Klinika nomi", default="MediNest")
@@ -298,6 +760,25 @@ class SiteSettings(models.Model):
         # Singleton pattern - faqat bitta yozuv bo'lishi mumkin
         self.pk = 1
         super().save(*args, **kwargs)
+        self.sync_intervals()
+
+    def parse_working_hours(self):
+        """Klinika ish vaqti matnlaridan [(hafta kuni, ochilish, yopilish)]"""
+        from dentist.schedule import ScheduleParseError, parse_schedule_text
+
+        intervals = []
+        for text in (self.working_hours_weekday, self.working_hours_weekend):
+            try:
+                intervals.extend(parse_schedule_text(text))
+            except ScheduleParseError:
+                continue
+        return intervals
+
+    def sync_intervals(self):
+        replace_intervals(ScheduleInterval.objects.filter(from_settings=True), [
+            ScheduleInterval(from_settings=True, weekday=day, opens=opens, closes=closes)
+            for day, opens, closes in self.parse_working_hours()
+        ])
     
     @classmethod
     def get_settings(cls):
@@ -305,6 +786,12 @@ class SiteSettings(models.Model):
         settings, created = cls.objects.get_or_create(pk=1)
         return settings
 
+    @classmethod
+    async def aget_settings(cls):
+        """Sozlamalarni olish yoki yaratish (async)"""
+        settings, created = await cls.objects.aget_or_create(pk=1)
+        return settings
+
 
 class ServiceFeature(models.Model):
     """Xizmatning o'ziga xos xususiyatlari"""
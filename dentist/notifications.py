@@ -0,0 +1,308 @@
+"""
+Tashqi xabarnomalar (Telegram bot orqali)
+
+Sinxron va asinxron yuborish uchun umumiy (pooled) HTTP klientlar ishlatiladi,
+shuning uchun har bir xabar uchun yangi TCP/TLS ulanish ochilmaydi.
+
+Saytdan keladigan bildirishnomalar TelegramDispatcher orqali yuboriladi:
+tinch paytda har bir xabar darhol alohida jo'natiladi, ko'p xabar kelgan
+paytda esa oyna (TELEGRAM_DIGEST_WINDOW) ichidagilar bitta digest'ga
+birlashtiriladi va har bir chat uchun yuborish tezligi cheklanadi.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+TELEGRAM_TIMEOUT = 5
+TELEGRAM_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+# Telegram bitta xabar uchun ruxsat etgan maksimal uzunlik
+TELEGRAM_MAX_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+_sync_client = None
+# Har bir event loop uchun alohida AsyncClient (ulanishlar loop'ga bog'langan)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_telegram_config():
+    """(token, chat_id) yoki sozlanmagan bo'lsa None"""
+    token = os.getenv('TELEGRAM_BOT_TOKEN')
+    chat_id = os.getenv('TELEGRAM_CHAT_ID')
+    if not token or not chat_id:
+        return None
+    return token, chat_id
+
+
+def get_sync_client():
+    """Jarayon bo'yicha umumiy sinxron klient"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(timeout=TELEGRAM_TIMEOUT, limits=TELEGRAM_LIMITS)
+    return _sync_client
+
+
+def get_async_client():
+    """Joriy event loop uchun umumiy asinxron klient"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=TELEGRAM_TIMEOUT, limits=TELEGRAM_LIMITS)
+        _async_clients[loop] = client
+    return client
+
+
+def _build_request(message, chat_id=None):
+    config = get_telegram_config()
+    if config is None:
+        return None
+    token, default_chat_id = config
+    payload = {
+        "chat_id": chat_id or default_chat_id,
+        "text": message,
+        "parse_mode": "HTML"
+    }
+    return TELEGRAM_API_URL.format(token=token), payload
+
+
+def _retry_after(response):
+    """429 javobidagi parameters.retry_after (soniya)"""
+    try:
+        return response.json().get('parameters', {}).get('retry_after')
+    except ValueError:
+        return None
+
+
+def send_telegram_message(message, chat_id=None):
+    """Xabarni sinxron yuborish. Muvaffaqiyatli bo'lsa True qaytaradi."""
+    request = _build_request(message, chat_id)
+    if request is None:
+        logger.warning("Telegram sozlanmagan, xabar yuborilmadi")
+        return False
+    url, payload = request
+
+    try:
+        response = get_sync_client().post(url, data=payload)
+    except httpx.HTTPError as e:
+        logger.error("Telegram ulanish xatosi: %s", e)
+        return False
+
+    if response.status_code != 200:
+        logger.error("Telegram javobi %s: %s", response.status_code, response.text)
+    return response.status_code == 200
+
+
+async def asend_telegram_message(message, chat_id=None, client=None):
+    """
+    Xabarni asinxron yuborish (thread pool ishlatilmaydi).
+    Returns: (muvaffaqiyatli, retry_after) - retry_after faqat 429 bo'lganda
+    """
+    request = _build_request(message, chat_id)
+    if request is None:
+        logger.warning("Telegram sozlanmagan, xabar yuborilmadi")
+        return False, None
+    url, payload = request
+
+    try:
+        response = await (client or get_async_client()).post(url, data=payload)
+    except httpx.HTTPError as e:
+        logger.error("Telegram ulanish xatosi: %s", e)
+        return False, None
+
+    if response.status_code == 429:
+        return False, _retry_after(response) or 1
+    if response.status_code != 200:
+        logger.error("Telegram javobi %s: %s", response.status_code, response.text)
+    return response.status_code == 200, None
+
+
+@dataclass
+class QueuedMessage:
+    text: str
+    enqueued_at: float
+
+
+@dataclass
+class DispatcherMetrics:
+    """Navbat kechikishi va digest hajmlari statistikasi"""
+    sample_size: int = 1000
+    messages: int = 0
+    batches: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    batch_sizes: Counter = field(default_factory=Counter)
+    latencies: deque = None
+
+    def __post_init__(self):
+        self.latencies = deque(maxlen=self.sample_size)
+
+    def record_batch(self, size, latencies, ok):
+        self.batches += 1
+        self.batch_sizes[size] += 1
+        if ok:
+            self.messages += size
+            self.latencies.extend(latencies)
+        else:
+            self.failures += size
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        return {
+            'messages': self.messages,
+            'batches': self.batches,
+            'failures': self.failures,
+            'rate_limited': self.rate_limited,
+            'batch_sizes': dict(self.batch_sizes),
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else None,
+        }
+
+
+class TelegramDispatcher:
+    """
+    Har bir chat uchun navbat va yuboruvchi vazifa.
+    enqueue() faqat dispatcher ishlayotgan event loop ichidan chaqiriladi.
+    """
+
+    def __init__(self, send, window, min_interval, max_batch=20, clock=time.monotonic):
+        self.send = send
+        self.window = window
+        self.min_interval = min_interval
+        self.max_batch = max_batch
+        self.clock = clock
+        self.metrics = DispatcherMetrics()
+        self._queues = {}
+        self._workers = {}
+        self._last_sent_at = {}
+        self._next_send_at = {}
+
+    def enqueue(self, text, chat_id):
+        self._queues.setdefault(chat_id, deque()).append(QueuedMessage(text, self.clock()))
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.get_running_loop().create_task(self._run(chat_id))
+
+    async def drain(self):
+        """Barcha navbatlar bo'shaguncha kutish"""
+        while self._workers:
+            await asyncio.gather(*list(self._workers.values()), return_exceptions=True)
+
+    def _take_batch(self, queue):
+        batch = [queue.popleft()]
+        length = len(batch[0].text)
+        while queue and len(batch) < self.max_batch:
+            length += len(DIGEST_SEPARATOR) + len(queue[0].text)
+            if length > TELEGRAM_MAX_LENGTH - 100:
+                break
+            batch.append(queue.popleft())
+        return batch
+
+    @staticmethod
+    def format_batch(batch):
+        if len(batch) == 1:
+            return batch[0].text
+        header = f"📬 <b>{len(batch)} ta yangi xabar</b>"
+        return header + DIGEST_SEPARATOR + DIGEST_SEPARATOR.join(item.text for item in batch)
+
+    async def _run(self, chat_id):
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                now = self.clock()
+                delay = self._next_send_at.get(chat_id, now) - now
+                quiet = now - self._last_sent_at.get(chat_id, float('-inf')) >= self.window
+                if not (quiet and len(queue) == 1):
+                    # Faol davr: oyna tugaguncha kelgan xabarlarni yig'amiz
+                    delay = max(delay, queue[0].enqueued_at + self.window - now)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                batch = self._take_batch(queue)
+                ok, retry_after = await self.send(self.format_batch(batch), chat_id)
+                sent_at = self.clock()
+
+                if retry_after:
+                    # Telegram tezlik chegarasi: xabarlarni navbat boshiga qaytaramiz
+                    self.metrics.rate_limited += 1
+                    queue.extendleft(reversed(batch))
+                    self._next_send_at[chat_id] = sent_at + retry_after
+                    continue
+
+                self._last_sent_at[chat_id] = sent_at
+                self._next_send_at[chat_id] = sent_at + self.min_interval
+                self.metrics.record_batch(len(batch), [sent_at - item.enqueued_at for item in batch], ok)
+        finally:
+            self._workers.pop(chat_id, None)
+
+
+_dispatcher = None
+_dispatcher_loop = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """
+    Jarayon bo'yicha yagona dispatcher va uning event loop'i.
+    Loop alohida fon thread'ida ishlaydi, shuning uchun WSGI va ASGI
+    ostida ham so'rov tugagach navbat yo'qolmaydi.
+    """
+    global _dispatcher, _dispatcher_loop
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='telegram-dispatcher', daemon=True).start()
+            _dispatcher = TelegramDispatcher(
+                asend_telegram_message,
+                window=settings.TELEGRAM_DIGEST_WINDOW,
+                min_interval=settings.TELEGRAM_SEND_INTERVAL,
+                max_batch=settings.TELEGRAM_DIGEST_MAX_BATCH,
+            )
+            _dispatcher_loop = loop
+            atexit.register(_flush_dispatcher)
+    return _dispatcher, _dispatcher_loop
+
+
+def _flush_dispatcher(timeout=10):
+    try:
+        asyncio.run_coroutine_threadsafe(_dispatcher.drain(), _dispatcher_loop).result(timeout)
+    except Exception as e:
+        logger.error("Telegram navbati to'liq yuborilmadi: %s", e)
+
+
+def dispatch_telegram_message(message, chat_id=None):
+    """
+    Xabarni navbatga qo'yish (javobni kutmasdan, bloklamaydi).
+    Telegram sozlanmagan bo'lsa False qaytaradi.
+    """
+    config = get_telegram_config()
+    if config is None:
+        return False
+
+    dispatcher, loop = get_dispatcher()
+    loop.call_soon_threadsafe(dispatcher.enqueue, message, chat_id or config[1])
+    return True
+
+
+def get_dispatcher_metrics():
+    """Dispatcher statistikasi (ishga tushmagan bo'lsa None)"""
+    if _dispatcher is None:
+        return None
+    return _dispatcher.metrics.snapshot()
@@ -0,0 +1,120 @@
+"""
+Katta jadvallar uchun admin sahifalash
+
+- estimate_count: filtrsiz jadval uchun DB statistikasidan taxminiy son,
+  filtrlangan so'rovlar uchun esa chegaralangan (COUNT ... LIMIT) son.
+- KeysetChangeList: OFFSET o'rniga (-created_at, -id) kursori bo'yicha
+  sahifalash. Har bir sahifa indeks bo'yicha diapazon o'qish bilan olinadi,
+  sahifa raqamidan qat'i nazar tezligi bir xil.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.db import connections
+from django.db.models import Q
+
+CURSOR_VAR = 'cursor'
+COUNT_LIMIT = 10000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _table_estimate(model, using):
+    """Jadval qatorlari sonini statistikadan olish (topilmasa None)"""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            # -1: jadval hali ANALYZE qilinmagan
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [table]
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            # ANALYZE bo'lmasa: birlamchi kalit diapazoni (indeks bo'yicha ikki qiymat)
+            pk = model._meta.pk.column
+            cursor.execute(f'SELECT MAX("{pk}") - MIN("{pk}") + 1 FROM "{table}"')
+            row = cursor.fetchone()
+            return row[0] or 0
+    return None
+
+
+def estimate_count(queryset, limit=COUNT_LIMIT):
+    """
+    Returns: (son, aniqmi)
+    Filtrsiz so'rov uchun taxminiy son, aks holda limit+1 gacha sanaladi.
+    """
+    if not queryset.query.where:
+        estimate = _table_estimate(queryset.model, queryset.db)
+        if estimate is not None and estimate > limit:
+            return estimate, False
+
+    count = queryset.order_by()[:limit + 1].count()
+    if count > limit:
+        return limit, False
+    return count, True
+
+
+def encode_cursor(obj):
+    microseconds = (obj.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{microseconds}-{obj.pk}"
+
+
+def decode_cursor(value):
+    try:
+        microseconds, pk = value.split('-')
+        return EPOCH + timedelta(microseconds=int(microseconds)), int(pk)
+    except ValueError:
+        raise IncorrectLookupParameters
+
+
+class KeysetChangeList(ChangeList):
+    """(-created_at, -id) bo'yicha kursorli sahifalash"""
+
+    def get_ordering(self, request, queryset):
+        # Kursor shu tartibga tayanadi, ustun bo'yicha saralash o'chirilgan
+        return ['-created_at', '-pk']
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        queryset = self.queryset
+        self.cursor = self.params.get(CURSOR_VAR)
+        if self.cursor:
+            created_at, pk = decode_cursor(self.cursor)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+        result_list = queryset[:self.list_per_page]
+        page = list(result_list)
+        has_next = len(page) == self.list_per_page and queryset.filter(
+            Q(created_at__lt=page[-1].created_at) | Q(created_at=page[-1].created_at, pk__lt=page[-1].pk)
+        ).exists()
+
+        result_count, is_exact = estimate_count(self.queryset)
+        self.result_count = result_count
+        self.result_count_display = result_count if is_exact else f"~{result_count}"
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor) or has_next
+        self.paginator = None
+        self.first_page_url = self.get_query_string(remove=[CURSOR_VAR]) if self.cursor else None
+        self.next_page_url = self.get_query_string({CURSOR_VAR: encode_cursor(page[-1])}) if has_next else None
@@ -0,0 +1,110 @@
+"""
+Xizmatlar va shifokorlarning mashhurlik reytingi
+
+- Sahifa ko'rishlari va "Qabulga yozilish" bosishlari alohida hisoblagichsiz,
+  dentist.analytics buferi orqali yig'iladi: bufer fon thread'ida
+  yozilganda detal sahifa ko'rishlari va bosishlar kunlik ActivityCount
+  qatorlariga ham qo'shiladi (bitta bufer, bitta yozish yo'li).
+- PopularityRank shu fon ishida har POPULARITY_RECOMPUTE_INTERVAL da yoki
+  update_popularity buyrug'i (cron) bilan qayta hisoblanadi: oxirgi
+  POPULARITY_WINDOW_DAYS kun, har bir kun yoshi bo'yicha eksponensial
+  kamayadi (POPULARITY_HALF_LIFE_DAYS da ikki baravar). Oraliq qulfi cache.add:
+  LocMemCache'da u faqat jarayon ichida amal qiladi, ya'ni har bir jarayon
+  o'z oralig'ida bir martadan hisoblaydi (natija bir xil, ortiqcha ish xolos);
+  umumiy cache'da (Redis, Memcached) - barcha jarayonlar uchun bitta.
+- "Mashhur xizmatlar" va "asosiy shifokorlar" shu kichik jadvaldan olinadi;
+  statistika yetarli bo'lmasa qo'lda belgilanganlar (is_popular/is_futured)
+  bilan to'ldiriladi.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from dentist.caching import bump_generation
+from dentist.models import ActivityCount, Doctor, PopularityRank, Service
+
+RECOMPUTE_LOCK_KEY = 'popularity:recompute'
+
+
+def compute_scores(rows, today, half_life=None, booking_weight=None):
+    """rows: [(turi, obyekt id, kun, ko'rishlar, bosishlar)] -> {(turi, obyekt id): ball}"""
+    half_life = half_life or settings.POPULARITY_HALF_LIFE_DAYS
+    booking_weight = settings.POPULARITY_BOOKING_WEIGHT if booking_weight is None else booking_weight
+    scores = defaultdict(float)
+    for kind, object_id, day, views, bookings in rows:
+        scores[kind, object_id] += (views + booking_weight * bookings) * 0.5 ** ((today - day).days / half_life)
+    return scores
+
+
+def recompute(today=None):
+    """Reyting jadvalini qayta qurish. Returns: jadvaldagi qatorlar soni"""
+    today = today or timezone.localdate()
+    rows = ActivityCount.objects.filter(
+        day__gt=today - timedelta(days=settings.POPULARITY_WINDOW_DAYS), day__lte=today
+    ).values_list('kind', 'object_id', 'day', 'views', 'bookings')
+    scores = compute_scores(rows, today)
+
+    # Faqat saytda ko'rinadigan obyektlar reytingga kiradi
+    visible = {
+        ActivityCount.KIND_SERVICE: Service.objects.filter(is_active=True),
+        ActivityCount.KIND_DOCTOR: Doctor.objects.filter(is_available=True),
+    }
+    now = timezone.now()
+    ranks = []
+    for kind, queryset in visible.items():
+        candidates = {object_id: score for (k, object_id), score in scores.items() if k == kind and score > 0}
+        allowed = set(queryset.filter(pk__in=list(candidates)).values_list('pk', flat=True))
+        ranked = sorted(
+            ((score, object_id) for object_id, score in candidates.items() if object_id in allowed),
+            key=lambda item: (-item[0], item[1]),
+        )[:settings.POPULARITY_RANK_SIZE]
+        ranks += [
+            PopularityRank(kind=kind, object_id=object_id, position=position, score=round(score, 3), computed_at=now)
+            for position, (score, object_id) in enumerate(ranked, start=1)
+        ]
+
+    with transaction.atomic():
+        PopularityRank.objects.all().delete()
+        PopularityRank.objects.bulk_create(ranks)
+    transaction.on_commit(lambda: bump_generation(PopularityRank))
+    return len(ranks)
+
+
+def recompute_if_due():
+    # Qulf cache darajasida: LocMemCache'da har bir jarayon uchun alohida
+    if cache.add(RECOMPUTE_LOCK_KEY, 1, settings.POPULARITY_RECOMPUTE_INTERVAL):
+        recompute()
+        return True
+    return False
+
+
+def ranked_ids(kind, limit):
+    return list(
+        PopularityRank.objects.filter(kind=kind, position__lte=limit)
+        .order_by('position').values_list('object_id', flat=True)
+    )
+
+
+def _ranked(queryset, kind, limit, fallback):
+    ids = ranked_ids(kind, limit)
+    objects = queryset.in_bulk(ids)
+    result = [objects[pk] for pk in ids if pk in objects]
+    if len(result) < limit:
+        # Yangi sayt yoki statistika kam: qo'lda belgilanganlar bilan to'ldiriladi
+        result += list(queryset.filter(**fallback).exclude(pk__in=ids)[:limit - len(result)])
+    return result
+
+
+def popular_services(limit=6):
+    queryset = Service.objects.filter(is_active=True).select_related('department')
+    return _ranked(queryset, ActivityCount.KIND_SERVICE, limit, {'is_popular': True})
+
+
+def featured_doctors(limit=3):
+    queryset = Doctor.objects.filter(is_available=True).select_related('department')
+    return _ranked(queryset, ActivityCount.KIND_DOCTOR, limit, {'is_futured': True})
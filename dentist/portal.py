@@ -0,0 +1,207 @@
+"""
+Shifokor kabineti: qabullar jadvalining o'qish modeli
+
+Har bir shifokor uchun joriy haftaning dushanbasidan WINDOW_DAYS kun
+oldinga qabullar qatorlari (qabul vaqti bo'yicha saralangan) cache'da
+saqlanadi. Sahifa yangilanganda DB'ga so'rov va saralash yo'q: kerakli
+kun/hafta bisect bilan kesib olinadi.
+
+Qabul saqlanganda/o'chirilganda faqat shu shifokor modelidagi bitta qator
+almashtiriladi (tranzaksiya tugagach) va versiya o'zgaradi; versiya
+avto-yangilanish so'rovlari uchun ETag sifatida ishlatiladi. Yangi hafta
+boshlanganda yoki yozuv cache'dan chiqib ketganda model qayta quriladi.
+
+Parallel o'zgarishlar yo'qolmasligi uchun har bir o'zgarish shifokorning
+atomar hisoblagichini (cache.incr) oshiradi, model esa qaysi hisoblagich
+qiymatigacha bo'lgan o'zgarishlarni o'z ichiga olganini saqlaydi. Model faqat
+oldingi qiymatga mos kelsa to'ldiriladi; aks holda o'chiriladi va o'qishda
+hisoblagich bilan mos kelmagan model qayta quriladi.
+"""
+
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+WINDOW_DAYS = 14
+READ_MODEL_KEY = 'portal:schedule:{doctor_id}'
+READ_MODEL_TIMEOUT = 6 * 3600
+SEQUENCE_KEY = 'portal:schedule:{doctor_id}:seq'
+# (qabul vaqti timestamp, id, bemor, telefon, xizmat, holat, davomiylik)
+COLUMNS = ('starts_at', 'pk', 'patient_name', 'patient_phone', 'service__name', 'status', 'duration')
+
+
+def week_start(today):
+    return today - timedelta(days=today.weekday())
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def _key(doctor_id):
+    return READ_MODEL_KEY.format(doctor_id=doctor_id)
+
+
+def _sequence_key(doctor_id):
+    return SEQUENCE_KEY.format(doctor_id=doctor_id)
+
+
+def _bump_sequence(doctor_id):
+    key = _sequence_key(doctor_id)
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # add va incr orasida cache'dan chiqib ketgan
+        cache.set(key, 1, None)
+        return 1
+
+
+def _row(values):
+    starts_at, *rest = values
+    return (starts_at.timestamp(), *rest)
+
+
+def build_read_model(doctor_id, today):
+    from dentist.models import Appointment
+
+    start = week_start(today)
+    lower, _ = day_bounds(start)
+    _, upper = day_bounds(start + timedelta(days=WINDOW_DAYS - 1))
+    rows = [_row(values) for values in Appointment.objects.filter(
+        doctor_id=doctor_id,
+        starts_at__gte=datetime.fromtimestamp(lower, tz=timezone.get_default_timezone()),
+        starts_at__lt=datetime.fromtimestamp(upper, tz=timezone.get_default_timezone()),
+    ).exclude(status=Appointment.STATUS_CANCELLED).order_by('starts_at', 'pk').values_list(*COLUMNS)]
+    return {'start': start.isoformat(), 'lower': lower, 'upper': upper, 'version': time.time_ns(), 'rows': rows}
+
+
+def get_read_model(doctor_id, today=None):
+    today = today or timezone.localdate()
+    key, sequence_key = _key(doctor_id), _sequence_key(doctor_id)
+    values = cache.get_many([key, sequence_key])
+    model, sequence = values.get(key), values.get(sequence_key, 0)
+    if model is None or model['start'] != week_start(today).isoformat() or model.get('sequence') != sequence:
+        # Hisoblagich so'rovdan oldin o'qilgan: qurish paytidagi o'zgarish keyingi o'qishda ko'rinadi
+        model = build_read_model(doctor_id, today)
+        model['sequence'] = sequence
+        cache.set(key, model, READ_MODEL_TIMEOUT)
+    return model
+
+
+def forget(*doctor_ids):
+    """Ommaviy o'zgarishlardan keyin (signal'siz) modellarni o'chirish"""
+    cache.delete_many([_key(doctor_id) for doctor_id in doctor_ids])
+
+
+def apply_change(doctor_id, appointment_id, row=None):
+    """Bitta qabul qatorini almashtirish (row=None - olib tashlash). Model cache'da bo'lmasa hech narsa qilinmaydi"""
+    key = _key(doctor_id)
+    sequence = _bump_sequence(doctor_id)
+    model = cache.get(key)
+    if model is None:
+        return
+    if model.get('sequence') != sequence - 1:
+        # Parallel o'zgarish bilan to'qnashuv: qayta qurishga qoldiriladi
+        cache.delete(key)
+        return
+    rows = [existing for existing in model['rows'] if existing[1] != appointment_id]
+    if row is not None and model['lower'] <= row[0] < model['upper']:
+        insort(rows, row)
+    model.update(rows=rows, version=time.time_ns(), sequence=sequence)
+    cache.set(key, model, READ_MODEL_TIMEOUT)
+
+
+def appointment_row(appointment):
+    from dentist.models import Appointment
+
+    if appointment.status == Appointment.STATUS_CANCELLED:
+        return None
+    service_name = appointment.service.name if appointment.service_id else None
+    return _row((appointment.starts_at, appointment.pk, appointment.patient_name, appointment.patient_phone,
+                 service_name, appointment.status, appointment.duration))
+
+
+def _slice(rows, lower, upper):
+    return rows[bisect_left(rows, (lower,)):bisect_left(rows, (upper,))]
+
+
+def _display(row):
+    starts_at, pk, patient_name, patient_phone, service_name, status, duration = row
+    local = datetime.fromtimestamp(starts_at, tz=timezone.get_default_timezone())
+    return {
+        'pk': pk, 'starts_at': local, 'ends_at': local + timedelta(minutes=duration),
+        'patient_name': patient_name, 'patient_phone': patient_phone, 'service': service_name, 'status': status,
+    }
+
+
+def dashboard(doctor_id, today=None):
+    """Kabinet uchun bugungi va shu haftalik qabullar hamda sonlar"""
+    from dentist.schedule import DAY_LABELS
+
+    today = today or timezone.localdate()
+    model = get_read_model(doctor_id, today)
+    rows = model['rows']
+    start = week_start(today)
+    week_lower, _ = day_bounds(start)
+    _, week_upper = day_bounds(start + timedelta(days=6))
+    today_lower, today_upper = day_bounds(today)
+
+    week_rows = _slice(rows, week_lower, week_upper)
+    days = []
+    for offset in range(7):
+        day = start + timedelta(days=offset)
+        lower, upper = day_bounds(day)
+        days.append({
+            'date': day, 'label': DAY_LABELS[offset], 'is_today': day == today,
+            'appointments': [_display(row) for row in _slice(week_rows, lower, upper)],
+        })
+    today_rows = _slice(rows, today_lower, today_upper)
+    return {
+        'version': model['version'],
+        'today': [_display(row) for row in today_rows],
+        'week': days,
+        'today_count': len(today_rows),
+        'week_count': len(week_rows),
+        'week_patients': len({row[3] for row in week_rows}),
+    }
+
+
+def schedule_version(doctor_id, today=None):
+    return get_read_model(doctor_id, today)['version']
+
+
+def _remember_doctor(sender, instance, **kwargs):
+    # Qabul boshqa shifokorga o'tkazilsa eski shifokor modelidan ham olib tashlash uchun
+    instance._portal_doctor_id = instance.doctor_id
+
+
+def _on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_portal_doctor_id', None)
+    doctor_id, row = instance.doctor_id, appointment_row(instance)
+    instance._portal_doctor_id = doctor_id
+
+    def update():
+        if previous and previous != doctor_id:
+            apply_change(previous, instance.pk)
+        apply_change(doctor_id, instance.pk, row)
+    transaction.on_commit(update)
+
+
+def _on_delete(sender, instance, **kwargs):
+    doctor_id, pk = instance.doctor_id, instance.pk
+    transaction.on_commit(lambda: apply_change(doctor_id, pk))
+
+
+def connect_signals():
+    from dentist.models import Appointment
+
+    post_init.connect(_remember_doctor, sender=Appointment, dispatch_uid='portal_remember_doctor')
+    post_save.connect(_on_save, sender=Appointment, dispatch_uid='portal_appointment_saved')
+    post_delete.connect(_on_delete, sender=Appointment, dispatch_uid='portal_appointment_deleted')
@@ -0,0 +1,29 @@
+"""
+Xizmatlar ro'yxati uchun narx/davomiylik yozuvlari
+
+Formatlangan matnlar xizmat versiyasi (pk + updated_at) bo'yicha cache'da
+saqlanadi; sahifadagi barcha xizmatlar uchun bitta get_many bilan olinadi.
+"""
+
+from django.core.cache import cache
+
+LABEL_CACHE_TIMEOUT = 7 * 24 * 3600
+
+
+def label_key(service):
+    return f"service-labels:{service.pk}:{service.updated_at.timestamp()}"
+
+
+def attach_labels(services):
+    """Har bir xizmatga price_label va duration_label atributlarini qo'shish"""
+    keys = {label_key(service): service for service in services}
+    cached = cache.get_many(keys)
+    missing = {}
+    for key, service in keys.items():
+        labels = cached.get(key)
+        if labels is None:
+            labels = missing[key] = (service.get_price_display(), service.get_duration_display())
+        service.price_label, service.duration_label = labels
+    if missing:
+        cache.set_many(missing, LABEL_CACHE_TIMEOUT)
+    return services
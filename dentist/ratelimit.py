@@ -0,0 +1,151 @@
+"""
+So'rovlarni cheklash (rate limiting) - token bucket algoritmi
+
+Har bir kalit (IP yoki telefon) uchun bucket holati cache'da
+(qolgan tokenlar, oxirgi yangilanish vaqti) ko'rinishida saqlanadi.
+Tekshiruv O(1), bucket to'liq to'lgach yozuv cache'dan o'zi o'chadi.
+Bir nechta worker ishlaganda CACHES umumiy backend (Redis/Memcached)
+bo'lishi kerak, aks holda har bir jarayon o'z hisobini yuritadi.
+"""
+
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import HttpResponse
+
+from dentist.forms import validate_uzbek_phone
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60)"""
+    try:
+        count, period = rate.split('/')
+        return int(count), PERIODS[period]
+    except (ValueError, KeyError):
+        raise ImproperlyConfigured(f"Noto'g'ri rate formati: {rate!r} (masalan: '5/m')")
+
+
+class TokenBucket:
+    """Cache'da saqlanadigan token bucket"""
+
+    def __init__(self, rate, cache_alias='default'):
+        self.capacity, self.period = parse_rate(rate)
+        self.refill_rate = self.capacity / self.period
+        self.cache = caches[cache_alias]
+
+    def _available(self, key, now):
+        state = self.cache.get(key)
+        if state is None:
+            return self.capacity
+        available, updated = state
+        return min(self.capacity, available + (now - updated) * self.refill_rate)
+
+    def check(self, key, tokens=1, now=None):
+        """Token sarflamasdan tekshirish. Returns: consume() bilan bir xil"""
+        now = time.time() if now is None else now
+        available = self._available(key, now)
+        if available < tokens:
+            return False, math.ceil((tokens - available) / self.refill_rate)
+        return True, 0
+
+    def consume(self, key, tokens=1, now=None):
+        """
+        Token olishga urinish.
+        Returns: (ruxsat berildimi, necha soniyadan keyin qayta urinish mumkin)
+        """
+        now = time.time() if now is None else now
+        available = self._available(key, now)
+        if available < tokens:
+            return False, math.ceil((tokens - available) / self.refill_rate)
+
+        available -= tokens
+        # Bucket to'liq to'lguncha saqlanadi, keyin yozuv o'zi o'chadi
+        timeout = math.ceil((self.capacity - available) / self.refill_rate) or 1
+        self.cache.set(key, (available, now), timeout=timeout)
+        return True, 0
+
+
+def get_client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_normalized_phone(request):
+    """POST'dagi telefonni validate_uzbek_phone orqali normallashtirish"""
+    try:
+        return validate_uzbek_phone(request.POST.get('phone', ''))
+    except ValidationError:
+        # Noto'g'ri raqamni forma o'zi rad etadi, bu yerda faqat IP cheklovi ishlaydi
+        return None
+
+
+KEY_FUNCTIONS = {
+    'ip': get_client_ip,
+    'phone': get_normalized_phone,
+}
+
+
+def check_rate_limit(route, request):
+    """
+    settings.RATE_LIMITS[route] bo'yicha barcha bucket'larni tekshirish.
+    Token faqat hamma bucket ruxsat bersa sarflanadi: bloklangan telefon
+    bilan qayta urinish IP limitini kamaytirmaydi.
+    Returns: None (ruxsat) yoki qayta urinishgacha soniyalar.
+    """
+    config = getattr(settings, 'RATE_LIMITS', {}).get(route)
+    if not config:
+        return None
+
+    cache_alias = getattr(settings, 'RATE_LIMIT_CACHE', 'default')
+    buckets = []
+    for kind, rate in config.items():
+        value = KEY_FUNCTIONS[kind](request)
+        if not value:
+            continue
+        digest = hashlib.md5(value.encode()).hexdigest()
+        buckets.append((TokenBucket(rate, cache_alias), f"ratelimit:{route}:{kind}:{digest}"))
+
+    refused = [retry_after for bucket, key in buckets for allowed, retry_after in [bucket.check(key)] if not allowed]
+    if refused:
+        return max(refused)
+    for bucket, key in buckets:
+        allowed, retry_after = bucket.consume(key)
+        if not allowed:
+            # Tekshiruv va sarflash orasida parallel so'rov oxirgi tokenni olgan
+            return retry_after
+    return None
+
+
+class RateLimitMixin:
+    """
+    View uchun rate limit. Tekshiruv dispatch'da, forma validatsiyasi
+    va har qanday DB murojaatidan oldin bajariladi.
+    """
+    ratelimit_route = None
+    ratelimit_methods = ('POST',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in self.ratelimit_methods:
+            retry_after = check_rate_limit(self.ratelimit_route, request)
+            if retry_after is not None:
+                response = self.ratelimited(request, retry_after)
+                if self.view_is_async:
+                    async def func():
+                        return response
+                    return func()
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
+    def ratelimited(self, request, retry_after):
+        response = HttpResponse(
+            "Juda ko'p so'rov yuborildi. Iltimos, birozdan keyin qayta urinib ko'ring.",
+            status=429,
+            content_type='text/plain; charset=utf-8',
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
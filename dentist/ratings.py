@@ -0,0 +1,111 @@
+"""
+Shifokor reytingi: tasdiqlangan sharhlar statistikasi
+
+Doctor.review_count, review_sum va stars_1..stars_5 har bir sharh
+holati o'zgarganda bitta UPDATE bilan (F ifodalar) o'zgartiriladi, rating
+ham shu so'rovda yangi o'rtachadan hisoblanadi. Shuning uchun sahifalarda
+AVG()/COUNT() so'rovlari yo'q va bir vaqtdagi o'zgarishlar bir-birini
+o'chirib yubormaydi. Sharh qolmasa rating oxirgi qiymatida qoladi.
+
+Ommaviy moderatsiya (set_status) o'zgarishlarni shifokor va baho bo'yicha
+guruhlab, har bir shifokorga bitta UPDATE yuboradi.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, When
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+
+from dentist.caching import bump_generation
+
+
+def apply_deltas(doctor_id, deltas):
+    """deltas: {baho: +n/-n} - bitta shifokor uchun bitta UPDATE"""
+    from dentist.models import Doctor
+
+    deltas = {stars: n for stars, n in deltas.items() if n}
+    if not deltas:
+        return
+    count = sum(deltas.values())
+    total = sum(stars * n for stars, n in deltas.items())
+    new_count = F('review_count') + count
+    average = Round(Cast(F('review_sum') + total, FloatField()) / Cast(new_count, FloatField()), 1)
+    Doctor.objects.filter(pk=doctor_id).update(
+        # Keshlangan shifokor kartalari updated_at bo'yicha yangilanadi
+        updated_at=timezone.now(),
+        review_count=new_count,
+        review_sum=F('review_sum') + total,
+        rating=Case(
+            When(review_count__gt=-count, then=Cast(average, DecimalField(max_digits=3, decimal_places=1))),
+            default=F('rating'),
+        ),
+        **{f'stars_{stars}': F(f'stars_{stars}') + n for stars, n in deltas.items()},
+    )
+    # QuerySet.update signal yubormaydi: katalog keshlari tranzaksiya tugagach bekor qilinadi
+    transaction.on_commit(lambda: bump_generation(Doctor))
+
+
+def apply_review_change(old, new):
+    """old/new: (doctor_id, baho) yoki None (statistikada emas)"""
+    if old == new:
+        return
+    per_doctor = defaultdict(lambda: defaultdict(int))
+    if old is not None:
+        per_doctor[old[0]][old[1]] -= 1
+    if new is not None:
+        per_doctor[new[0]][new[1]] += 1
+    for doctor_id, deltas in per_doctor.items():
+        apply_deltas(doctor_id, deltas)
+
+
+def _grouped(queryset):
+    per_doctor = defaultdict(dict)
+    for row in queryset.order_by().values('doctor_id', 'rating').annotate(n=Count('pk')):
+        per_doctor[row['doctor_id']][row['rating']] = row['n']
+    return per_doctor
+
+
+def set_status(queryset, status):
+    """Sharhlar holatini ommaviy o'zgartirish. Returns: o'zgargan sharhlar soni"""
+    from dentist.models import Review
+
+    with transaction.atomic():
+        # Qatorlar qulflanadi: parallel moderatsiya bir sharhni ikki marta hisoblamaydi
+        pks = list(queryset.exclude(status=status).select_for_update().values_list('pk', flat=True))
+        changing = Review.objects.filter(pk__in=pks)
+        sign = 1 if status == Review.STATUS_APPROVED else -1
+        # Tasdiqlanayotganlar qo'shiladi, tasdiqlanganlikdan chiqayotganlar ayiriladi
+        counted = changing.exclude(status=Review.STATUS_APPROVED) if sign > 0 else changing.filter(
+            status=Review.STATUS_APPROVED
+        )
+        for doctor_id, deltas in _grouped(counted).items():
+            apply_deltas(doctor_id, {stars: sign * n for stars, n in deltas.items()})
+        updated = changing.update(status=status, moderated_at=timezone.now())
+    transaction.on_commit(lambda: bump_generation(Review))
+    return updated
+
+
+def delete_reviews(queryset):
+    from dentist.models import Review
+
+    with transaction.atomic():
+        for doctor_id, deltas in _grouped(queryset.filter(status=Review.STATUS_APPROVED)).items():
+            apply_deltas(doctor_id, {stars: -n for stars, n in deltas.items()})
+        deleted, _ = queryset.delete()
+    transaction.on_commit(lambda: bump_generation(Review))
+    return deleted
+
+
+def recalculate(doctor_ids=None):
+    """Statistikani sharhlardan qaytadan hisoblash (ma'lumotlar qo'lda o'zgartirilgan bo'lsa)"""
+    from dentist.models import Doctor, Review
+
+    doctors = Doctor.objects.all() if doctor_ids is None else Doctor.objects.filter(pk__in=doctor_ids)
+    with transaction.atomic():
+        doctors.update(updated_at=timezone.now(), review_count=0, review_sum=0,
+                       stars_1=0, stars_2=0, stars_3=0, stars_4=0, stars_5=0)
+        approved = Review.objects.filter(status=Review.STATUS_APPROVED, doctor__in=doctors)
+        for doctor_id, deltas in _grouped(approved).items():
+            apply_deltas(doctor_id, deltas)
@@ -0,0 +1,248 @@
+"""
+Qabul eslatmalari (T-24 soat, T-2 soat) rejalashtiruvchisi
+
+- Kelgusi qabullar uchun eslatmalar min-heap'da (vaqt, qabul, offset)
+  saqlanadi; jarayon keyingi eslatma vaqtigacha uxlaydi, shuning uchun
+  kutayotgan eslatmalar soni CPU sarfiga ta'sir qilmaydi.
+- O'zgarishlar Appointment avlodi orqali aniqlanadi: avlod o'zgargandagina
+  updated_at >= belgi bo'yicha faqat o'zgargan qabullar o'qiladi.
+  Eski heap yozuvlari o'chirilmaydi, yuborish oldidan tekshiriladi.
+- Yuborishdan oldin AppointmentReminder qatori (unique qabul+offset+qabul
+  vaqti; qabul ko'chirilsa yangi vaqt uchun eslatmalar qaytadan yuboriladi)
+  yoziladi va faqat qatorni o'zi yozgan jarayon yuboradi: parallel yoki
+  qayta ishga tushganda yuborilganlar takrorlanmaydi, o'tib
+  ketgan (hali yuborilmagan) eslatmalar esa darhol yuboriladi. Bir qabul
+  uchun bir nechtasi birdan kechiksa, faqat eng yaqini yuboriladi.
+- Yuborish paytida jarayon to'xtasa, eslatma "yuborilmoqda" holatida
+  qoladi va qayta yuborilmaydi (ikki marta yuborgandan ko'ra bir marta).
+"""
+
+import heapq
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from dentist.caching import get_generation
+from dentist.models import Appointment, AppointmentReminder
+from dentist.notifications import send_telegram_message
+
+logger = logging.getLogger(__name__)
+
+# Ulanish paytida commit qilinmagan o'zgarishlarni o'tkazib yubormaslik uchun
+RELOAD_OVERLAP = timedelta(minutes=1)
+
+
+def format_reminder(appointment, offset):
+    starts_at = timezone.localtime(appointment.starts_at)
+    when = "ertaga" if offset >= 12 * 60 else "bugun"
+    lines = [
+        "🦷 <b>Qabul eslatmasi</b>",
+        f"Hurmatli {appointment.patient_name}, {when} soat {starts_at:%H:%M} da "
+        f"{appointment.doctor.get_full_name()} qabuliga yozilgansiz ({starts_at:%d.%m.%Y}).",
+    ]
+    if appointment.service_id:
+        lines.append(f"Xizmat: {appointment.service.name}")
+    return '\n'.join(lines)
+
+
+def telegram_sender(appointment, offset):
+    """
+    Bemorning Telegram chatiga; chat bo'lmasa klinika chatiga (administrator
+    bemorga qo'ng'iroq qilishi uchun). SMS provayderi REMINDER_SENDER orqali ulanadi.
+    """
+    text = format_reminder(appointment, offset)
+    if appointment.telegram_chat_id:
+        return send_telegram_message(text, appointment.telegram_chat_id)
+    return send_telegram_message(f"{text}\nTelefon: {appointment.patient_phone}")
+
+
+class LocalSender:
+    """Sinov va lokal ishga tushirish uchun: xabarlarni yubormay saqlaydi"""
+
+    def __init__(self, fail_for=()):
+        self.sent = []
+        self.fail_for = set(fail_for)
+
+    def __call__(self, appointment, offset):
+        if appointment.pk in self.fail_for:
+            return False
+        self.sent.append((appointment.pk, offset, format_reminder(appointment, offset)))
+        return True
+
+
+def get_sender():
+    return import_string(settings.REMINDER_SENDER)
+
+
+class ReminderScheduler:
+    """Bitta jarayonda ishlaydigan rejalashtiruvchi (clock - aware datetime qaytaradi)"""
+
+    def __init__(self, sender, clock=timezone.now, offsets=None, batch_size=None, reload_interval=None):
+        self.sender = sender
+        self.clock = clock
+        self.offsets = sorted(offsets or settings.REMINDER_OFFSETS, reverse=True)
+        self.batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        self.reload_interval = reload_interval or settings.REMINDER_RELOAD_INTERVAL
+        # (yuborish vaqti, qabul id, offset, qabul vaqti) - vaqtlar timestamp
+        self.heap = []
+        # qabul id -> heap'ga qo'yilgan qabul vaqti
+        self.scheduled = {}
+        self.watermark = None
+        self.generation = None
+        self.reloaded_at = None
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _entries(self, pk, starts_at, created_at, done):
+        for offset in self.offsets:
+            fire_at = starts_at - timedelta(minutes=offset)
+            # Qabul yozilgan paytda vaqti o'tib ketgan eslatma kerak emas (masalan, 3 soat oldin yozilgan)
+            if (pk, offset, starts_at) in done or fire_at < created_at:
+                continue
+            yield fire_at.timestamp(), pk, offset, starts_at.timestamp()
+
+    def _fetch(self, queryset, now):
+        """[(id, qabul vaqti, yaratilgan, holat)] va yuborilgan (id, offset, qabul vaqti) lar"""
+        queryset = queryset.filter(starts_at__gt=now)
+        rows = list(queryset.values_list('pk', 'starts_at', 'created_at', 'status'))
+        done = set(AppointmentReminder.objects.filter(
+            appointment_id__in=queryset.values('pk')
+        ).values_list('appointment_id', 'offset', 'starts_at')) if rows else set()
+        return rows, done
+
+    def load(self):
+        """Barcha kelgusi qabullarni yuklash (ishga tushganda)"""
+        now = self.clock()
+        self.generation = get_generation(Appointment)
+        # updated_at haqiqiy vaqt bo'yicha yoziladi (soxta soat bilan sinovda ham)
+        self.watermark = timezone.now() - RELOAD_OVERLAP
+        rows, done = self._fetch(Appointment.objects.filter(status__in=Appointment.ACTIVE_STATUSES), now)
+        self.heap = [entry for pk, starts_at, created_at, _ in rows
+                     for entry in self._entries(pk, starts_at, created_at, done)]
+        heapq.heapify(self.heap)
+        self.scheduled = {pk: starts_at.timestamp() for pk, starts_at, _, _ in rows}
+        self.reloaded_at = now
+
+    def reload(self, force=False):
+        """Faqat o'zgargan qabullarni qayta o'qish (avlod o'zgarmagan bo'lsa so'rovsiz)"""
+        now = self.clock()
+        generation = get_generation(Appointment)
+        # Signal'siz o'zgarishlar uchun vaqti-vaqti bilan baribir tekshiriladi
+        stale = now - self.reloaded_at >= timedelta(seconds=self.reload_interval)
+        if not (force or stale or generation != self.generation):
+            return 0
+        self.generation = generation
+        watermark = timezone.now() - RELOAD_OVERLAP
+        rows, done = self._fetch(Appointment.objects.filter(updated_at__gte=self.watermark), now)
+        self.watermark = watermark
+        self.reloaded_at = now
+        pushed = 0
+        for pk, starts_at, created_at, status in rows:
+            if status not in Appointment.ACTIVE_STATUSES:
+                # Qayta faollashtirilsa yangidan qo'yiladi; heap'dagi eski yozuvlar fire() da tashlanadi
+                self.scheduled.pop(pk, None)
+                continue
+            if self.scheduled.get(pk) == starts_at.timestamp():
+                continue
+            self.scheduled[pk] = starts_at.timestamp()
+            for entry in self._entries(pk, starts_at, created_at, done):
+                heapq.heappush(self.heap, entry)
+                pushed += 1
+        return pushed
+
+    def pop_due(self, now):
+        due = []
+        timestamp = now.timestamp()
+        while self.heap and self.heap[0][0] <= timestamp and len(due) < self.batch_size:
+            due.append(heapq.heappop(self.heap))
+        return due
+
+    def fire(self, entries, now):
+        """Muddati kelgan eslatmalarni tekshirib yuborish. Returns: yuborilganlar soni"""
+        pks = {pk for _, pk, _, _ in entries}
+        appointments = Appointment.objects.filter(
+            pk__in=pks, status__in=Appointment.ACTIVE_STATUSES, starts_at__gt=now
+        ).select_related('doctor', 'service').in_bulk()
+        done = set(AppointmentReminder.objects.filter(appointment_id__in=pks).values_list(
+            'appointment_id', 'offset', 'starts_at'
+        ))
+
+        offsets = {}
+        for _, pk, offset, starts_at in entries:
+            appointment = appointments.get(pk)
+            # Bekor qilingan, o'chirilgan yoki vaqti ko'chirilgan (eski yozuv) qabullar
+            if (appointment is None or appointment.starts_at.timestamp() != starts_at
+                    or (pk, offset, appointment.starts_at) in done):
+                continue
+            offsets.setdefault(pk, set()).add(offset)
+
+        claims = []
+        for pk, pending in offsets.items():
+            nearest = min(pending)
+            for offset in pending:
+                status = AppointmentReminder.STATUS_SENDING if offset == nearest else AppointmentReminder.STATUS_SKIPPED
+                claims.append(AppointmentReminder(appointment_id=pk, offset=offset, status=status,
+                                                  starts_at=appointments[pk].starts_at))
+        claimed = []
+        for claim in claims:
+            # Parallel jarayon shu qatorni oldinroq yozgan bo'lsa - u yuboradi
+            try:
+                with transaction.atomic():
+                    claim.save(force_insert=True)
+            except IntegrityError:
+                continue
+            claimed.append(claim)
+
+        sent = []
+        for claim in claimed:
+            if claim.status != AppointmentReminder.STATUS_SENDING:
+                continue
+            try:
+                ok = self.sender(appointments[claim.appointment_id], claim.offset)
+            except Exception:
+                logger.exception("Eslatma yuborilmadi: qabul %s", claim.appointment_id)
+                ok = False
+            sent.append((claim, ok))
+
+        finished_at = self.clock()
+        groups = {}
+        for claim, ok in sent:
+            status = AppointmentReminder.STATUS_SENT if ok else AppointmentReminder.STATUS_FAILED
+            groups.setdefault(status, []).append(claim.pk)
+        for status, pks in groups.items():
+            AppointmentReminder.objects.filter(pk__in=pks).update(
+                status=status, sent_at=finished_at if status == AppointmentReminder.STATUS_SENT else None
+            )
+        return sum(1 for _, ok in sent if ok)
+
+    def tick(self):
+        """Bitta qadam: o'zgarishlarni o'qish va muddati kelganlarni yuborish. Returns: yuborilganlar soni"""
+        if self.reloaded_at is None:
+            self.load()
+        else:
+            self.reload()
+        total = 0
+        while True:
+            now = self.clock()
+            due = self.pop_due(now)
+            if not due:
+                return total
+            total += self.fire(due, now)
+
+    def seconds_until_next(self):
+        """Keyingi uyg'onishgacha: eng yaqin eslatma yoki qayta o'qish oralig'i"""
+        wait = self.reload_interval
+        if self.heap:
+            wait = min(wait, self.heap[0][0] - self.clock().timestamp())
+        return max(wait, 0)
+
+    def run_forever(self, sleep=time.sleep):
+        while True:
+            self.tick()
+            sleep(self.seconds_until_next())
@@ -0,0 +1,231 @@
+"""
+Ish vaqtlari: matnni tahlil qilish va "hozir ochiq" hisoblash
+
+- parse_day_range / parse_time_range: "Dush-Juma", "Dushanba - Shanba",
+  "Har kuni", "09:00 - 18:00", "24/7" kabi matnlardan tuzilgan qiymatlar
+  (kirill va apostrof variantlari ham qabul qilinadi).
+- WeeklySchedule: haftaning daqiqalaridagi [boshlanish, tugash) oraliqlari
+  saralangan massivi; "ochiqmi", "qachon yopiladi/ochiladi" bisect bilan O(log n).
+- get_schedules(): bo'limlar (None - butun klinika) bo'yicha jadvallar,
+  ScheduleInterval avlodi o'zgarguncha jarayon xotirasida saqlanadi.
+Vaqtlar settings.TIME_ZONE (Asia/Tashkent) bo'yicha.
+"""
+
+import re
+import threading
+from bisect import bisect_right
+from datetime import time as dtime, timedelta
+
+from django.utils import timezone
+
+from dentist.caching import get_generation
+from dentist.suggest import fold
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAY_NAMES = ['dushanba', 'seshanba', 'chorshanba', 'payshanba', 'juma', 'shanba', 'yakshanba']
+DAY_LABELS = ['Dushanba', 'Seshanba', 'Chorshanba', 'Payshanba', 'Juma', 'Shanba', 'Yakshanba']
+EVERY_DAY = ('har kuni', 'hafta davomida', 'kunora', 'har kun')
+TIME_RE = re.compile(r'(\d{1,2})[:.](\d{2})')
+ROUND_THE_CLOCK = ('24/7', '24 soat', 'kecha-kunduz')
+
+
+class ScheduleParseError(ValueError):
+    pass
+
+
+def parse_day(token):
+    """'Dush', 'Du', 'Шанба' -> hafta kuni raqami (0 - dushanba)"""
+    token = fold(token).strip(' .')
+    if len(token) >= 2:
+        matches = [number for number, name in enumerate(DAY_NAMES) if name.startswith(token)]
+        if len(matches) == 1:
+            return matches[0]
+    raise ScheduleParseError(f"Hafta kuni aniqlanmadi: {token}")
+
+
+def parse_day_range(text):
+    """Kunlar matni -> hafta kunlari ro'yxati"""
+    folded = fold(text).strip()
+    if any(phrase in folded for phrase in EVERY_DAY):
+        return list(range(7))
+    days = []
+    for part in re.split(r'[,;/]', text):
+        if not part.strip():
+            continue
+        bounds = re.split(r'\s*[-–—]\s*', part.strip())
+        if len(bounds) == 1:
+            days.append(parse_day(bounds[0]))
+        elif len(bounds) == 2:
+            start, end = parse_day(bounds[0]), parse_day(bounds[1])
+            days.extend((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+        else:
+            raise ScheduleParseError(f"Kunlar oralig'i noto'g'ri: {part}")
+    if not days:
+        raise ScheduleParseError("Kunlar ko'rsatilmagan")
+    return sorted(set(days))
+
+
+def parse_time_range(text):
+    """Vaqt matni -> (ochilish, yopilish); yopilish 00:00 - yarim tun"""
+    if any(phrase in text.lower() for phrase in ROUND_THE_CLOCK):
+        return dtime(0, 0), dtime(0, 0)
+    times = TIME_RE.findall(text)
+    if len(times) != 2:
+        raise ScheduleParseError(f"Vaqt oralig'i noto'g'ri: {text}")
+    (open_h, open_m), (close_h, close_m) = [(int(h), int(m)) for h, m in times]
+    if close_h == 24 and close_m == 0:
+        close_h = 0
+    try:
+        return dtime(open_h, open_m), dtime(close_h, close_m)
+    except ValueError:
+        raise ScheduleParseError(f"Vaqt noto'g'ri: {text}")
+
+
+def parse_schedule_text(text):
+    """'Dush-Juma: 09:00 - 18:00' -> [(kun, ochilish, yopilish)]"""
+    match = TIME_RE.search(text)
+    if match is None and not any(phrase in text.lower() for phrase in ROUND_THE_CLOCK):
+        raise ScheduleParseError(f"Vaqt topilmadi: {text}")
+    split_at = match.start() if match else min(
+        text.lower().find(phrase) for phrase in ROUND_THE_CLOCK if phrase in text.lower()
+    )
+    days = parse_day_range(text[:split_at].strip(' :'))
+    opens, closes = parse_time_range(text[split_at:])
+    return [(day, opens, closes) for day in days]
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+class WeeklySchedule:
+    """Haftalik oraliqlar jadvali (birlashtirilgan, boshlanishi bo'yicha saralangan)"""
+
+    def __init__(self, intervals):
+        """intervals: [(hafta kuni, ochilish, yopilish)]"""
+        spans = []
+        for weekday, opens, closes in intervals:
+            start = weekday * MINUTES_PER_DAY + _minutes(opens)
+            length = (_minutes(closes) - _minutes(opens)) % MINUTES_PER_DAY or MINUTES_PER_DAY
+            end = start + length
+            if end > MINUTES_PER_WEEK:
+                # Yakshanbadan dushanbaga o'tadigan oraliq ikkiga bo'linadi
+                spans.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            spans.append((start, end))
+        spans.sort()
+        merged = []
+        for start, end in spans:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __bool__(self):
+        return bool(self.starts)
+
+    def _locate(self, minute):
+        return bisect_right(self.starts, minute) - 1
+
+    def is_open_at(self, minute):
+        position = self._locate(minute)
+        return position >= 0 and minute < self.ends[position]
+
+    def closes_in(self, minute):
+        """Yopilishgacha qolgan daqiqalar (yopiq bo'lsa None)"""
+        position = self._locate(minute)
+        if position < 0 or minute >= self.ends[position]:
+            return None
+        end = self.ends[position]
+        # Hafta oxiridan boshiga o'tadigan uzluksiz oraliq
+        if end == MINUTES_PER_WEEK and self.starts and self.starts[0] == 0:
+            end += self.ends[0]
+        return end - minute
+
+    def opens_in(self, minute):
+        """Keyingi ochilishgacha qolgan daqiqalar (jadval bo'sh bo'lsa None)"""
+        if not self.starts:
+            return None
+        position = bisect_right(self.starts, minute)
+        if position < len(self.starts):
+            return self.starts[position] - minute
+        return MINUTES_PER_WEEK - minute + self.starts[0]
+
+    def is_open_on(self, weekday):
+        # Birlashgan oraliq bir necha kunni qoplashi mumkin (24/7): kun bilan kesishish tekshiriladi
+        day_start = weekday * MINUTES_PER_DAY
+        position = self._locate(day_start + MINUTES_PER_DAY - 1)
+        return position >= 0 and self.ends[position] > day_start
+
+
+def week_minute(moment):
+    local = timezone.localtime(moment)
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+def status(schedule, now=None):
+    """Badge uchun holat: {'is_open', 'closes_at', 'opens_at'} (vaqtlar mahalliy)"""
+    now = timezone.localtime(now or timezone.now()).replace(second=0, microsecond=0)
+    minute = week_minute(now)
+    if schedule is None or not schedule:
+        return {'is_open': False, 'closes_at': None, 'opens_at': None}
+    closes_in = schedule.closes_in(minute)
+    if closes_in is not None:
+        return {'is_open': True, 'closes_at': now + timedelta(minutes=closes_in), 'opens_at': None}
+    opens_at = now + timedelta(minutes=schedule.opens_in(minute))
+    return {
+        'is_open': False, 'closes_at': None, 'opens_at': opens_at,
+        'opens_today': opens_at.date() == now.date(), 'opens_day': DAY_LABELS[opens_at.weekday()],
+    }
+
+
+_lock = threading.Lock()
+_state = {'schedules': None, 'generation': None}
+
+
+def get_schedules():
+    """{department_id yoki None: WeeklySchedule}"""
+    from dentist.models import ScheduleInterval
+
+    generation = get_generation(ScheduleInterval)
+    if _state['schedules'] is None or generation != _state['generation']:
+        grouped = {}
+        for department_id, weekday, opens, closes in ScheduleInterval.objects.values_list(
+                'department_id', 'weekday', 'opens', 'closes'):
+            grouped.setdefault(department_id, []).append((weekday, opens, closes))
+        schedules = {key: WeeklySchedule(intervals) for key, intervals in grouped.items()}
+        with _lock:
+            _state.update(schedules=schedules, generation=generation)
+    return _state['schedules']
+
+
+def department_status(department_id, now=None):
+    """Bo'lim holati (o'z jadvali bo'lmasa klinika jadvali bo'yicha)"""
+    return department_statuses([department_id], now)[department_id]
+
+
+def department_statuses(department_ids, now=None):
+    """{department_id: holat} (jadvallar bir marta olinadi)"""
+    schedules = get_schedules()
+    return {pk: status(schedules.get(pk) or schedules.get(None), now) for pk in department_ids}
+
+
+def departments_open_on(weekday):
+    """Berilgan kuni ishlaydigan bo'limlar id'lari (o'z jadvali bo'lmasa klinika jadvali)"""
+    from dentist.models import Department
+
+    schedules = get_schedules()
+    clinic = schedules.get(None)
+    result = []
+    for pk in Department.objects.filter(is_active=True).values_list('pk', flat=True):
+        schedule = schedules.get(pk) or clinic
+        if schedule and schedule.is_open_on(weekday):
+            result.append(pk)
+    return result
+
+
+def reset():
+    _state['schedules'] = None
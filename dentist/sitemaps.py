@@ -0,0 +1,65 @@
+"""
+sitemap.xml bo'limlari
+
+Har bir bo'lim django.contrib.sitemaps orqali 50 000 URL'dan keyin
+avtomatik sahifalarga bo'linadi (sitemap.xml - indeks, sitemap-<bo'lim>.xml?p=N).
+Faqat URL va lastmod uchun kerakli ustunlar o'qiladi.
+"""
+
+from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
+
+from dentist.models import Department, Doctor, Service
+
+
+class StaticViewSitemap(Sitemap):
+    changefreq = 'monthly'
+    priority = 0.6
+
+    def items(self):
+        return ['index', 'about', 'department_list', 'services', 'doctors', 'contact', 'appointment']
+
+    def location(self, item):
+        return reverse(item)
+
+
+class CatalogueSitemap(Sitemap):
+    """Faol yozuvlar, lastmod - updated_at"""
+    model = None
+    active_filter = {}
+    changefreq = 'weekly'
+
+    def items(self):
+        # Sahifalash barqaror bo'lishi uchun pk bo'yicha tartib
+        return self.model.objects.filter(**self.active_filter).only('slug', 'updated_at').order_by('pk')
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class DepartmentSitemap(CatalogueSitemap):
+    model = Department
+    active_filter = {'is_active': True}
+    priority = 0.8
+
+
+class ServiceSitemap(CatalogueSitemap):
+    model = Service
+    active_filter = {'is_active': True}
+    priority = 0.8
+
+
+class DoctorSitemap(CatalogueSitemap):
+    model = Doctor
+    active_filter = {'is_available': True}
+    priority = 0.7
+
+
+SITEMAPS = {
+    'pages': StaticViewSitemap,
+    'departments': DepartmentSitemap,
+    'services': ServiceSitemap,
+    'doctors': DoctorSitemap,
+}
+# Sitemap cache'i shu modellar avlodiga bog'langan
+SITEMAP_MODELS = (Department, Service, Doctor)
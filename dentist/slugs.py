@@ -0,0 +1,49 @@
+"""
+To'qnashuvsiz slug ajratish
+
+Mavjud slug'lar bitta so'rov bilan xotiraga yuklanadi, keyingi har bir
+slug DB'ga murojaatsiz (set bo'yicha) tekshiriladi. Band bo'lsa -2, -3 ...
+qo'shimchasi qo'shiladi.
+"""
+
+from django.utils.text import slugify
+
+
+class SlugAllocator:
+    """Bitta model uchun slug'larni xotirada ajratish"""
+
+    def __init__(self, model, taken=None, field='slug'):
+        self.max_length = model._meta.get_field(field).max_length
+        self.fallback = model._meta.model_name
+        if taken is None:
+            taken = model.objects.values_list(field, flat=True)
+        self.taken = set(taken)
+        # Har bir asos uchun keyingi tekshiriladigan raqam
+        self._next_suffix = {}
+
+    def base(self, value):
+        return slugify(value)[:self.max_length].strip('-') or self.fallback
+
+    def allocate(self, value):
+        base = self.base(value)
+        candidate = base
+        number = self._next_suffix.get(base, 2)
+        while candidate in self.taken:
+            suffix = f"-{number}"
+            candidate = f"{base[:self.max_length - len(suffix)]}{suffix}"
+            number += 1
+        self._next_suffix[base] = number
+        self.taken.add(candidate)
+        return candidate
+
+
+def unique_slug(instance, value):
+    """Bitta obyekt uchun slug (faqat shu asos bilan boshlanadigan slug'lar o'qiladi)"""
+    model = type(instance)
+    allocator = SlugAllocator(model, taken=())
+    allocator.taken.update(
+        model.objects.filter(slug__startswith=allocator.base(value))
+        .exclude(pk=instance.pk)
+        .values_list('slug', flat=True)
+    )
+    return allocator.allocate(value)
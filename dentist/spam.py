@@ -0,0 +1,196 @@
+"""
+Bog'lanish xabarlari uchun takror va spam aniqlash
+
+- Takrorlar: (normallashtirilgan telefon, xabar matni) dan olingan hash
+  (fingerprint) indekslangan ustunda saqlanadi. Vaqt oynasi ichida kelgan
+  bir xil xabar yangi yozuv yaratmaydi, mavjudining hisoblagichi oshiriladi.
+- Spam: admin "Spam" / "Spam emas" deb belgilagan xabarlardan o'rganadigan
+  naive Bayes klassifikator. Token statistikasi xotirada saqlanadi, baholash
+  DB so'rovisiz mikrosoniyalarda bajariladi.
+"""
+
+import hashlib
+import math
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from dentist.models import ContactMessage, SpamToken
+
+APOSTROPHES = re.compile(r"[ʻʼ’‘`´]")
+TOKEN_RE = re.compile(r"[\w']+")
+MAX_TOKENS = 300
+MAX_TOKEN_LENGTH = 100
+MIN_TRAINING_DOCS = 5
+UPDATE_BATCH_SIZE = 500
+VERSION_CACHE_KEY = 'spam:classifier-version'
+
+
+def normalize_text(text):
+    """Kichik harf, yagona apostrof va bitta bo'sh joy"""
+    text = APOSTROPHES.sub("'", text.lower())
+    return ' '.join(text.split())
+
+
+def tokenize(text):
+    """Takrorlanmaydigan tokenlar to'plami"""
+    tokens = (token.strip("'") for token in TOKEN_RE.findall(normalize_text(text))[:MAX_TOKENS])
+    return {token for token in tokens if 1 < len(token) <= MAX_TOKEN_LENGTH}
+
+
+def message_fingerprint(phone, text):
+    """(telefon, matn) uchun sha256 hash"""
+    normalized = ' '.join(TOKEN_RE.findall(normalize_text(text)))
+    return hashlib.sha256(f"{phone}\x00{normalized}".encode()).hexdigest()
+
+
+class SpamClassifier:
+    """Xotiradagi naive Bayes modeli"""
+
+    def __init__(self, tokens, spam_docs, ham_docs, version=None):
+        self.tokens = tokens
+        self.spam_docs = spam_docs
+        self.ham_docs = ham_docs
+        self.version = version
+
+    @classmethod
+    def from_rows(cls, rows, version=None):
+        tokens = {}
+        spam_docs = ham_docs = 0
+        for token, spam_count, ham_count in rows:
+            if token == SpamToken.TOTAL:
+                spam_docs, ham_docs = spam_count, ham_count
+            else:
+                tokens[token] = (spam_count, ham_count)
+        return cls(tokens, spam_docs, ham_docs, version)
+
+    @property
+    def is_trained(self):
+        return self.spam_docs >= MIN_TRAINING_DOCS and self.ham_docs >= MIN_TRAINING_DOCS
+
+    def score(self, text):
+        """Spam ehtimoli (0..1) yoki model hali o'qitilmagan bo'lsa None"""
+        if not self.is_trained:
+            return None
+
+        total = self.spam_docs + self.ham_docs
+        log_spam = math.log(self.spam_docs / total)
+        log_ham = math.log(self.ham_docs / total)
+        for token in tokenize(text):
+            counts = self.tokens.get(token)
+            if counts is None:
+                continue
+            log_spam += math.log((counts[0] + 1) / (self.spam_docs + 2))
+            log_ham += math.log((counts[1] + 1) / (self.ham_docs + 2))
+
+        diff = log_ham - log_spam
+        if diff > 700:
+            return 0.0
+        return 1 / (1 + math.exp(diff))
+
+
+_classifier = None
+
+
+async def aget_classifier():
+    """Jarayon bo'yicha keshlangan model; o'qitishdan keyin qayta yuklanadi"""
+    global _classifier
+    version = await cache.aget(VERSION_CACHE_KEY, 0)
+    if _classifier is None or _classifier.version != version:
+        rows = [row async for row in SpamToken.objects.values_list('token', 'spam_count', 'ham_count')]
+        _classifier = SpamClassifier.from_rows(rows, version)
+    return _classifier
+
+
+def classifier_text(contact_message):
+    return f"{contact_message.subject} {contact_message.message}"
+
+
+async def aingest_contact_message(contact_message):
+    """
+    Yangi xabarni saqlash yoki mavjud takrorga qo'shish.
+    Returns: (saqlangan xabar, yangi yaratildimi)
+    """
+    now = timezone.now()
+    contact_message.fingerprint = message_fingerprint(contact_message.phone, contact_message.message)
+
+    window_start = now - timedelta(seconds=settings.CONTACT_DUPLICATE_WINDOW)
+    duplicate = await ContactMessage.objects.filter(
+        fingerprint=contact_message.fingerprint,
+        created_at__gte=window_start,
+    ).order_by('-created_at').afirst()
+
+    if duplicate is not None:
+        await ContactMessage.objects.filter(pk=duplicate.pk).aupdate(
+            duplicate_count=F('duplicate_count') + 1,
+            last_received_at=now,
+        )
+        duplicate.duplicate_count += 1
+        duplicate.last_received_at = now
+        return duplicate, False
+
+    classifier = await aget_classifier()
+    contact_message.spam_score = classifier.score(classifier_text(contact_message))
+    contact_message.last_received_at = now
+    await contact_message.asave()
+    return contact_message, True
+
+
+def is_probable_spam(contact_message):
+    score = contact_message.spam_score
+    return score is not None and score >= settings.CONTACT_SPAM_THRESHOLD
+
+
+def train(queryset, is_spam):
+    """
+    Admin belgisi bo'yicha modelni yangilash.
+    Faqat belgisi o'zgarayotgan xabarlar hisobga olinadi.
+    Returns: yangilangan xabarlar soni
+    """
+    changed = list(queryset.exclude(is_spam=is_spam).only('pk', 'subject', 'message', 'is_spam'))
+    if not changed:
+        return 0
+
+    deltas = {}
+    for contact_message in changed:
+        # Oldingi belgi bo'lsa, uning hissasini qaytarib olamiz
+        previous = contact_message.is_spam
+        spam_change = 1 if is_spam else (-1 if previous is True else 0)
+        ham_change = 1 if not is_spam else (-1 if previous is False else 0)
+        for token in tokenize(classifier_text(contact_message)) | {SpamToken.TOTAL}:
+            spam_delta, ham_delta = deltas.get(token, (0, 0))
+            deltas[token] = (spam_delta + spam_change, ham_delta + ham_change)
+
+    # Bir xil o'zgarishga ega tokenlarni bitta UPDATE bilan yangilaymiz
+    groups = {}
+    for token, delta in deltas.items():
+        groups.setdefault(delta, []).append(token)
+
+    with transaction.atomic():
+        SpamToken.objects.bulk_create(
+            [SpamToken(token=token) for token in deltas],
+            batch_size=UPDATE_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        for (spam_delta, ham_delta), tokens in groups.items():
+            for start in range(0, len(tokens), UPDATE_BATCH_SIZE):
+                SpamToken.objects.filter(token__in=tokens[start:start + UPDATE_BATCH_SIZE]).update(
+                    spam_count=F('spam_count') + spam_delta,
+                    ham_count=F('ham_count') + ham_delta,
+                )
+        updated = ContactMessage.objects.filter(pk__in=[m.pk for m in changed]).update(is_spam=is_spam)
+
+    transaction.on_commit(bump_classifier_version)
+    return updated
+
+
+def bump_classifier_version():
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, timeout=None)
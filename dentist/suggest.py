@@ -0,0 +1,239 @@
+"""
+Qidiruv maydoni uchun avtomatik takliflar (shifokorlar, xizmatlar, bo'limlar)
+
+Takliflar jarayon xotirasidagi prefiks indeksidan olinadi: normallashtirilgan
+so'zlarning saralangan ro'yxati va bisect. Har bir klavish bosilishi DB'ga
+murojaat qilmaydi.
+
+- Normallashtirish: kichik harf, o'zbek kirill -> lotin, apostrof
+  variantlari (o', oʻ, o’, o`) bir xil ko'rinishga keltiriladi.
+- Indeks birinchi so'rovda quriladi, keyin model signallari bo'yicha faqat
+  o'zgargan obyekt yangilanadi. Boshqa worker'dagi o'zgarishlar modellar
+  avlodi (generation) orqali aniqlanadi va indeks qayta quriladi.
+"""
+
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from dentist.caching import get_generations
+
+MAX_RESULTS = 10
+# Avlod tekshiruvlari orasidagi vaqt (soniya)
+GENERATION_CHECK_INTERVAL = 5
+
+CYRILLIC = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j', 'з': 'z', 'и': 'i',
+    'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'у': 'u', 'ф': 'f', 'х': 'x', 'ц': 's', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'i', 'ь': '',
+    'э': 'e', 'ю': 'yu', 'я': 'ya', 'ў': 'o', 'қ': 'q', 'ғ': 'g', 'ҳ': 'h',
+}
+APOSTROPHES = re.compile(r"['`ʻʼ‘’]")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text):
+    """Qidiruv uchun normallashtirilgan matn"""
+    text = APOSTROPHES.sub('', (text or '').lower())
+    return ''.join(CYRILLIC.get(char, char) for char in text)
+
+
+def words(text):
+    return WORD_RE.findall(fold(text))
+
+
+def _models():
+    from dentist.models import Department, Doctor, Service
+    return Department, Service, Doctor
+
+
+def kind_of(obj):
+    Department, Service, Doctor = _models()
+    return {Department: 'department', Service: 'service', Doctor: 'doctor'}[type(obj)]
+
+
+def describe(obj):
+    """Obyekt -> (tur, sarlavha, izoh, URL, indekslanadigan matn)"""
+    from dentist.models import Department, Doctor
+
+    if isinstance(obj, Doctor):
+        return ('doctor', obj.get_full_name(), obj.specialization, obj.get_absolute_url(),
+                f"{obj.get_full_name()} {obj.specialization} {obj.slug.replace('-', ' ')}")
+    if isinstance(obj, Department):
+        return ('department', obj.name, '', obj.get_absolute_url(), f"{obj.name} {obj.slug.replace('-', ' ')}")
+    return ('service', obj.name, obj.department.name, obj.get_absolute_url(),
+            f"{obj.name} {obj.slug.replace('-', ' ')}")
+
+
+def is_listed(obj):
+    from dentist.models import Doctor
+    return obj.is_available if isinstance(obj, Doctor) else obj.is_active
+
+
+class PrefixIndex:
+    """
+    Saralangan so'zlar (tokens) va ularga parallel yozuv raqamlari (refs, array).
+    entries: raqam -> (kalit, sarlavha, izoh, URL, normallashtirilgan so'zlar)
+    Kalit = (tur, pk).
+    """
+
+    def __init__(self):
+        self.tokens = []
+        self.refs = array('L')
+        self.entries = {}
+        self.ids = {}
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def _position(self, token, ref):
+        low = bisect_left(self.tokens, token)
+        high = bisect_right(self.tokens, token, low)
+        for position in range(low, high):
+            if self.refs[position] >= ref:
+                return position
+        return high
+
+    def add(self, key, title, subtitle, url, text):
+        tokens = sorted(set(words(text)))
+        ref = self.next_id
+        self.next_id += 1
+        self.ids[key] = ref
+        self.entries[ref] = (key, title, subtitle, url, ' '.join(tokens))
+        for token in tokens:
+            position = self._position(token, ref)
+            self.tokens.insert(position, sys.intern(token))
+            self.refs.insert(position, ref)
+
+    def remove(self, key):
+        ref = self.ids.pop(key, None)
+        if ref is None:
+            return
+        entry = self.entries.pop(ref)
+        for token in entry[4].split():
+            position = self._position(token, ref)
+            if position < len(self.tokens) and self.tokens[position] == token and self.refs[position] == ref:
+                del self.tokens[position]
+                del self.refs[position]
+
+    def update(self, obj):
+        kind, title, subtitle, url, text = describe(obj)
+        key = (kind, obj.pk)
+        with self.lock:
+            self.remove(key)
+            if is_listed(obj):
+                self.add(key, title, subtitle, url, text)
+
+    def load(self, items):
+        """To'liq qurish (bitta saralash bilan)"""
+        entries = {}
+        ids = {}
+        pairs = []
+        for ref, (kind, pk, title, subtitle, url, text) in enumerate(items):
+            tokens = sorted(set(words(text)))
+            ids[(kind, pk)] = ref
+            entries[ref] = ((kind, pk), title, subtitle, url, ' '.join(tokens))
+            pairs.extend((sys.intern(token), ref) for token in tokens)
+        pairs.sort()
+        with self.lock:
+            self.tokens = [token for token, _ in pairs]
+            self.refs = array('L', (ref for _, ref in pairs))
+            self.entries, self.ids, self.next_id = entries, ids, len(items)
+
+    def search(self, query, limit=MAX_RESULTS):
+        tokens = words(query)
+        if not tokens:
+            return []
+        # Eng uzun so'z bo'yicha prefiks qidiruv, qolganlari yozuv so'zlarida tekshiriladi
+        tokens.sort(key=len, reverse=True)
+        first, others = tokens[0], tokens[1:]
+        index_tokens, refs = self.tokens, self.refs
+        results = []
+        seen = set()
+        position = bisect_left(index_tokens, first)
+        while position < len(index_tokens) and index_tokens[position].startswith(first) and len(results) < limit:
+            ref = refs[position]
+            position += 1
+            if ref in seen:
+                continue
+            seen.add(ref)
+            entry = self.entries.get(ref)
+            if entry is None:
+                continue
+            entry_words = entry[4].split()
+            if all(any(word.startswith(token) for word in entry_words) for token in others):
+                results.append(entry)
+        return results
+
+
+_index = PrefixIndex()
+_state = {'generations': None, 'checked_at': 0.0}
+
+
+def build_index():
+    Department, Service, Doctor = _models()
+    items = []
+    for obj in Department.objects.filter(is_active=True).only('name', 'slug'):
+        items.append(('department', obj.pk, *describe(obj)[1:]))
+    for obj in Service.objects.filter(is_active=True).select_related('department').only(
+            'name', 'slug', 'department__name', 'department__slug'):
+        items.append(('service', obj.pk, *describe(obj)[1:]))
+    for obj in Doctor.objects.filter(is_available=True).only(
+            'first_name', 'middle_name', 'last_name', 'specialization', 'slug'):
+        items.append(('doctor', obj.pk, *describe(obj)[1:]))
+    _index.load(items)
+
+
+def get_index():
+    """Indeks (kerak bo'lsa boshqa worker'dagi o'zgarishlar uchun qayta quriladi)"""
+    now = time.monotonic()
+    if _state['generations'] is None or now - _state['checked_at'] > GENERATION_CHECK_INTERVAL:
+        generations = get_generations(*_models())
+        if generations != _state['generations']:
+            build_index()
+            _state['generations'] = generations
+        _state['checked_at'] = now
+    return _index
+
+
+def suggest(query, limit=MAX_RESULTS):
+    return [
+        {'type': kind, 'title': title, 'subtitle': subtitle, 'url': url}
+        for (kind, _), title, subtitle, url, _ in get_index().search(query, limit)
+    ]
+
+
+def _on_save(sender, instance, **kwargs):
+    def apply():
+        if _state['generations'] is None:
+            return
+        if kind_of(instance) == 'department':
+            # Bo'lim nomi xizmatlar izohida ham bor: keyingi so'rovda to'liq qayta quriladi
+            _state['generations'] = None
+            return
+        _index.update(instance)
+        # O'zimizdagi o'zgarish: avlod oshgani uchun qayta qurish shart emas
+        _state['generations'] = get_generations(*_models())
+    transaction.on_commit(apply)
+
+
+def _on_delete(sender, instance, **kwargs):
+    kind = kind_of(instance)
+
+    def apply():
+        with _index.lock:
+            _index.remove((kind, instance.pk))
+        _state['generations'] = get_generations(*_models())
+    transaction.on_commit(apply)
+
+
+def connect_signals():
+    """caching.connect_generation_signals'dan keyin ulanadi (avlod avval oshadi)"""
+    for model in _models():
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'suggest:{model.__name__}:save')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'suggest:{model.__name__}:delete')
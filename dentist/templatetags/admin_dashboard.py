@@ -0,0 +1,11 @@
+from django import template
+
+from dentist import dashboard
+
+register = template.Library()
+
+
+@register.simple_tag
+def admin_dashboard():
+    """Admin bosh sahifasi statistikasi (yig'indi jadvallaridan)"""
+    return dashboard.dashboard()
@@ -0,0 +1,53 @@
+"""
+Shifokor va xizmat kartalari: obyekt versiyasi bo'yicha keshlangan HTML
+
+{% doctor_card doctor 'grid' %} va {% service_card service 'related' %}
+partials/cards/<tur>_<variant>.html ni render qiladi. Natija (pk, updated_at,
+variant) kaliti bilan saqlanadi: obyekt saqlanganda (auto_now) kalit o'zi
+eskiradi. Shifokor kartalarida bo'lim nomi ham bor, shuning uchun kalitga
+Department avlodi qo'shiladi (sahifa renderida bir marta o'qiladi).
+"""
+
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from dentist.caching import get_generation
+from dentist.models import Department
+
+register = template.Library()
+
+CARD_KEY = 'card:{kind}:{variant}:{pk}:{version}'
+CARD_CACHE_TIMEOUT = 7 * 24 * 3600
+
+
+def card_key(kind, obj, variant, extra=''):
+    return CARD_KEY.format(kind=kind, variant=variant, pk=obj.pk, version=f"{obj.updated_at.timestamp()}{extra}")
+
+
+def render_card(kind, obj, variant, extra=''):
+    key = card_key(kind, obj, variant, extra)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(f'partials/cards/{kind}_{variant}.html', {kind: obj})
+        cache.set(key, html, CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+def _department_generation(context):
+    # Bir sahifadagi barcha kartalar uchun bitta cache o'qishi
+    generation = context.render_context.get('cards:department_generation')
+    if generation is None:
+        generation = context.render_context['cards:department_generation'] = get_generation(Department)
+    return generation
+
+
+@register.simple_tag(takes_context=True)
+def doctor_card(context, doctor, variant):
+    return render_card('doctor', doctor, variant, f":{_department_generation(context)}")
+
+
+@register.simple_tag
+def service_card(service, variant):
+    return render_card('service', service, variant)
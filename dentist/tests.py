@@ -1,3 +1,1676 @@
-from django.test import TestCase
+import csv
+import heapq
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import time as dtime, timedelta
+from unittest import addModuleCleanup, mock, skipIf
 
-# Create your tests here.
+import httpx
+from PIL import Image
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+
+from dentist.models import (
+    ActivityCount, Appointment, AppointmentReminder, ContactMessage, DailyStat, InboxStat, Department, DepartmentFeature, Doctor, PageViewMinute,
+    PageViewRollup, PopularityRank, Review, ScheduleException, ScheduleInterval, Service, ServiceFeature, SiteSettings, SpamToken,
+    WorkingHour
+)
+from dentist import analytics, availability, background, bulk, dashboard, exports, facets, homepage, popularity, portal, ratings, schedule, spam, suggest
+from dentist.templatetags import cards
+from dentist.reminders import LocalSender, ReminderScheduler
+from dentist.analytics import HitBuffer
+from dentist.caching import get_generation
+from dentist.imports import DepartmentImporter, ServiceImporter
+from dentist.notifications import TelegramDispatcher, asend_telegram_message
+from dentist.ratelimit import TokenBucket
+from dentist.thumbnails import thumbnail_name, thumbnail_url
+
+submit_in_thread = background.submit
+
+
+def run_inline(name, func):
+    func()
+    return True
+
+
+def setUpModule():
+    # Buferlarni yozish testlarda so'rov ichida bajariladi (test bazasiga boshqa thread'dan yozilmaydi)
+    patcher = mock.patch('dentist.background.submit', side_effect=run_inline)
+    patcher.start()
+    addModuleCleanup(patcher.stop)
+
+
+class ContactViewTests(TestCase):
+    """Bog'lanish formasi (async view)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def valid_data(self, **overrides):
+        data = {
+            'name': 'Aziz Karimov',
+            'phone': '+998 90 123 45 67',
+            'subject': 'Qabul haqida',
+            'message': 'Ertaga qabulga yozilmoqchi edim.',
+        }
+        data.update(overrides)
+        return data
+
+    def test_get_renders_form(self):
+        response = self.client.get(reverse('contact'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('form', response.context)
+
+    @mock.patch('dentist.views.dispatch_telegram_message')
+    def test_valid_post_saves_and_notifies(self, dispatch):
+        response = self.client.post(reverse('contact'), self.valid_data())
+        self.assertRedirects(response, reverse('contact'))
+
+        contact_message = ContactMessage.objects.get()
+        self.assertEqual(contact_message.phone, '+998901234567')
+        dispatch.assert_called_once()
+        self.assertIn('Aziz Karimov', dispatch.call_args.args[0])
+
+    @mock.patch('dentist.views.dispatch_telegram_message')
+    def test_invalid_post_rerenders_form(self, dispatch):
+        response = self.client.post(reverse('contact'), self.valid_data(phone='12345'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('phone', response.context['form'].errors)
+        self.assertFalse(ContactMessage.objects.exists())
+        dispatch.assert_not_called()
+
+    @mock.patch('dentist.views.dispatch_telegram_message')
+    def test_department_is_checked_without_thread_pool(self, dispatch):
+        department = Department.objects.create(name="Terapiya", description="-", full_description="-")
+        hidden = Department.objects.create(name="Yopiq", description="-", full_description="-", is_active=False)
+        # Validatsiya event loop'da: view thread pool'ga o'tmaydi
+        with mock.patch('dentist.views.sync_to_async', side_effect=AssertionError):
+            response = self.client.post(reverse('contact'), self.valid_data(department=hidden.pk))
+            self.assertIn('department', response.context['form'].errors)
+            self.client.post(reverse('contact'), self.valid_data(department=department.pk))
+        self.assertEqual(ContactMessage.objects.get().department, department)
+
+
+class TokenBucketTests(TestCase):
+    """Token bucket algoritmi"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_capacity_and_refill(self):
+        bucket = TokenBucket('2/m')
+        self.assertEqual(bucket.consume('k', now=0), (True, 0))
+        self.assertEqual(bucket.consume('k', now=0), (True, 0))
+        self.assertEqual(bucket.consume('k', now=0), (False, 30))
+        # 30 soniyada bitta token qayta to'ladi
+        self.assertEqual(bucket.consume('k', now=30), (True, 0))
+        self.assertFalse(bucket.consume('k', now=31)[0])
+
+
+@override_settings(RATE_LIMITS={'contact': {'ip': '100/m', 'phone': '2/h'}})
+class ContactRateLimitTests(TestCase):
+    """Bog'lanish formasi uchun rate limit"""
+
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch('dentist.views.dispatch_telegram_message')
+    def test_phone_limit_rejects_before_saving(self, dispatch):
+        data = {'name': 'Aziz Karimov', 'subject': 'Qabul haqida', 'message': 'Ertaga qabulga yozilmoqchi edim.'}
+        # Turli yozilishdagi bitta raqam bitta bucket'ga tushadi
+        for phone in ('+998901234567', '998 90 123-45-67'):
+            response = self.client.post(reverse('contact'), dict(data, phone=phone))
+            self.assertEqual(response.status_code, 302)
+
+        response = self.client.post(reverse('contact'), dict(data, phone='+998 (90) 1234567'))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Ikkinchi xabar takror sifatida birlashgan, uchinchisi umuman yetib kelmagan
+        self.assertEqual(ContactMessage.objects.get().duplicate_count, 2)
+
+    @override_settings(RATE_LIMITS={'contact': {'ip': '3/m', 'phone': '1/h'}})
+    def test_blocked_phone_does_not_spend_ip_tokens(self):
+        data = {'name': 'Aziz Karimov', 'subject': 'Qabul haqida', 'message': 'Ertaga qabulga yozilmoqchi edim.'}
+        with mock.patch('dentist.views.dispatch_telegram_message'):
+            self.client.post(reverse('contact'), dict(data, phone='+998901234567'))
+            for _ in range(3):
+                self.assertEqual(self.client.post(reverse('contact'), dict(data, phone='+998901234567')).status_code, 429)
+            # IP bucket'da hali ikki token bor
+            for phone in ('+998901234568', '+998901234569'):
+                self.assertEqual(self.client.post(reverse('contact'), dict(data, phone=phone)).status_code, 302)
+            self.assertEqual(self.client.post(reverse('contact'), dict(data, phone='+998901234560')).status_code, 429)
+
+    @override_settings(RATE_LIMITS={'contact': {'ip': '1/m'}})
+    def test_ip_limit_applies_to_invalid_forms(self):
+        self.assertEqual(self.client.post(reverse('contact'), {}).status_code, 200)
+        self.assertEqual(self.client.post(reverse('contact'), {}).status_code, 429)
+        # GET so'rovlari cheklanmaydi
+        self.assertEqual(self.client.get(reverse('contact')).status_code, 200)
+
+
+class ContactDeduplicationTests(TestCase):
+    """Takror xabarlarni birlashtirish"""
+
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch('dentist.views.dispatch_telegram_message')
+    def test_repeated_submission_is_merged(self, dispatch):
+        data = {'name': 'Aziz Karimov', 'subject': 'Qabul haqida', 'message': 'Ertaga qabulga yozilmoqchi edim.'}
+        self.client.post(reverse('contact'), dict(data, phone='+998901234567'))
+        # Bo'sh joy, registr va tinish belgilari farqi takror hisoblanadi
+        response = self.client.post(reverse('contact'), dict(
+            data, phone='998 90 123 45 67', message='  ertaga qabulga   yozilmoqchi edim! '
+        ))
+        self.assertRedirects(response, reverse('contact'))
+
+        contact_message = ContactMessage.objects.get()
+        self.assertEqual(contact_message.duplicate_count, 2)
+        self.assertIsNotNone(contact_message.last_received_at)
+        dispatch.assert_called_once()
+
+    def test_fingerprint_depends_on_phone(self):
+        self.assertNotEqual(
+            spam.message_fingerprint('+998901234567', 'Salom'),
+            spam.message_fingerprint('+998901234568', 'Salom'),
+        )
+
+
+class SpamClassifierTests(TestCase):
+    """Admin belgilaridan o'rganadigan spam klassifikatori"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_messages(self, text, count):
+        return [
+            ContactMessage.objects.create(name='Test', phone='+998901234567', subject='Mavzu', message=f"{text} {i}")
+            for i in range(count)
+        ]
+
+    def test_training_and_scoring(self):
+        spam_messages = self.create_messages("Arzon kredit bonus yutuq havolani bosing", 5)
+        ham_messages = self.create_messages("Tish og'rig'i bo'yicha qabulga yozilmoqchiman", 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(spam.train(ContactMessage.objects.filter(pk__in=[m.pk for m in spam_messages]), True), 5)
+            self.assertEqual(spam.train(ContactMessage.objects.filter(pk__in=[m.pk for m in ham_messages]), False), 5)
+
+        rows = SpamToken.objects.values_list('token', 'spam_count', 'ham_count')
+        classifier = spam.SpamClassifier.from_rows(rows)
+        self.assertGreater(classifier.score("Mavzu kredit bonus yutuq"), 0.9)
+        self.assertLess(classifier.score("Mavzu tish og'rig'i qabulga"), 0.1)
+
+        # Belgini o'zgartirish oldingi hissani qaytarib oladi
+        with self.captureOnCommitCallbacks(execute=True):
+            spam.train(ContactMessage.objects.filter(pk=spam_messages[0].pk), False)
+        total = SpamToken.objects.get(token=SpamToken.TOTAL)
+        self.assertEqual((total.spam_count, total.ham_count), (4, 6))
+
+    def test_untrained_classifier_does_not_score(self):
+        self.assertIsNone(spam.SpamClassifier({}, 0, 0).score("Salom"))
+
+
+class FakeTelegramAPI:
+    """Lokal soxta Telegram API (httpx.MockTransport)"""
+
+    def __init__(self, rate_limit_first=0):
+        self.sent = []
+        self.rate_limit_first = rate_limit_first
+
+    def __call__(self, request):
+        if self.rate_limit_first:
+            self.rate_limit_first -= 1
+            return httpx.Response(429, json={'ok': False, 'parameters': {'retry_after': 0.05}})
+        data = dict(httpx.QueryParams(request.content.decode()))
+        self.sent.append(data)
+        return httpx.Response(200, json={'ok': True})
+
+
+@mock.patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test-token', 'TELEGRAM_CHAT_ID': '100'})
+class TelegramDispatcherTests(SimpleTestCase):
+    """Bildirishnomalarni digest'ga birlashtirish"""
+
+    def make_dispatcher(self, api, window=0.1):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(api))
+
+        async def send(text, chat_id):
+            return await asend_telegram_message(text, chat_id, client=client)
+
+        return TelegramDispatcher(send, window=window, min_interval=0.01)
+
+    async def test_quiet_message_is_sent_immediately(self):
+        api = FakeTelegramAPI()
+        dispatcher = self.make_dispatcher(api, window=5)
+        dispatcher.enqueue("Birinchi xabar", '100')
+        await dispatcher.drain()
+
+        self.assertEqual(api.sent, [{'chat_id': '100', 'text': "Birinchi xabar", 'parse_mode': 'HTML'}])
+        self.assertEqual(dispatcher.metrics.snapshot()['batch_sizes'], {1: 1})
+
+    async def test_burst_is_coalesced_per_chat(self):
+        api = FakeTelegramAPI()
+        dispatcher = self.make_dispatcher(api)
+        for i in range(5):
+            dispatcher.enqueue(f"Xabar {i}", '100')
+        dispatcher.enqueue("Boshqa chat", '200')
+        await dispatcher.drain()
+
+        chat_100 = [item['text'] for item in api.sent if item['chat_id'] == '100']
+        self.assertEqual(len(chat_100), 1)
+        self.assertIn("5 ta yangi xabar", chat_100[0])
+        self.assertIn("Xabar 4", chat_100[0])
+
+        metrics = dispatcher.metrics.snapshot()
+        self.assertEqual(metrics['messages'], 6)
+        self.assertEqual(metrics['batch_sizes'], {5: 1, 1: 1})
+        self.assertGreaterEqual(metrics['latency_max'], 0.1)
+
+    async def test_rate_limited_batch_is_retried(self):
+        api = FakeTelegramAPI(rate_limit_first=1)
+        dispatcher = self.make_dispatcher(api, window=5)
+        dispatcher.enqueue("Xabar", '100')
+        await dispatcher.drain()
+
+        self.assertEqual(len(api.sent), 1)
+        self.assertEqual(dispatcher.metrics.rate_limited, 1)
+        self.assertEqual(dispatcher.metrics.failures, 0)
+
+
+class ContactMessageAdminTests(TestCase):
+    """Katta inbox uchun admin: kursorli sahifalash va full-text qidiruv"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f"Bemor {i}", phone='+998901234567', subject='Qabul', message=f"Xabar matni {i}")
+            for i in range(120)
+        ])
+        ContactMessage.objects.create(name='Dilnoza', phone='+998901234567', subject='Implant narxi',
+                                      message="Implantatsiya qancha turadi?")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:dentist_contactmessage_changelist')
+
+    def test_keyset_pages_cover_all_rows(self):
+        seen = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            cl = response.context['cl']
+            seen.extend(obj.pk for obj in cl.result_list)
+            url = cl.next_page_url and self.url + cl.next_page_url
+        self.assertEqual(len(seen), 121)
+        self.assertEqual(seen, list(ContactMessage.objects.order_by('-created_at', '-id').values_list('pk', flat=True)))
+
+    def test_csv_export_action_streams_selected_rows(self):
+        selected = list(ContactMessage.objects.order_by('pk').values_list('pk', flat=True)[:3])
+        response = self.client.post(self.url, {'action': 'export_csv', '_selected_action': selected})
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:3], ['ID', 'Yaratilgan', 'Ism'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], selected)
+
+    def test_export_escapes_formulas(self):
+        message = ContactMessage.objects.create(name='=HYPERLINK("http://x")', phone='+998901234567',
+                                                subject='@SUM(A1)', message="-2+3")
+        rows = list(exports.iter_rows(ContactMessage.objects.filter(pk=message.pk)))
+        # Tekshirilgan telefon o'zgarmaydi
+        self.assertEqual(rows[1][2:4], ['\'=HYPERLINK("http://x")', '+998901234567'])
+        self.assertEqual(rows[1][5:7], ["'@SUM(A1)", "'-2+3"])
+        self.assertEqual(rows[1][0], message.pk)
+        # XLSX'da faqat '=' formula bo'ladi
+        rows = list(exports.iter_rows(ContactMessage.objects.filter(pk=message.pk), prefixes=exports.XLSX_FORMULA_PREFIXES))
+        self.assertEqual(rows[1][2:7], ['\'=HYPERLINK("http://x")', '+998901234567', '', '@SUM(A1)', '-2+3'])
+
+    def test_fulltext_search(self):
+        response = self.client.get(self.url, {'q': 'implant'})
+        self.assertEqual([obj.name for obj in response.context['cl'].result_list], ['Dilnoza'])
+
+        ContactMessage.objects.filter(name='Dilnoza').update(message="Protez haqida")
+        response = self.client.get(self.url, {'q': 'protez'})
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+
+
+class CatalogueDataMixin:
+    """Katalog testlari uchun umumiy ma'lumotlar"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(
+            name="Terapiya", description="Tish davolash", full_description="To'liq ta'rif"
+        )
+        cls.service = Service.objects.create(
+            name="Plomba qo'yish", department=cls.department, description="Zamonaviy plomba",
+            price_from=150000, price_to=300000, duration=40
+        )
+        ServiceFeature.objects.create(service=cls.service, text="Kafolat 2 yil")
+        cls.doctor = Doctor.objects.create(
+            first_name="Aziz", last_name="Karimov", gender='M', department=cls.department,
+            specialization="Terapevt", experience_years=8, bio="Tajribali shifokor",
+            phone="+998901234567", is_futured=True
+        )
+
+
+class CatalogueViewTests(CatalogueDataMixin, TestCase):
+    """Bo'lim, xizmat va shifokor sahifalari (async view'lar)"""
+
+    def setUp(self):
+        facets.reset()
+
+    def test_list_pages(self):
+        for name in ('department_list', 'services', 'doctors'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_service_list_counts(self):
+        response = self.client.get(reverse('services'))
+        self.assertEqual(response.context['total_services'], 1)
+        self.assertEqual(response.context['total_doctors'], 1)
+        self.assertEqual(response.context['services'], [self.service])
+
+    def test_doctor_list_filters(self):
+        url = reverse('doctors')
+        response = self.client.get(url, {'department': self.department.id, 'search': 'terapevt'})
+        self.assertEqual(response.context['doctors'], [self.doctor])
+        self.assertEqual(response.context['featured_doctors'], [self.doctor])
+
+        response = self.client.get(url, {'search': 'yoq'})
+        self.assertEqual(response.context['doctors'], [])
+
+    def test_detail_pages(self):
+        for obj in (self.department, self.service, self.doctor):
+            with self.subTest(obj=obj):
+                response = self.client.get(obj.get_absolute_url())
+                self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.service.get_absolute_url())
+        self.assertContains(response, "Kafolat 2 yil")
+
+    def test_export_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'doctors.csv')
+            call_command('export_data', 'doctors', output=path, chunk_size=1, stdout=io.StringIO())
+            with open(path, encoding='utf-8-sig') as stream:
+                rows = list(csv.reader(stream))
+        self.assertEqual(rows[1][1:3], ['Aziz Karimov', 'Terapiya'])
+
+    @skipIf(exports.Workbook is None, "openpyxl o'rnatilmagan")
+    def test_export_command_xlsx(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'services.xlsx')
+            call_command('export_data', 'services', format='xlsx', output=path, stdout=io.StringIO())
+            self.assertTrue(os.path.getsize(path) > 0)
+
+    def test_inactive_detail_is_404(self):
+        Department.objects.filter(pk=self.department.pk).update(is_active=False)
+        response = self.client.get(self.department.get_absolute_url())
+        self.assertEqual(response.status_code, 404)
+
+
+class CatalogueImportTests(CatalogueDataMixin, TestCase):
+    """Katalogni fayldan ommaviy import qilish"""
+
+    def test_import_enabled_changelists_render(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'parol'))
+        for model in ('department', 'service', 'doctor'):
+            with self.subTest(model=model):
+                response = self.client.get(reverse(f'admin:dentist_{model}_changelist'))
+                self.assertContains(response, reverse(f'admin:dentist_{model}_import'))
+
+    def test_service_import_with_features_and_slug_collisions(self):
+        rows = [
+            {'name': "Plomba qo'yish", 'department': 'terapiya', 'description': 'Yangi',
+             'features': "Tez|Og'riqsiz"},
+            {'name': "Plomba qo'yish", 'department': 'Terapiya', 'description': 'Yana bittasi'},
+            {'name': 'Oqartirish', 'department': 'yoq', 'description': 'Xato qator'},
+            {'name': 'Kanal', 'department': 'terapiya', 'description': 'Narx xato', 'price_from': 'abc'},
+        ]
+        result = ServiceImporter().run(rows)
+
+        # Birinchi qator mavjud xizmatni yangilaydi, ikkinchisi yangi slug oladi
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual([row_number for row_number, _ in result.errors], [3, 4])
+        self.assertTrue(Service.objects.filter(slug='plomba-qoyish-2', description='Yana bittasi').exists())
+        self.service.refresh_from_db()
+        self.assertEqual(self.service.description, 'Yangi')
+        self.assertEqual(list(self.service.features.values_list('text', flat=True)), ['Tez', "Og'riqsiz"])
+
+    def test_invalid_row_does_not_leak_into_later_row(self):
+        rows = [
+            {'slug': self.service.slug, 'name': "Plomba", 'department': 'terapiya', 'description': 'Xato',
+             'price_from': 'abc'},
+            {'slug': self.service.slug, 'name': "Plomba", 'department': 'terapiya', 'description': 'Yangi'},
+        ]
+        result = ServiceImporter().run(rows)
+        self.assertEqual((result.updated, [row_number for row_number, _ in result.errors]), (1, [1]))
+        self.service.refresh_from_db()
+        self.assertEqual((self.service.description, self.service.price_from), ('Yangi', 150000))
+
+    def test_new_rows_get_unique_slugs(self):
+        rows = [{'name': 'Ortodontiya', 'description': 'Breketlar', 'full_description': 'Batafsil'}] * 3
+        result = DepartmentImporter(batch_size=2).run(rows)
+        self.assertEqual((result.created, result.updated, result.errors), (3, 0, []))
+        self.assertEqual(
+            sorted(Department.objects.filter(name='Ortodontiya').values_list('slug', flat=True)),
+            ['ortodontiya', 'ortodontiya-2', 'ortodontiya-3']
+        )
+
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'doctors.json')
+            with open(path, 'w', encoding='utf-8') as stream:
+                json.dump([
+                    {'first_name': 'Aziz', 'last_name': 'Karimov', 'gender': 'M', 'department': 'terapiya',
+                     'specialization': 'Terapevt', 'experience_years': 9, 'bio': 'Yangilangan', 'phone': '+998901234567'},
+                    {'first_name': 'Aziz', 'last_name': 'Karimov', 'gender': 'M', 'department': 'terapiya',
+                     'specialization': 'Jarroh', 'experience_years': 3, 'bio': 'Adash', 'phone': '+998901234568'},
+                ], stream)
+            stdout = io.StringIO()
+            call_command('import_catalogue', 'doctors', path, stdout=stdout, stderr=io.StringIO())
+
+        self.assertIn('1 ta yaratildi, 1 ta yangilandi', stdout.getvalue())
+        self.assertEqual(
+            sorted(Doctor.objects.values_list('slug', flat=True)), ['aziz-karimov', 'aziz-karimov-2']
+        )
+
+    def test_admin_import_view(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        self.client.force_login(admin_user)
+        url = reverse('admin:dentist_department_import')
+        upload = io.BytesIO("name,description,full_description\nJarrohlik,Tish olish,Batafsil\n".encode('utf-8'))
+        upload.name = 'departments.csv'
+        response = self.client.post(url, {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 1)
+        self.assertTrue(Department.objects.filter(slug='jarrohlik').exists())
+
+
+class BulkActionTests(CatalogueDataMixin, TestCase):
+    """Admin amallari: to'plamli UPDATE, bo'laklab audit va bitta cache bekor qilish"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        self.client.force_login(self.admin)
+        Doctor.objects.bulk_create([
+            Doctor(first_name=f"Shifokor{i}", last_name="Test", slug=f"shifokor-{i}", gender='F',
+                   department=self.department, specialization="Terapevt", experience_years=1,
+                   bio="-", phone="+998901234567", patients_count=i)
+            for i in range(4)
+        ])
+
+    @mock.patch('dentist.admin.BulkActionsMixin.bulk_chunk_size', 2)
+    def test_increment_patients_is_chunked(self):
+        doctors = list(Doctor.objects.order_by('pk').values_list('pk', 'patients_count'))
+        generation = get_generation(Doctor)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin:dentist_doctor_changelist'), {
+                'action': 'increment_patients', '_selected_action': [pk for pk, _ in doctors],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Doctor.objects.order_by('pk').values_list('pk', 'patients_count')),
+            [(pk, count + 1) for pk, count in doctors]
+        )
+        # 5 ta shifokor, bo'lak hajmi 2 -> 3 ta audit yozuvi, avlod bir marta oshadi
+        self.assertEqual(LogEntry.objects.filter(object_id=None).count(), 3)
+        self.assertEqual(get_generation(Doctor), generation + 1)
+
+    def test_flag_action_runs_single_update(self):
+        selected = list(Service.objects.values_list('pk', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            bulk.bulk_update(Service.objects.filter(pk__in=selected), {'is_popular': True})
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertTrue(Service.objects.get(pk=self.service.pk).is_popular)
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelist sahifasi qatorlar sonidan qat'i nazar doimiy sondagi so'rov bilan ochiladi"""
+    ROWS = 500
+    MODELS = [Department, Service, Doctor, DepartmentFeature, WorkingHour, ServiceFeature, ContactMessage]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        departments = Department.objects.bulk_create([
+            Department(name=f"Bo'lim {i}", slug=f"bolim-{i}", description="-", full_description="-")
+            for i in range(cls.ROWS)
+        ])
+        services = Service.objects.bulk_create([
+            Service(name=f"Xizmat {i}", slug=f"xizmat-{i}", department=departments[i % 7], description="-")
+            for i in range(cls.ROWS)
+        ])
+        Doctor.objects.bulk_create([
+            Doctor(first_name=f"Ism{i}", last_name="Familiya", slug=f"ism-{i}", gender='M',
+                   department=departments[i % 7], specialization="-", experience_years=1, bio="-",
+                   phone="+998901234567", photo=f"doctors/yoq-{i}.jpg")
+            for i in range(cls.ROWS)
+        ])
+        DepartmentFeature.objects.bulk_create([
+            DepartmentFeature(department=departments[i % 7], text=f"Xususiyat {i}") for i in range(cls.ROWS)
+        ])
+        WorkingHour.objects.bulk_create([
+            WorkingHour(department=departments[i % 7], day_range="Du-Ju", time_range="9:00-18:00")
+            for i in range(cls.ROWS)
+        ])
+        ServiceFeature.objects.bulk_create([
+            ServiceFeature(service=services[i % 7], text=f"Xususiyat {i}") for i in range(cls.ROWS)
+        ])
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f"Bemor {i}", phone='+998901234567', subject='-', message='-')
+            for i in range(cls.ROWS)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def count_queries(self, model, per_page):
+        model_admin = admin.site._registry[model]
+        url = reverse(f'admin:dentist_{model._meta.model_name}_changelist')
+        with mock.patch.object(model_admin, 'list_per_page', per_page):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), per_page)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for model in self.MODELS:
+            with self.subTest(model=model.__name__):
+                self.count_queries(model, 20)  # ContentType va boshqa keshlarni isitish
+                counts = [self.count_queries(model, per_page) for per_page in (20, 100, 500)]
+                self.assertEqual(len(set(counts)), 1, counts)
+
+    def test_department_counts_are_annotated(self):
+        response = self.client.get(reverse('admin:dentist_department_changelist'))
+        # Tartib (order, name) bo'yicha birinchisi "Bo'lim 0"
+        department = response.context['cl'].result_list[0]
+        self.assertEqual(department.slug, 'bolim-0')
+        self.assertEqual(department.active_doctor_count, 72)
+        self.assertEqual(department.active_service_count, 72)
+        self.assertContains(response, '>72 ta<')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ThumbnailTests(TestCase):
+    def test_thumbnail_is_generated_once(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), 'white').save(buffer, format='JPEG')
+        path = default_storage.save('doctors/katta.jpg', ContentFile(buffer.getvalue()))
+        field_file = Doctor(photo=path).photo
+
+        url = thumbnail_url(field_file, 100)
+        self.assertIn('/thumbs/100x100/', url)
+        with default_storage.open(thumbnail_name(path, 100)) as stream:
+            self.assertEqual(max(Image.open(stream).size), 100)
+        self.assertEqual(thumbnail_url(field_file, 100), url)
+
+    def test_missing_file_falls_back_to_original(self):
+        field_file = Doctor(photo='doctors/yoq.jpg').photo
+        self.assertEqual(thumbnail_url(field_file), field_file.url)
+
+
+class SitemapTests(CatalogueDataMixin, TestCase):
+    """sitemap.xml va robots.txt"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_and_sections(self):
+        response = self.client.get(reverse('sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '/sitemap-doctors.xml')
+
+        response = self.client.get(reverse('sitemap_section', kwargs={'section': 'doctors'}))
+        self.assertContains(response, self.doctor.get_absolute_url())
+        self.assertContains(response, f"<lastmod>{self.doctor.updated_at:%Y-%m-%d}")
+
+    def test_cached_until_generation_changes(self):
+        url = reverse('sitemap_section', kwargs={'section': 'services'})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, self.service.get_absolute_url())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name="Oqartirish", department=self.department, description="-")
+        response = self.client.get(url)
+        self.assertContains(response, '/services/oqartirish/')
+
+    def test_sections_split_past_limit(self):
+        with mock.patch('dentist.sitemaps.DoctorSitemap.limit', 1):
+            Doctor.objects.create(
+                first_name="Laylo", last_name="Sodiqova", gender='F', department=self.department,
+                specialization="Ortodont", experience_years=3, bio="-", phone="+998901234567"
+            )
+            cache.clear()
+            response = self.client.get(reverse('sitemap'))
+        self.assertContains(response, '/sitemap-doctors.xml?p=2')
+
+    def test_robots_excludes_query_strings(self):
+        response = self.client.get('/robots.txt')
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertContains(response, 'Disallow: /*?')
+        self.assertLess(response.content.index(b'Allow: /sitemap'), response.content.index(b'Disallow: /*?'))
+        self.assertContains(response, 'Sitemap: http://testserver/sitemap.xml')
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'example.org'])
+    def test_cache_is_per_host(self):
+        url = reverse('sitemap_section', kwargs={'section': 'doctors'})
+        self.client.get(url)
+        response = self.client.get(url, HTTP_HOST='example.org', secure=True)
+        self.assertContains(response, f"https://example.org{self.doctor.get_absolute_url()}")
+
+
+class CatalogueAPITests(CatalogueDataMixin, TestCase):
+    """JSON API: sparse fields, include, ETag va cache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_service_list_with_embeds(self):
+        ServiceFeature.objects.create(service=self.service, text="Og'riqsiz", order=1)
+        # Asosiy so'rov (department JOIN bilan) + features uchun bitta prefetch
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api_services'), {
+                'fields': 'slug,price_from,duration', 'include': 'department,features',
+            })
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json(), {'results': [{
+            'slug': 'plomba-qoyish', 'price_from': 150000, 'duration': 40,
+            'department': {'id': self.department.pk, 'slug': 'terapiya', 'name': 'Terapiya',
+                           'url': '/departments/terapiya/'},
+            'features': [{'text': 'Kafolat 2 yil', 'icon': 'bi bi-check-circle'},
+                         {'text': "Og'riqsiz", 'icon': 'bi bi-check-circle'}],
+        }], 'next': None})
+
+    def test_doctor_detail_schedule(self):
+        response = self.client.get(
+            reverse('api_doctor_detail', kwargs={'slug': self.doctor.slug}), {'fields': 'full_name,schedule'}
+        )
+        self.assertEqual(response.json(), {
+            'full_name': 'Aziz Karimov',
+            'schedule': {'days': ['mon', 'tue', 'wed', 'thu', 'fri'], 'start': '09:00', 'end': '18:00',
+                         'consultation_duration': 30},
+        })
+        missing = self.client.get(reverse('api_doctor_detail', kwargs={'slug': 'yoq'}))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_unknown_field_is_400(self):
+        response = self.client.get(reverse('api_departments'), {'fields': 'name,parol'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('parol', response.json()['error'])
+
+    def test_cursor_pagination(self):
+        Department.objects.create(name="Jarrohlik", description="-", full_description="-")
+        first = self.client.get(reverse('api_departments'), {'limit': 1}).json()
+        self.assertEqual(len(first['results']), 1)
+        second = self.client.get(first['next']).json()
+        self.assertEqual(second['next'], None)
+        self.assertNotEqual(first['results'], second['results'])
+
+    def test_etag_and_generation_cache(self):
+        url = reverse('api_departments')
+        response = self.client.get(url, {'fields': 'name'})
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, {'fields': 'name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        self.department.name = "Terapiya bo'limi"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.department.save()
+        response = self.client.get(url, {'fields': 'name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'name': "Terapiya bo'limi"}])
+
+
+class SuggestTests(CatalogueDataMixin, TestCase):
+    """Prefiks indeksi bo'yicha qidiruv takliflari"""
+
+    def setUp(self):
+        cache.clear()
+        suggest._state['generations'] = None
+
+    def get_titles(self, query):
+        response = self.client.get(reverse('search_suggest'), {'q': query})
+        return [item['title'] for item in response.json()['results']]
+
+    def test_prefix_across_entities(self):
+        self.assertCountEqual(self.get_titles('tera'), ['Terapiya', 'Aziz Karimov'])
+        self.assertEqual(self.get_titles('aziz kar'), ['Aziz Karimov'])
+        self.assertEqual(self.get_titles('xyz'), [])
+
+    def test_folds_cyrillic_and_apostrophes(self):
+        self.assertEqual(self.get_titles('пломба'), ["Plomba qo'yish"])
+        self.assertEqual(self.get_titles('qoʻyish'), ["Plomba qo'yish"])
+        self.assertEqual(self.get_titles('қўйиш'), ["Plomba qo'yish"])
+
+    def test_lookups_do_not_query_database(self):
+        self.get_titles('tera')
+        with self.assertNumQueries(0):
+            self.get_titles('plo')
+
+    def test_index_updates_on_signals(self):
+        self.get_titles('tera')
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(name="Implantatsiya", department=self.department, description="-")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_titles('impl'), ['Implantatsiya'])
+
+        self.doctor.is_available = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.save()
+        self.assertEqual(self.get_titles('aziz'), [])
+
+
+class DoctorFacetTests(CatalogueDataMixin, TestCase):
+    """Bitset fasetlar: kesishma va har bir qiymat soni"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.surgery = Department.objects.create(name="Jarrohlik", description="-", full_description="-")
+        cls.laylo = Doctor.objects.create(
+            first_name="Laylo", last_name="Sodiqova", gender='F', department=cls.surgery, specialization="Jarroh",
+            experience_years=12, bio="-", phone="+998901234567", rating=4.2, is_sat=True
+        )
+        cls.nodira = Doctor.objects.create(
+            first_name="Nodira", last_name="Aliyeva", gender='F', department=cls.department, specialization="Terapevt",
+            experience_years=3, bio="-", phone="+998901234567", rating=3.5, is_sat=True, is_sun=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        facets.reset()
+
+    def test_intersection_and_disjunctive_counts(self):
+        ids, counts = facets.get_facet_index().query({'gender': ['F'], 'day': ['sat']})
+        self.assertCountEqual(ids, [self.laylo.pk, self.nodira.pk])
+        # Jins soni boshqa fasetlar (shanba) bo'yicha: ikkala ayol
+        self.assertEqual(counts['gender'], {'M': 0, 'F': 2})
+        self.assertEqual(counts['day']['mon'], 2)
+        self.assertEqual(counts['experience'], {'0-4': 1, '5-9': 0, '10-19': 1})
+        self.assertEqual(counts['rating']['4'], 1)
+
+    def test_html_view_uses_facets(self):
+        response = self.client.get(reverse('doctors'), {'gender': 'F', 'experience': '10-19'})
+        self.assertEqual(response.context['doctors'], [self.laylo])
+        gender = next(group for group in response.context['facets'] if group['name'] == 'gender')
+        self.assertEqual([(o['value'], o['count'], o['selected']) for o in gender['options']],
+                         [('M', 0, False), ('F', 1, True)])
+
+    def test_api_facets(self):
+        response = self.client.get(reverse('api_doctors'), {'day': 'sun', 'fields': 'slug'})
+        data = response.json()
+        self.assertEqual(data['results'], [{'slug': self.nodira.slug}])
+        self.assertEqual(data['facets']['gender'], {'M': 0, 'F': 1})
+
+        response = self.client.get(reverse('api_doctors'), {'department': 'jarrohlik', 'fields': 'slug'})
+        data = response.json()
+        self.assertEqual(data['results'], [{'slug': self.laylo.slug}])
+        # Bo'lim fasetlari filtr qiymati bilan bir xil - slug bo'yicha
+        self.assertEqual(data['facets']['department']['jarrohlik'], 1)
+        self.assertIn('terapiya', data['facets']['department'])
+
+    def test_index_is_rebuilt_after_save(self):
+        facets.get_facet_index()
+        self.laylo.is_available = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.laylo.save()
+        ids, _ = facets.get_facet_index().query({'gender': ['F']})
+        self.assertEqual(ids, [self.nodira.pk])
+
+
+class ServiceListFilterTests(CatalogueDataMixin, TestCase):
+    """Xizmatlar: narx/davomiylik filtri, saralash va sahifalash"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cheap = Service.objects.create(
+            name="Konsultatsiya", department=cls.department, description="-", price_from=50000, duration=15
+        )
+        cls.implant = Service.objects.create(
+            name="Implant", department=cls.department, description="-", price_from=5000000, duration=90,
+            is_popular=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_names(self, **params):
+        response = self.client.get(reverse('services'), params)
+        return [service.name for service in response.context['services']]
+
+    def test_filters_and_sorting(self):
+        self.assertEqual(self.get_names(price_max=200000, sort='price'), ['Konsultatsiya', "Plomba qo'yish"])
+        self.assertEqual(self.get_names(price_min=100000, sort='-price'), ['Implant', "Plomba qo'yish"])
+        self.assertEqual(self.get_names(duration_max=40, sort='duration'), ['Konsultatsiya', "Plomba qo'yish"])
+        self.assertEqual(self.get_names(sort='popular')[0], 'Implant')
+        self.assertEqual(self.get_names(price_min='abc', department='yoq'), [])
+
+    def test_price_filter_matches_overlapping_ranges(self):
+        Service.objects.create(name="Protez", department=self.department, description="-",
+                               price_from=200000, price_to=800000)
+        self.assertEqual(self.get_names(price_min=350000, price_max=400000), ["Protez"])
+        self.assertEqual(self.get_names(price_min=900000, sort='price'), ['Implant'])
+
+    def test_pagination(self):
+        with mock.patch('dentist.views.ServiceListView.paginate_by', 2):
+            response = self.client.get(reverse('services'), {'sort': 'price', 'page': 2})
+        self.assertEqual([s.name for s in response.context['services']], ['Implant'])
+        self.assertContains(response, 'sort=price&amp;page=1')
+
+    def test_price_labels_are_cached_per_version(self):
+        self.client.get(reverse('services'))
+        with mock.patch.object(Service, 'get_price_display', side_effect=AssertionError):
+            response = self.client.get(reverse('services'))
+        self.assertContains(response, "5,000,000 so&#x27;m dan")
+
+        self.implant.price_from = 4000000
+        self.implant.save()
+        response = self.client.get(reverse('services'))
+        self.assertContains(response, "4,000,000 so&#x27;m dan")
+
+
+class ScheduleTests(CatalogueDataMixin, TestCase):
+    """Ish vaqti matnini tahlil qilish va "hozir ochiq" holati"""
+
+    def setUp(self):
+        cache.clear()
+        schedule.reset()
+
+    def local(self, day, hour, minute=0):
+        # 2026-10-19 - dushanba
+        return timezone.make_aware(timezone.datetime(2026, 10, 19 + day, hour, minute))
+
+    def test_parse_day_ranges(self):
+        self.assertEqual(schedule.parse_day_range('Dush-Juma'), [0, 1, 2, 3, 4])
+        self.assertEqual(schedule.parse_day_range('Dushanba - Shanba'), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(schedule.parse_day_range('Душ-Жума'), [0, 1, 2, 3, 4])
+        self.assertEqual(schedule.parse_day_range('Har kuni'), list(range(7)))
+        self.assertEqual(schedule.parse_day_range('Juma-Dush'), [0, 4, 5, 6])
+        self.assertEqual(schedule.parse_day_range('Shanba, Yakshanba'), [5, 6])
+        with self.assertRaises(schedule.ScheduleParseError):
+            schedule.parse_day_range('S')
+
+    def test_parse_time_ranges(self):
+        self.assertEqual(schedule.parse_time_range('09:00 - 18:00'), (dtime(9), dtime(18)))
+        self.assertEqual(schedule.parse_time_range('24/7'), (dtime(0), dtime(0)))
+        self.assertEqual(schedule.parse_time_range('20:00 - 24:00'), (dtime(20), dtime(0)))
+        self.assertEqual(
+            schedule.parse_schedule_text('Shanba: 10.00-14.00'), [(5, dtime(10), dtime(14))]
+        )
+
+    def test_weekly_schedule_wraps_week(self):
+        week = schedule.WeeklySchedule([(0, dtime(9), dtime(18)), (6, dtime(22), dtime(2))])
+        monday_noon = 12 * 60
+        self.assertTrue(week.is_open_at(monday_noon))
+        self.assertEqual(week.closes_in(monday_noon), 6 * 60)
+        self.assertEqual(week.opens_in(19 * 60), 6 * 24 * 60 + 3 * 60)
+        # Yakshanba 23:00 -> dushanba 02:00 gacha ochiq
+        sunday_late = 6 * 24 * 60 + 23 * 60
+        self.assertEqual(week.closes_in(sunday_late), 3 * 60)
+        self.assertTrue(week.is_open_at(60))
+        self.assertFalse(week.is_open_on(3))
+
+    def test_working_hour_save_syncs_intervals(self):
+        hour = WorkingHour.objects.create(department=self.department, day_range='Dush-Juma', time_range='09:00 - 18:00')
+        self.assertEqual(ScheduleInterval.objects.filter(source=hour).count(), 5)
+        hour.day_range = 'Shanba'
+        hour.save()
+        self.assertEqual(list(ScheduleInterval.objects.filter(source=hour).values_list('weekday', flat=True)), [5])
+        hour.delete()
+        self.assertFalse(ScheduleInterval.objects.filter(department=self.department).exists())
+
+    def test_settings_save_keeps_manual_clinic_intervals(self):
+        manual = ScheduleInterval.objects.create(weekday=6, opens=dtime(10, 0), closes=dtime(14, 0))
+        site_settings = SiteSettings.get_settings()
+        site_settings.working_hours_weekday = 'Dush-Juma: 08:00 - 17:00'
+        site_settings.save()
+        site_settings.save()
+        self.assertTrue(ScheduleInterval.objects.filter(pk=manual.pk).exists())
+        generated = ScheduleInterval.objects.filter(from_settings=True, weekday__lt=5)
+        self.assertEqual(set(generated.values_list('opens', flat=True)), {dtime(8, 0)})
+        self.assertEqual(generated.count(), 5)
+
+    def test_department_status_and_open_on(self):
+        WorkingHour.objects.create(department=self.department, day_range='Dush-Juma', time_range='09:00 - 18:00')
+        other = Department.objects.create(name="Jarrohlik", description="-", full_description="-")
+        ScheduleInterval.objects.create(weekday=6, opens=dtime(10), closes=dtime(14))
+        schedule.reset()
+
+        opened = schedule.department_status(self.department.pk, now=self.local(0, 10))
+        self.assertTrue(opened['is_open'])
+        self.assertEqual(opened['closes_at'], self.local(0, 18))
+        closed = schedule.department_status(self.department.pk, now=self.local(4, 19))
+        self.assertFalse(closed['is_open'])
+        self.assertEqual((closed['opens_at'], closed['opens_day']), (self.local(7, 9), 'Dushanba'))
+        # O'z jadvali bo'lmagan bo'lim klinika jadvali bo'yicha
+        self.assertTrue(schedule.department_status(other.pk, now=self.local(6, 11))['is_open'])
+        self.assertEqual(schedule.departments_open_on(6), [other.pk])
+
+        # Kecha-kunduz ishlaydigan bo'limning oraliqlari bitta haftalik oraliqqa birlashadi
+        emergency = Department.objects.create(name="Shoshilinch", description="-", full_description="-")
+        WorkingHour.objects.create(department=emergency, day_range='Har kuni', time_range='24/7')
+        schedule.reset()
+        self.assertTrue(all(schedule.get_schedules()[emergency.pk].is_open_on(day) for day in range(7)))
+        self.assertEqual(sorted(schedule.departments_open_on(6)), sorted([other.pk, emergency.pk]))
+
+        response = self.client.get(reverse('department_list'), {'open_on': 'sun'})
+        self.assertEqual({d.pk for d in response.context['departments']}, {other.pk, emergency.pk})
+        response = self.client.get(reverse('department_detail', args=[self.department.slug]))
+        self.assertIn('open_status', response.context)
+
+
+class AvailabilityTests(CatalogueDataMixin, TestCase):
+    """Shifokor jadvalidan istisnolarni ayirish"""
+
+    def setUp(self):
+        cache.clear()
+        availability.reset()
+
+    def at(self, day, hour, minute=0):
+        # 2026-10-19 - dushanba
+        return timezone.make_aware(timezone.datetime(2026, 10, day, hour, minute))
+
+    def hours(self, start_day, end_day):
+        spans = availability.doctor_availability(
+            self.doctor, timezone.datetime(2026, 10, start_day).date(), timezone.datetime(2026, 10, end_day).date()
+        )
+        return [(timezone.localtime(a).strftime('%d %H:%M'), timezone.localtime(b).strftime('%H:%M'))
+                for a, b in spans]
+
+    def test_interval_tree_overlapping(self):
+        tree = availability.IntervalTree([(10, 20), (0, 5), (15, 40), (50, 60), (30, 35)])
+        self.assertEqual(tree.overlapping(18, 31), [(10, 20), (15, 40), (30, 35)])
+        self.assertEqual(tree.overlapping(40, 50), [])
+        self.assertEqual(tree.overlapping(0, 100), [(0, 5), (10, 20), (15, 40), (30, 35), (50, 60)])
+        self.assertEqual(availability.EMPTY_TREE.overlapping(0, 10), [])
+
+    def test_weekly_schedule_without_exceptions(self):
+        # Dushanba-juma 09-18, shanba/yakshanba dam olish
+        self.assertEqual(self.hours(23, 26), [('23 09:00', '18:00'), ('26 09:00', '18:00')])
+
+    def test_exceptions_are_subtracted_and_added(self):
+        ScheduleException.objects.create(doctor=self.doctor, starts_at=self.at(19, 12), ends_at=self.at(19, 14))
+        ScheduleException.objects.create(doctor=self.doctor, starts_at=self.at(20, 0), ends_at=self.at(21, 0),
+                                         reason="Konferensiya")
+        ScheduleException.objects.create(doctor=self.doctor, kind=ScheduleException.KIND_EXTRA,
+                                         starts_at=self.at(24, 10), ends_at=self.at(24, 14))
+        ScheduleException.objects.create(kind=ScheduleException.KIND_HOLIDAY,
+                                         starts_at=self.at(22, 0), ends_at=self.at(23, 0))
+        self.assertEqual(self.hours(19, 24), [
+            ('19 09:00', '12:00'), ('19 14:00', '18:00'), ('21 09:00', '18:00'), ('23 09:00', '18:00'),
+            ('24 10:00', '14:00'),
+        ])
+
+    def test_index_is_rebuilt_on_generation_change(self):
+        self.assertEqual(len(self.hours(19, 19)), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            ScheduleException.objects.create(doctor=self.doctor, starts_at=self.at(19, 8), ends_at=self.at(19, 20))
+        self.assertEqual(self.hours(19, 19), [])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = timezone.now().replace(microsecond=0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+class ReminderSchedulerTests(CatalogueDataMixin, TestCase):
+    """Eslatmalar: soxta soat va lokal yuboruvchi bilan"""
+
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.sender = LocalSender()
+
+    def book(self, hours, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Appointment.objects.create(
+                doctor=self.doctor, patient_name="Ali", patient_phone="+998901112233",
+                starts_at=self.clock.now + timedelta(hours=hours), **kwargs
+            )
+
+    def scheduler(self):
+        return ReminderScheduler(self.sender, clock=self.clock)
+
+    def sent(self):
+        return [(pk, offset) for pk, offset, _ in self.sender.sent]
+
+    def test_fires_on_time_and_survives_restart(self):
+        appointment = self.book(30)
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.tick(), 0)
+        self.clock.advance(hours=6, minutes=1)
+        self.assertEqual(scheduler.tick(), 1)
+        self.clock.advance(hours=22)
+        self.assertEqual(scheduler.tick(), 1)
+        self.assertEqual(self.sent(), [(appointment.pk, 24 * 60), (appointment.pk, 120)])
+        self.assertIn("Aziz Karimov", self.sender.sent[0][2])
+
+        # Qayta ishga tushganda takror yuborilmaydi
+        self.assertEqual(self.scheduler().tick(), 0)
+        self.assertEqual(
+            set(appointment.reminders.values_list('offset', 'status')),
+            {(24 * 60, AppointmentReminder.STATUS_SENT), (120, AppointmentReminder.STATUS_SENT)}
+        )
+
+    def test_missed_reminders_after_downtime_send_only_nearest(self):
+        appointment = self.book(25)
+        self.clock.advance(hours=23, minutes=30)
+        self.assertEqual(self.scheduler().tick(), 1)
+        self.assertEqual(self.sent(), [(appointment.pk, 120)])
+        self.assertEqual(appointment.reminders.get(offset=24 * 60).status, AppointmentReminder.STATUS_SKIPPED)
+
+    def test_late_booking_skips_passed_reminder(self):
+        appointment = self.book(3)
+        scheduler = self.scheduler()
+        scheduler.tick()
+        self.assertEqual([entry[2] for entry in scheduler.heap], [120])
+        self.clock.advance(hours=1, minutes=1)
+        scheduler.tick()
+        self.assertEqual(self.sent(), [(appointment.pk, 120)])
+
+    def test_incremental_reload(self):
+        moved = self.book(30)
+        cancelled = self.book(30)
+        scheduler = self.scheduler()
+        scheduler.tick()
+        # Avlod o'zgarmagan bo'lsa DB'ga murojaat yo'q
+        with self.assertNumQueries(0):
+            scheduler.tick()
+
+        added = self.book(26)
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.starts_at += timedelta(hours=10)
+            moved.save()
+            cancelled.status = Appointment.STATUS_CANCELLED
+            cancelled.save()
+        scheduler.tick()
+        self.clock.advance(hours=6, minutes=1)
+        scheduler.tick()
+        self.assertEqual(self.sent(), [(added.pk, 24 * 60)])
+        self.clock.advance(hours=10)
+        scheduler.tick()
+        self.assertEqual(self.sent()[-1], (moved.pk, 24 * 60))
+        self.assertFalse(cancelled.reminders.exists())
+
+        # T-24 yuborilgandan keyin ko'chirilgan qabul yangi vaqt uchun yana eslatiladi
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.starts_at += timedelta(days=3)
+            moved.save()
+        scheduler.tick()
+        self.clock.advance(hours=72)
+        scheduler.tick()
+        self.assertEqual([entry for entry in self.sent() if entry[0] == moved.pk], [(moved.pk, 24 * 60)] * 2)
+        self.assertEqual(moved.reminders.filter(offset=24 * 60, status=AppointmentReminder.STATUS_SENT).count(), 2)
+
+    def test_failed_send_is_recorded_once(self):
+        appointment = self.book(3)
+        self.sender.fail_for.add(appointment.pk)
+        self.clock.advance(hours=1, minutes=1)
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.tick(), 0)
+        self.assertEqual(appointment.reminders.get().status, AppointmentReminder.STATUS_FAILED)
+        self.assertEqual(self.scheduler().tick(), 0)
+
+    def test_overlapping_run_does_not_resend(self):
+        appointment = self.book(3)
+        self.clock.advance(hours=1, minutes=1)
+        self.assertEqual(self.scheduler().tick(), 1)
+        # Ikkinchi jarayon yuborilganlarni birinchisi yozishidan oldin o'qigan
+        entry = (self.clock.now.timestamp(), appointment.pk, 120, appointment.starts_at.timestamp())
+        with mock.patch.object(AppointmentReminder.objects, 'filter', return_value=AppointmentReminder.objects.none()):
+            self.assertEqual(self.scheduler().fire([entry], self.clock.now), 0)
+        self.assertEqual(self.sent(), [(appointment.pk, 120)])
+        self.assertEqual(appointment.reminders.get().status, AppointmentReminder.STATUS_SENT)
+
+    def test_large_heap_pops_in_batches(self):
+        scheduler = ReminderScheduler(self.sender, clock=self.clock, batch_size=500)
+        start = self.clock.now.timestamp()
+        scheduler.heap = [(start + i, i, 120, start + i + 7200) for i in range(100000, 0, -1)]
+        heapq.heapify(scheduler.heap)
+        self.assertEqual(scheduler.pop_due(self.clock.now - timedelta(seconds=1)), [])
+        due = scheduler.pop_due(self.clock.now + timedelta(hours=1))
+        self.assertEqual(len(due), 500)
+        self.assertEqual([entry[1] for entry in due[:3]], [1, 2, 3])
+        self.assertEqual(len(scheduler), 99500)
+
+
+class DoctorPortalTests(CatalogueDataMixin, TestCase):
+    """Shifokor kabineti va jadvalning o'qish modeli"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user('aziz', password='parol12345')
+        cls.doctor.user = cls.user
+        cls.doctor.save()
+        cls.other = Department.objects.create(name="Jarrohlik", description="-", full_description="-")
+        ContactMessage.objects.create(name="Vali", phone="+998901112233", subject="Tish og'rig'i",
+                                      message="Maslahat kerak", department=cls.department)
+        ContactMessage.objects.create(name="Soli", phone="+998901112244", subject="Implant",
+                                      message="Narxi qancha", department=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+
+    def at(self, days, hour):
+        return timezone.make_aware(timezone.datetime.combine(self.today + timedelta(days=days), dtime(hour)))
+
+    def book(self, days, hour, name="Ali", **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Appointment.objects.create(doctor=self.doctor, patient_name=name, patient_phone="+998900000000",
+                                              starts_at=self.at(days, hour), **kwargs)
+
+    def test_requires_doctor_login(self):
+        response = self.client.get(reverse('portal'))
+        self.assertRedirects(response, f"{reverse('portal_login')}?next={reverse('portal')}")
+        User.objects.create_user('admin', password='parol12345')
+        self.client.login(username='admin', password='parol12345')
+        self.assertEqual(self.client.get(reverse('portal')).status_code, 403)
+
+    def test_dashboard_shows_schedule_and_department_messages(self):
+        self.book(0, 15, name="Kechki")
+        self.book(0, 10, name="Ertalabki")
+        self.book(0, 12, name="Bekor", status=Appointment.STATUS_CANCELLED)
+        self.client.login(username='aziz', password='parol12345')
+        response = self.client.get(reverse('portal'))
+        schedule = response.context['schedule']
+        self.assertEqual([a['patient_name'] for a in schedule['today']], ["Ertalabki", "Kechki"])
+        self.assertEqual(schedule['today_count'], 2)
+        self.assertEqual(schedule['week_patients'], 1)
+        self.assertEqual([m.name for m in response.context['contact_messages']], ["Vali"])
+
+    def test_refresh_uses_read_model_and_etag(self):
+        self.book(0, 10)
+        self.client.login(username='aziz', password='parol12345')
+        url = reverse('portal_schedule')
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in queries if 'dentist_appointment' in q['sql']])
+
+        # Yangi qabul modelga qayta qurishsiz qo'shiladi
+        with mock.patch('dentist.portal.build_read_model', side_effect=AssertionError):
+            moved = self.book(0, 9, name="Yangi")
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([a['patient_name'] for a in response.context['schedule']['today']], ["Yangi", "Ali"])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                moved.doctor = Doctor.objects.create(
+                    first_name="Olim", last_name="Sobirov", gender='M', department=self.department,
+                    specialization="-", experience_years=1, bio="-", phone="+998901234500"
+                )
+                moved.save()
+            response = self.client.get(url)
+            self.assertEqual([a['patient_name'] for a in response.context['schedule']['today']], ["Ali"])
+
+    def test_concurrent_change_is_not_lost(self):
+        self.book(0, 10)
+        key = portal._key(self.doctor.pk)
+        portal.get_read_model(self.doctor.pk)
+        stale = cache.get(key)
+        self.book(0, 9, name="Yangi")
+        # Boshqa jarayon eski nusxa asosida o'z o'zgarishini yozib qo'ydi
+        cache.set(key, stale)
+        self.assertEqual([a['patient_name'] for a in portal.dashboard(self.doctor.pk)['today']], ["Yangi", "Ali"])
+
+        # Mos kelmagan model to'ldirilmaydi, o'chiriladi
+        cache.set(key, stale)
+        self.book(0, 11, name="Kechki")
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(len(portal.dashboard(self.doctor.pk)['today']), 3)
+
+    @mock.patch('dentist.views.dispatch_telegram_message')
+    def test_contact_form_routes_to_department(self, dispatch):
+        self.client.post(reverse('contact'), {
+            'name': "Karim", 'phone': "+998901234599", 'department': self.other.pk,
+            'subject': "Implant narxi", 'message': "Implant narxi haqida ma'lumot bering",
+        })
+        self.assertEqual(ContactMessage.objects.get(name="Karim").department, self.other)
+        self.assertIn("Bo'lim: Jarrohlik", dispatch.call_args[0][0])
+
+
+class ReviewRatingTests(CatalogueDataMixin, TestCase):
+    """Sharhlar va reyting statistikasini o'sib boruvchi yangilash"""
+
+    def setUp(self):
+        cache.clear()
+
+    def review(self, rating, status=Review.STATUS_APPROVED, **kwargs):
+        return Review.objects.create(doctor=self.doctor, patient_name="Ali", rating=rating,
+                                     comment="Juda yaxshi shifokor", status=status, **kwargs)
+
+    def stats(self):
+        doctor = Doctor.objects.get(pk=self.doctor.pk)
+        return doctor.review_count, doctor.review_sum, float(doctor.rating), [c for _, c, _ in doctor.get_rating_histogram()]
+
+    def test_single_review_changes_are_incremental(self):
+        self.review(5)
+        pending = self.review(2, status=Review.STATUS_PENDING)
+        self.assertEqual(self.stats(), (1, 5, 5.0, [1, 0, 0, 0, 0]))
+
+        # Har bir o'zgarish bitta UPDATE (AVG/COUNT so'rovisiz)
+        pending = Review.objects.get(pk=pending.pk)
+        pending.status = Review.STATUS_APPROVED
+        with CaptureQueriesContext(connection) as queries:
+            pending.save()
+        self.assertFalse([q for q in queries if 'AVG(' in q['sql'] or 'COUNT(' in q['sql']])
+        self.assertEqual(self.stats(), (2, 7, 3.5, [1, 0, 0, 1, 0]))
+
+        pending.rating = 4
+        pending.save()
+        self.assertEqual(self.stats(), (2, 9, 4.5, [1, 1, 0, 0, 0]))
+        pending.delete()
+        self.assertEqual(self.stats(), (1, 5, 5.0, [1, 0, 0, 0, 0]))
+
+    def test_saving_stale_doctor_keeps_review_stats(self):
+        stale = Doctor.objects.get(pk=self.doctor.pk)
+        self.review(2)
+        stale.specialization = "Terapevt-stomatolog"
+        stale.save()
+        self.assertEqual(self.stats(), (1, 2, 2.0, [0, 0, 0, 1, 0]))
+        self.assertEqual(Doctor.objects.get(pk=self.doctor.pk).specialization, "Terapevt-stomatolog")
+
+    def test_manual_rating_without_reviews(self):
+        doctor = Doctor.objects.get(pk=self.doctor.pk)
+        doctor.rating = 4.3
+        doctor.save()
+        self.assertEqual(self.stats()[:3], (0, 0, 4.3))
+        self.review(5)
+        doctor.rating = 1.0
+        doctor.save()
+        self.assertEqual(self.stats()[:3], (1, 5, 5.0))
+
+    def test_bulk_moderation_and_recalculate(self):
+        for rating in (5, 4, 4, 1):
+            self.review(rating, status=Review.STATUS_PENDING)
+        self.assertEqual(ratings.set_status(Review.objects.all(), Review.STATUS_APPROVED), 4)
+        self.assertEqual(self.stats(), (4, 14, 3.5, [1, 2, 0, 0, 1]))
+        self.assertEqual(ratings.set_status(Review.objects.filter(rating=1), Review.STATUS_REJECTED), 1)
+        self.assertEqual(self.stats(), (3, 13, 4.3, [1, 2, 0, 0, 0]))
+
+        Doctor.objects.filter(pk=self.doctor.pk).update(review_count=0, review_sum=0, stars_4=0)
+        ratings.recalculate([self.doctor.pk])
+        self.assertEqual(self.stats(), (3, 13, 4.3, [1, 2, 0, 0, 0]))
+        ratings.delete_reviews(Review.objects.all())
+        self.assertEqual(self.stats()[:2], (0, 0))
+
+    def test_submit_review_is_moderated(self):
+        url = reverse('doctor_review', args=[self.doctor.slug])
+        response = self.client.post(url, {'patient_name': "Vali", 'rating': 5, 'comment': "Rahmat, hammasi zo'r"})
+        self.assertRedirects(response, f"{self.doctor.get_absolute_url()}#reviews", fetch_redirect_response=False)
+        review = Review.objects.get(patient_name="Vali")
+        self.assertEqual(review.status, Review.STATUS_PENDING)
+        self.assertEqual(self.stats()[0], 0)
+        self.assertContains(self.client.get(self.doctor.get_absolute_url()), "moderatsiyadan")
+
+    def test_testimonials_are_paginated_and_cached(self):
+        for number in range(14):
+            self.review(4 + number % 2)
+        with mock.patch('dentist.views.TestimonialsView.paginate_by', 10):
+            response = self.client.get(reverse('testimonials'), {'page': 2})
+            self.assertEqual(len(response.context['reviews']), 4)
+            with self.assertNumQueries(0):
+                self.client.get(reverse('testimonials'), {'page': 2})
+
+
+class BackgroundTests(SimpleTestCase):
+    """Fon ishlari: bir nomdagi ish bittadan, ulanishlar yopiladi"""
+
+    def test_submit_runs_once_and_closes_connections(self):
+        started, release = threading.Event(), threading.Event()
+
+        def job():
+            started.set()
+            release.wait(5)
+
+        def wait_idle():
+            for _ in range(500):
+                if 'test-job' not in background._running:
+                    return
+                threading.Event().wait(0.01)
+            self.fail("Fon ishi tugamadi")
+
+        with mock.patch('dentist.background.connections') as connections:
+            self.assertTrue(submit_in_thread('test-job', job))
+            self.assertTrue(started.wait(5))
+            self.assertFalse(submit_in_thread('test-job', job))
+            release.set()
+            wait_idle()
+            connections.close_all.assert_called_once_with()
+
+            with self.assertLogs('dentist.background', 'ERROR'):
+                self.assertTrue(submit_in_thread('test-job', mock.Mock(side_effect=RuntimeError)))
+                wait_idle()
+            self.assertEqual(connections.close_all.call_count, 2)
+
+
+class PopularityTests(CatalogueDataMixin, TestCase):
+    """Ko'rishlar/bosishlar hisoblagichi va mashhurlik reytingi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_doctor = Doctor.objects.create(
+            first_name="Bobur", last_name="Aliyev", gender='M', department=cls.department,
+            specialization="Ortoped", experience_years=3, bio="Yosh shifokor", phone="+998901234568"
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Reyting bugungi kun bo'yicha hisoblanadi
+        self.now = [timezone.now().timestamp()]
+        self.buffer = HitBuffer(clock=lambda: self.now[0])
+        patcher = mock.patch('dentist.analytics.buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Fon ishi test tranzaksiyasida darhol bajariladi
+        patcher = mock.patch('dentist.background.submit', side_effect=run_inline)
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_counts_are_batched(self):
+        doctor = ActivityCount.KIND_DOCTOR
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                self.client.get(self.doctor.get_absolute_url())
+            self.client.get(self.other_doctor.get_absolute_url())
+            self.client.get(reverse('appointment'), {'doctor': self.doctor.slug})
+        self.assertEqual(len(self.buffer), 5)
+        # Oraliq o'tmaguncha hisoblagich jadvaliga murojaat yo'q
+        self.assertFalse([q for q in queries if 'dentist_activitycount' in q['sql']])
+        self.now[0] += settings.ANALYTICS_FLUSH_INTERVAL
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(self.other_doctor.get_absolute_url())
+        # Sahifa ko'rishlari bilan bitta bufer va bitta yozish yo'li
+        self.assertEqual({call.args[0] for call in self.submit.call_args_list}, {'analytics-flush'})
+        self.assertEqual(len(self.buffer), 0)
+        rows = dict(((row.object_id), (row.views, row.bookings)) for row in ActivityCount.objects.filter(kind=doctor))
+        self.assertEqual(rows, {self.doctor.pk: (3, 1), self.other_doctor.pk: (2, 0)})
+        self.assertEqual(sum(PageViewMinute.objects.filter(url_name='doctor_detail').values_list('hits', flat=True)), 5)
+        self.assertFalse(PageViewMinute.objects.exclude(url_name='doctor_detail').exists())
+
+        # Keyingi yozuv mavjud qatorlarga qo'shiladi; reyting ham hisoblangan
+        self.assertEqual(popularity.ranked_ids(doctor, 10), [self.doctor.pk, self.other_doctor.pk])
+        analytics.record_booking(doctor, self.other_doctor.pk)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(ActivityCount.objects.get(kind=doctor, object_id=self.other_doctor.pk).bookings, 1)
+
+    def test_scores_decay_with_age(self):
+        today = timezone.localdate()
+        doctor = ActivityCount.KIND_DOCTOR
+        ActivityCount.objects.create(kind=doctor, object_id=self.doctor.pk, day=today - timedelta(days=4), views=30)
+        ActivityCount.objects.create(kind=doctor, object_id=self.other_doctor.pk, day=today, views=5, bookings=1)
+        # Oynadan tashqaridagi faollik hisobga olinmaydi
+        ActivityCount.objects.create(kind=doctor, object_id=self.other_doctor.pk, day=today - timedelta(days=30),
+                                     views=1000)
+        scores = popularity.compute_scores(ActivityCount.objects.values_list(
+            'kind', 'object_id', 'day', 'views', 'bookings').filter(day__gte=today - timedelta(days=6)), today)
+        self.assertAlmostEqual(scores[doctor, self.doctor.pk], 30 * 0.5 ** (4 / settings.POPULARITY_HALF_LIFE_DAYS))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(popularity.recompute(today), 2)
+        self.assertEqual(popularity.ranked_ids(doctor, 10), [self.other_doctor.pk, self.doctor.pk])
+        self.assertEqual(get_generation(PopularityRank), 1)
+        self.assertEqual(popularity.featured_doctors(1), [self.other_doctor])
+
+        # Mavjud bo'lmagan shifokor reytingdan chiqadi
+        Doctor.objects.filter(pk=self.other_doctor.pk).update(is_available=False)
+        popularity.recompute(today)
+        self.assertEqual(popularity.ranked_ids(doctor, 10), [self.doctor.pk])
+
+    def test_manual_flags_fill_missing_ranking(self):
+        self.assertEqual(popularity.featured_doctors(3), [self.doctor])
+        Service.objects.filter(pk=self.service.pk).update(is_popular=True)
+        self.assertEqual(popularity.popular_services(), [self.service])
+
+        PopularityRank.objects.create(kind=ActivityCount.KIND_DOCTOR, object_id=self.other_doctor.pk, position=1,
+                                      score=2.0, computed_at=timezone.now())
+        self.assertEqual(popularity.featured_doctors(3), [self.other_doctor, self.doctor])
+        response = self.client.get(reverse('doctors'))
+        self.assertEqual(response.context['featured_doctors'], [self.other_doctor, self.doctor])
+
+        second = Service.objects.create(name="Oqartirish", department=self.department, description="Oq tishlar")
+        PopularityRank.objects.create(kind=ActivityCount.KIND_SERVICE, object_id=second.pk, position=1,
+                                      score=1.0, computed_at=timezone.now())
+        response = self.client.get(reverse('services'), {'sort': 'popular'})
+        self.assertEqual([service.pk for service in response.context['services']], [second.pk, self.service.pk])
+
+
+class PageViewAnalyticsTests(CatalogueDataMixin, TestCase):
+    """Sahifa ko'rishlari: bufer, daqiqalik hisoblar va yig'indilar"""
+
+    def setUp(self):
+        cache.clear()
+        self.now = [1_800_000_000.0]
+        self.buffer = HitBuffer(clock=lambda: self.now[0])
+        patcher = mock.patch('dentist.analytics.buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('dentist.background.submit', side_effect=run_inline)
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_middleware_buffers_hits(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.doctor.get_absolute_url())
+            self.client.get(self.doctor.get_absolute_url())
+            self.client.get(reverse('department_list'))
+            self.client.get(reverse('doctor_detail', args=['yoq']))
+            self.client.get(reverse('about'))
+        self.assertEqual(len(self.buffer), 3)
+        self.assertFalse([q for q in queries if 'dentist_pageview' in q['sql']])
+
+        self.now[0] += settings.ANALYTICS_FLUSH_INTERVAL
+        self.client.get(reverse('services'))
+        self.assertIn('analytics-flush', [call.args[0] for call in self.submit.call_args_list])
+        self.assertEqual(len(self.buffer), 0)
+        rows = set(PageViewMinute.objects.values_list('url_name', 'object_id', 'hits'))
+        self.assertEqual(rows, {('doctor_detail', self.doctor.pk, 2), ('department_list', 0, 1), ('services', 0, 1)})
+
+    def test_compact_into_hourly_and_daily_rollups(self):
+        zone = timezone.get_default_timezone()
+        day = timezone.datetime(2026, 10, 19, tzinfo=zone)
+        minute = lambda hour, m: day + timedelta(hours=hour, minutes=m)
+        for at, hits in ((minute(9, 5), 2), (minute(9, 40), 3), (minute(10, 1), 4), (minute(11, 2), 1)):
+            PageViewMinute.objects.create(url_name='doctor_detail', object_id=self.doctor.pk, minute=at, hits=hits)
+
+        self.assertEqual(analytics.compact(minute(11, 30)), 3)
+        self.assertEqual(PageViewMinute.objects.count(), 1)
+        hourly = dict(PageViewRollup.objects.filter(period=PageViewRollup.PERIOD_HOUR).values_list('start', 'hits'))
+        self.assertEqual(hourly, {minute(9, 0): 5, minute(10, 0): 4})
+
+        # Keyingi siqish mavjud yig'indiga qo'shadi
+        self.assertEqual(analytics.compact(minute(12, 30)), 1)
+        daily = PageViewRollup.objects.get(period=PageViewRollup.PERIOD_DAY)
+        self.assertEqual((daily.start, daily.hits), (day, 10))
+
+        # Eski soatliklar o'chiriladi, kunliklar qoladi
+        analytics.compact(day + timedelta(days=settings.ANALYTICS_HOURLY_RETENTION_DAYS + 1))
+        self.assertFalse(PageViewRollup.objects.filter(period=PageViewRollup.PERIOD_HOUR).exists())
+        self.assertEqual(analytics.daily_totals(3, today=day.date() + timedelta(days=1)),
+                         [(day.date() - timedelta(days=1), 0), (day.date(), 10), (day.date() + timedelta(days=1), 0)])
+
+    def test_admin_chart_reads_rollups_only(self):
+        today = timezone.localdate()
+        PageViewRollup.objects.create(period=PageViewRollup.PERIOD_DAY, url_name='doctor_detail',
+                                      object_id=self.doctor.pk, hits=7,
+                                      start=timezone.make_aware(timezone.datetime.combine(today, dtime.min)))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'parol'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:dentist_pageviewrollup_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['chart'][-1][1:], (7, 100))
+        self.assertContains(response, str(self.doctor))
+        self.assertFalse([q for q in queries if 'dentist_pageviewminute' in q['sql']])
+
+
+class AdminDashboardTests(CatalogueDataMixin, TestCase):
+    """Admin bosh sahifasi: o'sib boruvchi yig'indilar"""
+
+    def message(self, **kwargs):
+        return ContactMessage.objects.create(name="Vali", phone="+998901112233", subject="Savol",
+                                             message="Narxlar qanday?", **kwargs)
+
+    def inbox(self):
+        return {stat.department_key: (stat.total, stat.unread) for stat in InboxStat.objects.all()}
+
+    def test_messages_and_bookings_are_counted_incrementally(self):
+        first = self.message(department=self.department)
+        self.message(department=self.department)
+        self.message()
+        Appointment.objects.create(doctor=self.doctor, patient_name="Ali", patient_phone="+998901112233",
+                                   starts_at=timezone.now() + timedelta(days=1))
+        today = DailyStat.objects.get(day=timezone.localdate())
+        self.assertEqual((today.messages, today.bookings), (3, 1))
+        self.assertEqual(self.inbox(), {self.department.pk: (2, 2), 0: (1, 1)})
+
+        # Bitta xabar: o'qilgan va boshqa bo'limga o'tkazilgan
+        message = ContactMessage.objects.get(pk=first.pk)
+        message.is_read = True
+        message.department = None
+        message.save()
+        self.assertEqual(self.inbox(), {self.department.pk: (1, 1), 0: (2, 1)})
+
+        # Deferred maydonlar bilan o'qilgan obyekt ham to'g'ri hisoblanadi
+        message = ContactMessage.objects.only('pk', 'subject').get(pk=first.pk)
+        message.is_read = False
+        message.save()
+        self.assertEqual(self.inbox(), {self.department.pk: (1, 1), 0: (2, 2)})
+
+        # Ommaviy amal (signal'siz UPDATE) va o'chirish
+        self.assertEqual(dashboard.set_read(ContactMessage.objects.all(), True), 3)
+        self.assertEqual(self.inbox(), {self.department.pk: (1, 0), 0: (2, 0)})
+        ContactMessage.objects.filter(department__isnull=True).delete()
+        self.assertEqual(self.inbox(), {self.department.pk: (1, 0), 0: (0, 0)})
+
+        expected = self.inbox()
+        dashboard.rebuild()
+        self.assertEqual({key: value for key, value in self.inbox().items() if value[0]},
+                         {key: value for key, value in expected.items() if value[0]})
+
+    def test_admin_index_reads_rollups_only(self):
+        self.message(department=self.department)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'parol'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:index'))
+        self.assertContains(response, "O'qilmagan xabarlar")
+        self.assertContains(response, self.department.name)
+        raw = [q['sql'] for q in queries if 'dentist_contactmessage' in q['sql'] or 'dentist_appointment' in q['sql']]
+        self.assertEqual(raw, [])
+
+
+class HomepageTests(CatalogueDataMixin, TestCase):
+    """Bosh sahifa: modellar asosidagi, alohida keshlangan bo'limlar"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sections_are_rendered_from_models(self):
+        Review.objects.create(doctor=self.doctor, patient_name="Ali", rating=5, comment="Juda yaxshi shifokor",
+                              status=Review.STATUS_APPROVED)
+        Service.objects.filter(pk=self.service.pk).update(is_popular=True)
+        response = self.client.get(reverse('index'))
+        for text in (self.department.name, self.service.get_absolute_url(), self.doctor.get_full_name(), "Juda yaxshi shifokor"):
+            self.assertContains(response, text)
+        self.assertContains(response, f"{reverse('appointment')}?doctor={self.doctor.slug}")
+
+        # Keyingi so'rovda barcha bo'limlar cache'dan: faqat sozlamalar so'rovi qoladi
+        with self.assertNumQueries(1):
+            self.assertContains(self.client.get(reverse('index')), self.doctor.get_full_name())
+
+    def test_change_invalidates_dependent_sections_only(self):
+        self.client.get(reverse('index'))
+        before = homepage.fragment_keys()
+        settings_obj = SiteSettings.get_settings()
+        settings_obj.clinic_name = "Yangi klinika"
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_obj.save()
+        after = homepage.fragment_keys()
+        self.assertEqual([name for name in before if before[name] != after[name]], ['hero'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.save()
+        changed = [name for name, key in homepage.fragment_keys().items() if key != after[name]]
+        self.assertEqual(changed, ['hero', 'departments', 'doctors', 'testimonials'])
+        self.assertContains(self.client.get(reverse('index')), "Yangi klinika")
+
+
+class CardCacheTests(CatalogueDataMixin, TestCase):
+    """Shifokor/xizmat kartalari: (pk, updated_at, variant) bo'yicha keshlangan HTML"""
+
+    def setUp(self):
+        cache.clear()
+        facets.reset()
+        patcher = mock.patch('dentist.templatetags.cards.render_to_string', wraps=cards.render_to_string)
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cards_are_rendered_once_per_version(self):
+        self.client.get(reverse('doctors'))
+        # Katalog, asosiy shifokor va ixcham ko'rinish kartalari
+        self.assertEqual(self.render.call_count, 3)
+        self.render.reset_mock()
+        response = self.client.get(reverse('doctors'))
+        self.assertContains(response, self.doctor.get_full_name())
+        self.assertEqual(self.render.call_count, 0)
+
+        # Saqlash (auto_now) kartani yangilaydi
+        doctor = Doctor.objects.get(pk=self.doctor.pk)
+        doctor.specialization = "Endodontist"
+        doctor.save()
+        self.assertContains(self.client.get(reverse('doctors')), "Endodontist")
+        self.assertEqual(self.render.call_count, 3)
+
+        # Signal'siz reyting UPDATE ham updated_at'ni o'zgartiradi
+        self.render.reset_mock()
+        Review.objects.create(doctor=self.doctor, patient_name="Ali", rating=3, comment="Yaxshi",
+                              status=Review.STATUS_APPROVED)
+        self.assertContains(self.client.get(reverse('doctors')), "⭐ 3,0")
+        self.assertEqual(self.render.call_count, 3)
+
+    def test_department_rename_and_related_cards(self):
+        self.client.get(reverse('doctors'))
+        Department.objects.filter(pk=self.department.pk).update(name="Jarrohlik")
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.get(pk=self.department.pk).save()
+        self.assertContains(self.client.get(reverse('doctors')), "Jarrohlik")
+
+        self.render.reset_mock()
+        response = self.client.get(self.service.get_absolute_url())
+        self.assertContains(response, self.doctor.get_full_name())
+        self.client.get(self.service.get_absolute_url())
+        self.assertEqual([call.args[0] for call in self.render.call_args_list], ['partials/cards/doctor_department.html'])
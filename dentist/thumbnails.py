@@ -0,0 +1,52 @@
+"""
+Admin va sahifalarda ko'rsatish uchun kichraytirilgan rasmlar
+
+Thumbnail birinchi so'ralganda Pillow bilan yaratiladi va storage'ga
+'thumbs/<o'lcham>/<asl nom>' yo'li bilan saqlanadi; keyingi so'rovlarda
+tayyor fayl ishlatiladi. Asl fayl topilmasa yoki o'qib bo'lmasa asl URL
+qaytariladi.
+"""
+
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+THUMBNAIL_DIR = 'thumbs'
+FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP', '.gif': 'PNG'}
+
+
+def thumbnail_name(name, size):
+    root, ext = os.path.splitext(name)
+    if ext.lower() == '.gif':
+        ext = '.png'
+    return f"{THUMBNAIL_DIR}/{size}x{size}/{root}{ext}"
+
+
+def make_thumbnail(field_file, size):
+    """Kvadrat ichiga sig'adigan nusxa yaratish va uning nomini qaytarish"""
+    storage = field_file.storage
+    name = thumbnail_name(field_file.name, size)
+    if storage.exists(name):
+        return name
+
+    with storage.open(field_file.name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.thumbnail((size, size))
+        image_format = FORMATS.get(os.path.splitext(name)[1].lower(), 'JPEG')
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, quality=85)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def thumbnail_url(field_file, size=100):
+    """Thumbnail URL'i (bo'sh maydon uchun None)"""
+    if not field_file:
+        return None
+    try:
+        return field_file.storage.url(make_thumbnail(field_file, size))
+    except (OSError, UnidentifiedImageError, ValueError):
+        return field_file.url
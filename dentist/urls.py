@@ -1,3 +1,5 @@
+from django.contrib.auth import views as auth_views
+from django.contrib.sitemaps import views as sitemap_views
 from django.urls import path
 
 from dentist.views import (AboutView, AppointmentView,
@@ -6,11 +8,20 @@ from dentist.views import (AboutView, AppointmentView,
     DepartmentDetailView,
     DoctorListView,
     DoctorDetailView,
+    DoctorDashboardView,
+    DoctorScheduleView,
     IndexView,
+    ReviewCreateView,
+    RobotsView,
+    SuggestView,
     ServiceListView,
     ServiceDetailView,
     TestimonialsView
 )
+from dentist.api import CatalogueAPIView
+from dentist.caching import cache_by_generation
+from dentist.models import Doctor, Review
+from dentist.sitemaps import SITEMAP_MODELS, SITEMAPS
 
 urlpatterns = [
     path("", IndexView.as_view(), name="index"),
@@ -29,5 +40,38 @@ urlpatterns = [
     # Shifokorlar
     path("doctors/", DoctorListView.as_view(), name="doctors"),
     path("doctor/<slug:slug>/", DoctorDetailView.as_view(), name="doctor_detail"),
-    path("testimonials/", TestimonialsView.as_view(), name="testimonials"),
+    path("doctor/<slug:slug>/review/", ReviewCreateView.as_view(), name="doctor_review"),
+    path("testimonials/", cache_by_generation(Review, Doctor)(TestimonialsView.as_view()), name="testimonials"),
+    path("search/suggest", SuggestView.as_view(), name="search_suggest"),
+
+    # Shifokor kabineti
+    path("portal/", DoctorDashboardView.as_view(), name="portal"),
+    path("portal/schedule/", DoctorScheduleView.as_view(), name="portal_schedule"),
+    path("portal/login/", auth_views.LoginView.as_view(template_name="portal/login.html"), name="portal_login"),
+    path("portal/logout/", auth_views.LogoutView.as_view(), name="portal_logout"),
+
+    # JSON API (faqat o'qish)
+    path("api/v1/departments/", CatalogueAPIView.as_view(resource_name='departments'), name="api_departments"),
+    path("api/v1/departments/<slug:slug>/", CatalogueAPIView.as_view(resource_name='departments'),
+         name="api_department_detail"),
+    path("api/v1/services/", CatalogueAPIView.as_view(resource_name='services'), name="api_services"),
+    path("api/v1/services/<slug:slug>/", CatalogueAPIView.as_view(resource_name='services'),
+         name="api_service_detail"),
+    path("api/v1/doctors/", CatalogueAPIView.as_view(resource_name='doctors'), name="api_doctors"),
+    path("api/v1/doctors/<slug:slug>/", CatalogueAPIView.as_view(resource_name='doctors'), name="api_doctor_detail"),
+
+    # Qidiruv tizimlari uchun
+    path("robots.txt", RobotsView.as_view(), name="robots"),
+    path(
+        "sitemap.xml",
+        cache_by_generation(*SITEMAP_MODELS)(sitemap_views.index),
+        {"sitemaps": SITEMAPS, "sitemap_url_name": "sitemap_section"},
+        name="sitemap",
+    ),
+    path(
+        "sitemap-<section>.xml",
+        cache_by_generation(*SITEMAP_MODELS)(sitemap_views.sitemap),
+        {"sitemaps": SITEMAPS},
+        name="sitemap_section",
+    ),
 ]
\ No newline at end of file
@@ -1,188 +1,339 @@
-import os
+import asyncio
+import inspect
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
-from django.contrib.sites import requests
-from django.shortcuts import render
-from django.urls import reverse_lazy
-from django.views.generic import TemplateView, ListView, DetailView
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, render
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.views import View
+from django.views.generic import TemplateView
 from django.db import models
-
-from dentist.forms import ContactForm
-from dentist.models import Department, Service, Doctor, ContactMessage
+from django.db.models.functions import Coalesce
+
+from dentist.facets import WEEKDAYS, facet_groups, get_facet_index, parse_selected
+from dentist.forms import ContactForm, ReviewForm
+from dentist import analytics, homepage, popularity, portal
+from dentist.models import (
+    ActivityCount, ContactMessage, Department, PopularityRank, Review, Service, Doctor, SiteSettings
+)
+from dentist.notifications import dispatch_telegram_message
+from dentist.pricing import attach_labels
+from dentist.ratelimit import RateLimitMixin
+from dentist.schedule import department_status, department_statuses, departments_open_on
+from dentist.spam import aingest_contact_message, is_probable_spam
+from dentist.suggest import suggest
 
 
 # Create your views here.
 
-class DepartmentListView(ListView):
+WEEKDAY_KEYS = {key: number for number, (key, _) in enumerate(WEEKDAYS)}
+
+async def alist(queryset):
+    """QuerySet'ni async iteratsiya bilan ro'yxatga aylantirish"""
+    return [obj async for obj in queryset]
+
+
+class AsyncTemplateMixin:
+    """Async view'lar uchun template render (context processor DB so'rovisiz)"""
+    template_name = None
+
+    async def render_to_response(self, request, context, status=200):
+        # Context ichidagi awaitable qiymatlar (so'rovlar) sozlamalar bilan birga parallel bajariladi
+        pending = {key: value for key, value in context.items() if inspect.isawaitable(value)}
+        site_settings, *results = await asyncio.gather(SiteSettings.aget_settings(), *pending.values())
+        context.update(zip(pending, results))
+
+        # site_settings context processori sinxron so'rov qilmasligi uchun oldindan yuklaymiz
+        request.site_settings = site_settings
+        return render(request, self.template_name, context, status=status)
+
+
+class DepartmentListView(AsyncTemplateMixin, View):
     """Barcha faol bo'limlar ro'yxati"""
-    model = Department
     template_name = "departments.html"
-    context_object_name = "departments"
 
     def get_queryset(self):
-        # Faqat faol bo'limlarni tartibi bo'yicha olamiz
-        return Department.objects.filter(is_active=True).prefetch_related('doctors')
-
-
-class DepartmentDetailView(DetailView):
+        # Faqat faol bo'limlarni tartibi bo'yicha olamiz (template'dagi .count uchun prefetch)
+        return Department.objects.filter(is_active=True).prefetch_related('doctors', 'services')
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        # ?open_on=sun - shu kuni ishlaydigan bo'limlar
+        weekday = WEEKDAY_KEYS.get(request.GET.get('open_on'))
+        if weekday is not None:
+            queryset = queryset.filter(pk__in=await sync_to_async(departments_open_on)(weekday))
+
+        departments = await alist(queryset)
+        statuses = await sync_to_async(department_statuses)([d.pk for d in departments])
+        for department in departments:
+            department.open_status = statuses[department.pk]
+        return await self.render_to_response(request, {
+            'departments': departments,
+        })
+
+
+class DepartmentDetailView(AsyncTemplateMixin, View):
     """Bitta bo'lim haqida to'liq malumot (dinamik)"""
-    model = Department
     template_name = "department-details.html"
-    context_object_name = "department"
-    slug_url_kwarg = "slug"
 
     def get_queryset(self):
-        return Department.objects.filter(is_active=True).prefetch_related(
-            'doctors', 'services', 'features', 'working_hours'
-        )
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["services"] = self.object.services.filter(is_active=True)
-        context['features'] = self.object.features.all()
-        context['hours'] = self.object.working_hours.all()
-        context['doctors'] = self.object.doctors.filter(is_available=True)
-        return context
-
-
-class ServiceListView(ListView):
-    """Barcha xizmatlar ro'yxati"""
-    model = Service
+        return Department.objects.filter(is_active=True)
+
+    async def get(self, request, slug, *args, **kwargs):
+        department = await aget_object_or_404(self.get_queryset(), slug=slug)
+        request.analytics_object_id = department.pk
+        return await self.render_to_response(request, {
+            'department': department,
+            'open_status': sync_to_async(department_status)(department.pk),
+            'services': alist(department.services.filter(is_active=True)),
+            'features': alist(department.features.all()),
+            'hours': alist(department.working_hours.all()),
+            'doctors': alist(department.doctors.filter(is_available=True)),
+        })
+
+
+class ServiceListView(AsyncTemplateMixin, View):
+    """Barcha xizmatlar ro'yxati (narx/davomiylik filtri, saralash, sahifalash)"""
     template_name = "services.html"
-    context_object_name = "services"
+    paginate_by = 12
+    # sort parametri -> tartib (narx bo'yicha (is_active, price_from) indeksi ishlatiladi)
+    SORTS = {
+        'price': [models.F('price_from').asc(nulls_last=True), 'name'],
+        '-price': [models.F('price_from').desc(nulls_last=True), 'name'],
+        # Mashhurlik reytingi bo'yicha, reytingda yo'qlari qo'lda belgilanganlar tartibida
+        'popular': [
+            models.Subquery(PopularityRank.objects.filter(
+                kind=ActivityCount.KIND_SERVICE, object_id=models.OuterRef('pk')
+            ).values('position')[:1]).asc(nulls_last=True),
+            '-is_popular', 'order', 'name',
+        ],
+        'duration': [models.F('duration').asc(nulls_last=True), 'name'],
+    }
 
     def get_queryset(self):
         # Faqat faol xizmatlarni va ularga tegishli bo'limlarni so'rovda olamiz
-        return Service.objects.filter(is_active=True).select_related('department').order_by('order', 'name')
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Statistika uchun
-        context['total_services'] = Service.objects.filter(is_active=True).count()
-        context['total_doctors'] = Doctor.objects.filter(is_available=True).count()
-        return context
-
-
-class ServiceDetailView(DetailView):
+        queryset = Service.objects.filter(is_active=True).select_related('department')
+        params = self.request.GET
+
+        department = params.get('department')
+        if department:
+            queryset = queryset.filter(department__slug=department)
+
+        # Narx oralig'i kesishishi bo'yicha: 200-800 ming xizmat 300 mingdan boshlangan oraliqqa ham tushadi
+        queryset = queryset.alias(price_upper=Coalesce('price_to', 'price_from'))
+        for param, lookup in (('price_min', 'price_upper__gte'), ('price_max', 'price_from__lte'),
+                              ('duration_min', 'duration__gte'), ('duration_max', 'duration__lte')):
+            try:
+                value = int(params.get(param, ''))
+            except ValueError:
+                continue
+            queryset = queryset.filter(**{lookup: value})
+
+        return queryset.order_by(*self.SORTS.get(params.get('sort'), ['order', 'name']))
+
+    async def get(self, request, *args, **kwargs):
+        self.request = request
+        paginator = Paginator(self.get_queryset(), self.paginate_by)
+        page = await sync_to_async(paginator.get_page)(request.GET.get('page'))
+        page.object_list = attach_labels(await alist(page.object_list))
+
+        query = request.GET.copy()
+        query.pop('page', None)
+        return await self.render_to_response(request, {
+            'services': page.object_list,
+            'page_obj': page,
+            'query_string': query.urlencode(),
+            'sort_options': [('', 'Tartib bo\'yicha'), ('price', 'Arzonroq'), ('-price', 'Qimmatroq'),
+                             ('popular', 'Mashhur'), ('duration', 'Qisqaroq')],
+            'departments': alist(Department.objects.filter(is_active=True).order_by('order')),
+            # Statistika uchun
+            'total_services': Service.objects.filter(is_active=True).acount(),
+            'total_doctors': Doctor.objects.filter(is_available=True).acount(),
+        })
+
+
+class ServiceDetailView(AsyncTemplateMixin, View):
     """Bitta xizmat haqida batafsil ma'lumot"""
-    model = Service
     template_name = "service-details.html"
-    context_object_name = "service"
-    slug_url_kwarg = "slug"
 
     def get_queryset(self):
-        return Service.objects.filter(is_active=True).select_related('department')
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # O'xshash xizmatlarni (shu bo'limdagi boshqa xizmatlar) ko'rsatish uchun
-        context["related_services"] = Service.objects.filter(
-            department=self.object.department,
-            is_active=True
-        ).exclude(id=self.object.id).order_by('order')[:3]
-
-        # Bu bo'limdagi shifokorlar
-        context["department_doctors"] = Doctor.objects.filter(
-            department=self.object.department,
-            is_available=True
-        ).order_by('order')[:4]
-
-        return context
-
-
-class DoctorListView(ListView):
+        return Service.objects.filter(is_active=True).select_related('department').prefetch_related('features')
+
+    async def get(self, request, slug, *args, **kwargs):
+        service = await aget_object_or_404(self.get_queryset(), slug=slug)
+        request.analytics_object_id = service.pk
+        return await self.render_to_response(request, {
+            'service': service,
+            # O'xshash xizmatlarni (shu bo'limdagi boshqa xizmatlar) ko'rsatish uchun
+            'related_services': alist(Service.objects.filter(
+                department_id=service.department_id,
+                is_active=True
+            ).exclude(id=service.id).order_by('order')[:3]),
+            # Bu bo'limdagi shifokorlar
+            'department_doctors': alist(Doctor.objects.filter(
+                department_id=service.department_id,
+                is_available=True
+            ).order_by('order')[:4]),
+        })
+
+
+class DoctorListView(AsyncTemplateMixin, View):
     """Barcha shifokorlar ro'yxati"""
-    model = Doctor
     template_name = "doctors.html"
-    context_object_name = "doctors"
 
     def get_queryset(self):
         # Faqat mavjud shifokorlarni olamiz
-        queryset = Doctor.objects.filter(is_available=True).select_related('department').order_by('order', 'last_name')
+        return Doctor.objects.filter(is_available=True).select_related('department')
 
-        # Bo'lim bo'yicha filter
-        department_id = self.request.GET.get('department')
-        if department_id:
-            queryset = queryset.filter(department_id=department_id)
+    def search(self, queryset, search):
+        return queryset.filter(
+            models.Q(first_name__icontains=search) |
+            models.Q(last_name__icontains=search) |
+            models.Q(specialization__icontains=search) |
+            models.Q(bio__icontains=search)
+        )
 
-        # Qidiruv
-        search = self.request.GET.get('search')
+    async def get(self, request, *args, **kwargs):
+        # Fasetlar (bo'lim, jins, tajriba, reyting, ish kuni) xotiradagi bitset indeksdan
+        selected = parse_selected(request.GET)
+        index = await sync_to_async(get_facet_index)()
+        base = None
+        search = request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                models.Q(first_name__icontains=search) |
-                models.Q(last_name__icontains=search) |
-                models.Q(specialization__icontains=search) |
-                models.Q(bio__icontains=search)
-            )
-
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Bo'limlar ro'yxati (filter uchun)
-        context['departments'] = Department.objects.filter(is_active=True).order_by('order')
-        # Asosiy sahifadagi shifokorlar
-        context['featured_doctors'] = Doctor.objects.filter(
-            is_available=True,
-            is_futured=True
-        ).select_related('department').order_by('order')[:3]
-        return context
-
-
-class DoctorDetailView(DetailView):
+            base = index.mask_for_ids([
+                pk async for pk in self.search(self.get_queryset(), search).values_list('pk', flat=True)
+            ])
+        ids, counts = index.query(selected, base)
+
+        doctors = {doctor.pk: doctor async for doctor in self.get_queryset().filter(pk__in=ids)}
+        departments = await alist(Department.objects.filter(is_active=True).order_by('order'))
+        return await self.render_to_response(request, {
+            'doctors': [doctors[pk] for pk in ids if pk in doctors],
+            # Bo'limlar ro'yxati (filter uchun)
+            'departments': departments,
+            'facets': facet_groups(counts, selected, {str(d.pk): d.name for d in departments}),
+            'total_doctors': len(ids),
+            # Mashhurlik reytingi bo'yicha asosiy shifokorlar
+            'featured_doctors': sync_to_async(popularity.featured_doctors)(3),
+        })
+
+
+class DoctorDetailView(AsyncTemplateMixin, View):
     """Bitta shifokor haqida batafsil ma'lumot"""
-    model = Doctor
     template_name = "doctor-details.html"
-    context_object_name = "doctor"
-    slug_url_kwarg = "slug"
+    reviews_limit = 5
 
     def get_queryset(self):
-        return Doctor.objects.filter(is_available=True).select_related('department')
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Shu bo'limdagi boshqa shifokorlar
-        context["related_doctors"] = Doctor.objects.filter(
-            department=self.object.department,
-            is_available=True
-        ).exclude(id=self.object.id).order_by('order')[:3]
-        return context
-
+        return Doctor.objects.filter(is_available=True).select_related('department').prefetch_related(
+            'department__services'
+        )
 
-class ContactView(TemplateView):
-    """Bog'lanish vazifasi"""
+    async def get(self, request, slug, *args, **kwargs):
+        doctor = await aget_object_or_404(self.get_queryset(), slug=slug)
+        request.analytics_object_id = doctor.pk
+        return await self.render_to_response(request, {
+            'doctor': doctor,
+            'reviews': alist(doctor.reviews.filter(status=Review.STATUS_APPROVED)[:self.reviews_limit]),
+            'review_form': ReviewForm(),
+            # Shu bo'limdagi boshqa shifokorlar
+            'related_doctors': alist(Doctor.objects.filter(
+                department_id=doctor.department_id,
+                is_available=True
+            ).exclude(id=doctor.id).order_by('order')[:3]),
+        })
+
+
+class ContactView(RateLimitMixin, AsyncTemplateMixin, View):
+    """Bog'lanish vazifasi (ASGI ostida to'liq async)"""
     template_name = "contact.html"
-    from_class = ContactForm
+    ratelimit_route = 'contact'
+    form_class = ContactForm
     success_url = reverse_lazy('contact')
 
-    def form_valid(self, form):
-        contact_message = form.save()
+    def get_departments(self):
+        return alist(Department.objects.filter(is_active=True).only('pk', 'name'))
+
+    async def get(self, request, *args, **kwargs):
+        return await self.render_to_response(request, {
+            'form': self.form_class(), 'departments': self.get_departments(),
+        })
+
+    async def post(self, request, *args, **kwargs):
+        # Bo'limlar oldindan async olinadi: validatsiya event loop'da, thread pool'siz
+        form = self.form_class(request.POST, departments=await self.get_departments())
+        if form.is_valid():
+            return await self.form_valid(form)
+        return await self.form_invalid(form)
+
+    async def form_valid(self, form):
+        contact_message, created = await aingest_contact_message(form.save(commit=False))
+        if not created:
+            # Takror xabar: yangi yozuv va bildirishnoma yo'q
+            messages.info(
+                self.request,
+                f"{contact_message.name}, xabaringiz allaqachon qabul qilingan. Tez orada siz bilan bog'lanamiz."
+            )
+            return HttpResponseRedirect(self.success_url)
 
+        department = form.cleaned_data.get('department')
         message = (
             f"📩 <b>Yangi xabar (Bog'lanish)</b>\n\n"
             f"👤 Ism: {contact_message.name}\n"
             f"📞 Tel: {contact_message.phone}\n"
-            f"📝 Mavzu: {contact_message.subject}\n"
+            + (f"🏥 Bo'lim: {department.name}\n" if department else "")
+            + f"📝 Mavzu: {contact_message.subject}\n"
             f"💬 Xabar: {contact_message.message}"
         )
 
-        send_telegram_message(message)
+        # Javobni Telegram'ni kutmasdan qaytaramiz (ehtimoliy spam yuborilmaydi)
+        if not is_probable_spam(contact_message):
+            dispatch_telegram_message(message)
 
         messages.success(self.request, f"Rahmat, {contact_message.name}! Xabaringiz qabul qilindi.")
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.success_url)
 
-    def form_invalid(self, form):
-        # Xatolarni terminalda ko‘rish uchun
-        print(form.errors)
+    async def form_invalid(self, form):
         messages.error(self.request, "Iltimos, ma'lumotlarni to'g'ri kiriting.")
-        return super().form_invalid(form)
+        return await self.render_to_response(self.request, {'form': form, 'departments': list(form.departments.values())})
 
 
+class ReviewCreateView(RateLimitMixin, View):
+    """Shifokor haqida sharh qoldirish (moderatsiyadan keyin e'lon qilinadi)"""
+    ratelimit_route = 'review'
 
+    def post(self, request, slug):
+        doctor = get_object_or_404(Doctor, slug=slug, is_available=True)
+        form = ReviewForm(request.POST)
+        if form.is_valid():
+            review = form.save(commit=False)
+            review.doctor = doctor
+            review.save()
+            messages.success(request, "Rahmat! Sharhingiz moderatsiyadan so'ng e'lon qilinadi.")
+        else:
+            errors = ' '.join(error for field_errors in form.errors.values() for error in field_errors)
+            messages.error(request, f"Sharh yuborilmadi: {errors}")
+        return HttpResponseRedirect(f"{doctor.get_absolute_url()}#reviews")
 
 
 class TestimonialsView(TemplateView):
+    """Tasdiqlangan sharhlar (sahifalar urls.py'da avlod bo'yicha keshlanadi)"""
     template_name = "testimonials.html"
+    paginate_by = 12
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        reviews = Review.objects.filter(status=Review.STATUS_APPROVED).select_related('doctor').only(
+            'patient_name', 'rating', 'comment', 'created_at',
+            'doctor__first_name', 'doctor__last_name', 'doctor__middle_name', 'doctor__slug', 'doctor__specialization',
+        )
+        page_obj = Paginator(reviews, self.paginate_by).get_page(self.request.GET.get('page'))
+        context.update(page_obj=page_obj, reviews=page_obj.object_list)
+        return context
 
 
 class AboutView(TemplateView):
@@ -197,35 +348,88 @@ class AboutView(TemplateView):
 
 
 class IndexView(TemplateView):
+    """Bosh sahifa: bo'limlar alohida keshlangan fragmentlardan yig'iladi"""
     template_name = "index.html"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['sections'] = homepage.render_sections()
+        return context
+
 
 class AppointmentView(TemplateView):
     template_name = "appointment.html"
 
+    def get(self, request, *args, **kwargs):
+        # "Qabulga yozilish" qaysi sahifadan bosilgani: ?doctor=<slug> / ?service=<slug>
+        for kind, model in ((ActivityCount.KIND_DOCTOR, Doctor), (ActivityCount.KIND_SERVICE, Service)):
+            slug = request.GET.get(kind)
+            if slug:
+                pk = model.objects.filter(slug=slug).values_list('pk', flat=True).first()
+                if pk is not None:
+                    analytics.record_booking(kind, pk)
+        return super().get(request, *args, **kwargs)
 
 
+class RobotsView(TemplateView):
+    """robots.txt (so'rov parametrli URL'lar yopiq, sitemap ko'rsatilgan)"""
+    template_name = "robots.txt"
+    content_type = "text/plain; charset=utf-8"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['sitemap_url'] = self.request.build_absolute_uri(reverse('sitemap'))
+        return context
 
 
+class SuggestView(View):
+    """Qidiruv takliflari: /search/suggest?q=... (xotiradagi indeksdan, DB so'rovisiz)"""
+
+    def get(self, request):
+        query = request.GET.get('q', '')[:100]
+        return JsonResponse({'results': suggest(query) if query.strip() else []})
+
+
+class DoctorPortalMixin(LoginRequiredMixin):
+    """Faqat Doctor.user orqali bog'langan foydalanuvchilar uchun"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.doctor = Doctor.objects.filter(user=request.user).select_related('department').first()
+            if self.doctor is None:
+                raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+    def schedule_etag(self):
+        return f'"{portal.schedule_version(self.doctor.pk)}-{timezone.localdate().isoformat()}"'
+
+
+class DoctorDashboardView(DoctorPortalMixin, TemplateView):
+    """Shifokor kabineti: bugungi va haftalik qabullar, bo'lim xabarlari"""
+    template_name = "portal/dashboard.html"
+    messages_limit = 20
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['doctor'] = self.doctor
+        context['schedule'] = portal.dashboard(self.doctor.pk)
+        context['schedule_etag'] = self.schedule_etag()
+        context['contact_messages'] = (
+            ContactMessage.objects.filter(department_id=self.doctor.department_id)
+            .exclude(is_spam=True).order_by('-created_at')[:self.messages_limit]
+        )
+        return context
 
-def send_telegram_message(message):
-    token = os.getenv('TELEGRAM_BOT_TOKEN')
-    chat_id = os.getenv('TELEGRAM_CHAT_ID')
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    payload = {
-        "chat_id": chat_id,
-        "text": message,
-        "parse_mode": "HTML"
-    }
 
-    try:
-        response = requests.post(url, data=payload, timeout=5)
-        # Terminalda tekshirish uchun:
-        print(f"Telegram status code: {response.status_code}")
-        print(f"Telegram response: {response.text}")
+class DoctorScheduleView(DoctorPortalMixin, View):
+    """Avto-yangilanish uchun jadval bo'lagi: o'zgarmagan bo'lsa 304 (render va DB so'rovisiz)"""
 
-        return response.status_code == 200
-    except Exception as e:
-        print(f"Telegram ulanish xatosi: {e}")
-        return False
+    def get(self, request):
+        etag = self.schedule_etag()
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=304)
+        else:
+            response = render(request, "portal/schedule.html", {'schedule': portal.dashboard(self.doctor.pk)})
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response